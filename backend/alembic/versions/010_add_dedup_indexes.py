@@ -0,0 +1,75 @@
+"""Add indexes for news de-duplication and trade pattern filters
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Add indexes used by the news scheduler duplicate checks and
+    the pattern analyzer filters
+    """
+    from sqlalchemy import inspect
+
+    # Get connection and inspector
+    conn = op.get_bind()
+    inspector = inspect(conn)
+
+    def index_exists(table_name: str, index_name: str) -> bool:
+        """Check if an index already exists"""
+        indexes = inspector.get_indexes(table_name)
+        return any(idx['name'] == index_name for idx in indexes)
+
+    # ===== NEWS_ARTICLES =====
+    # URL lookups when de-duplicating collected articles
+    if not index_exists('news_articles', 'idx_news_url'):
+        op.create_index(
+            'idx_news_url',
+            'news_articles',
+            ['url'],
+            unique=False
+        )
+
+    # (title, published_date) lookups for articles without a matching URL
+    if not index_exists('news_articles', 'idx_news_title_published'):
+        op.create_index(
+            'idx_news_title_published',
+            'news_articles',
+            ['title', 'published_date'],
+            unique=False
+        )
+
+    # ===== TRADE_PATTERNS =====
+    # trade_patterns is created from the ML models, so it may not exist yet
+    if inspector.has_table('trade_patterns') and not index_exists('trade_patterns', 'idx_pattern_type_symbol'):
+        op.create_index(
+            'idx_pattern_type_symbol',
+            'trade_patterns',
+            ['pattern_type', 'symbol'],
+            unique=False
+        )
+
+
+def downgrade() -> None:
+    """
+    Remove de-duplication and pattern filter indexes
+    """
+    from sqlalchemy import inspect
+
+    inspector = inspect(op.get_bind())
+
+    if inspector.has_table('trade_patterns'):
+        op.drop_index('idx_pattern_type_symbol', table_name='trade_patterns')
+    op.drop_index('idx_news_title_published', table_name='news_articles')
+    op.drop_index('idx_news_url', table_name='news_articles')
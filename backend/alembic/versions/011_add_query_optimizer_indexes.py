@@ -0,0 +1,77 @@
+"""Add covering indexes for QueryOptimizer filters
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Add composite indexes matching the QueryOptimizer predicates
+
+    On PostgreSQL the aggregated columns are stored with INCLUDE so the
+    aggregations can be answered by index-only scans. Other databases
+    (SQLite) ignore postgresql_include and get the plain key indexes.
+    """
+    from sqlalchemy import inspect
+
+    # Get connection and inspector
+    conn = op.get_bind()
+    inspector = inspect(conn)
+
+    def index_exists(table_name: str, index_name: str) -> bool:
+        """Check if an index already exists"""
+        indexes = inspector.get_indexes(table_name)
+        return any(idx['name'] == index_name for idx in indexes)
+
+    # ===== NEWS_ARTICLES =====
+    # Recent news filtered by asset type, newest first
+    if not index_exists('news_articles', 'idx_news_published_asset_cover'):
+        op.create_index(
+            'idx_news_published_asset_cover',
+            'news_articles',
+            ['published_date', 'asset_type'],
+            unique=False,
+            postgresql_include=['id']
+        )
+
+    # ===== SENTIMENT_ANALYSIS =====
+    # Daily sentiment aggregation over analyzed_at >= cutoff
+    if not index_exists('sentiment_analysis', 'idx_sentiment_analyzed_cover'):
+        op.create_index(
+            'idx_sentiment_analyzed_cover',
+            'sentiment_analysis',
+            ['analyzed_at', 'sentiment'],
+            unique=False,
+            postgresql_include=['score', 'article_id']
+        )
+
+    # ===== TRADE_HISTORY =====
+    # Per-user performance summary over executed_at >= cutoff
+    if not index_exists('trade_history', 'idx_trade_user_executed'):
+        op.create_index(
+            'idx_trade_user_executed',
+            'trade_history',
+            ['user_id', 'executed_at'],
+            unique=False,
+            postgresql_include=['trade_type', 'profit_loss', 'total_amount']
+        )
+
+
+def downgrade() -> None:
+    """
+    Remove QueryOptimizer covering indexes
+    """
+    op.drop_index('idx_trade_user_executed', table_name='trade_history')
+    op.drop_index('idx_sentiment_analyzed_cover', table_name='sentiment_analysis')
+    op.drop_index('idx_news_published_asset_cover', table_name='news_articles')
@@ -0,0 +1,40 @@
+"""Add daily sentiment rollup table
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '012'
+down_revision = '011'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Create daily_sentiment_rollup table
+    op.create_table(
+        'daily_sentiment_rollup',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('asset_type', sa.String(50), nullable=False),
+        sa.Column('score_sum', sa.Float(), nullable=False),
+        sa.Column('total_count', sa.Integer(), nullable=False),
+        sa.Column('positive_count', sa.Integer(), nullable=False),
+        sa.Column('negative_count', sa.Integer(), nullable=False),
+        sa.Column('neutral_count', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_daily_sentiment_rollup_id', 'daily_sentiment_rollup', ['id'])
+    op.create_index('idx_rollup_date_asset', 'daily_sentiment_rollup', ['date', 'asset_type'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_rollup_date_asset', table_name='daily_sentiment_rollup')
+    op.drop_index('ix_daily_sentiment_rollup_id', table_name='daily_sentiment_rollup')
+    op.drop_table('daily_sentiment_rollup')
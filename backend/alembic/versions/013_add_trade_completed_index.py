@@ -0,0 +1,54 @@
+"""Add partial index for the daily loss limit check
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '013'
+down_revision = '012'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Add a partial index over completed trades for RiskManager
+
+    The daily loss limit sums profit_loss over a user's completed trades
+    since midnight. The index only holds COMPLETED rows; on PostgreSQL
+    profit_loss is stored with INCLUDE so the sum is an index-only scan.
+    """
+    from sqlalchemy import inspect
+
+    # Get connection and inspector
+    conn = op.get_bind()
+    inspector = inspect(conn)
+
+    def index_exists(table_name: str, index_name: str) -> bool:
+        """Check if an index already exists"""
+        indexes = inspector.get_indexes(table_name)
+        return any(idx['name'] == index_name for idx in indexes)
+
+    # ===== TRADE_HISTORY =====
+    if not index_exists('trade_history', 'idx_trade_user_completed'):
+        op.create_index(
+            'idx_trade_user_completed',
+            'trade_history',
+            ['user_id', 'executed_at'],
+            unique=False,
+            postgresql_include=['profit_loss'],
+            postgresql_where=sa.text("status = 'COMPLETED'"),
+            sqlite_where=sa.text("status = 'COMPLETED'")
+        )
+
+
+def downgrade() -> None:
+    """
+    Remove the completed-trade partial index
+    """
+    op.drop_index('idx_trade_user_completed', table_name='trade_history')
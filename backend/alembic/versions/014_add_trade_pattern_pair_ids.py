@@ -0,0 +1,96 @@
+"""Record the trade pair of each trade pattern
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-17
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '014'
+down_revision = '013'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Add buy/sell trade id columns to trade_patterns with a unique index
+
+    Pattern extraction skips pairs that are already stored, so re-running
+    it over overlapping date ranges no longer inserts duplicates. Existing
+    rows are backfilled from their features JSON; duplicates left by
+    earlier runs are removed, keeping the first row of each pair.
+    """
+    from sqlalchemy import inspect
+
+    # Get connection and inspector
+    conn = op.get_bind()
+    inspector = inspect(conn)
+
+    # trade_patterns is created from the ML models, so it may not exist yet
+    if not inspector.has_table('trade_patterns'):
+        return
+
+    columns = {col['name'] for col in inspector.get_columns('trade_patterns')}
+    with op.batch_alter_table('trade_patterns') as batch_op:
+        if 'buy_trade_id' not in columns:
+            batch_op.add_column(sa.Column('buy_trade_id', sa.Integer(), nullable=True))
+        if 'sell_trade_id' not in columns:
+            batch_op.add_column(sa.Column('sell_trade_id', sa.Integer(), nullable=True))
+
+    # Backfill pair ids and drop duplicate pairs
+    seen_pairs = set()
+    duplicate_ids = []
+    rows = conn.execute(sa.text(
+        "SELECT id, features FROM trade_patterns "
+        "WHERE buy_trade_id IS NULL ORDER BY id"
+    )).fetchall()
+    for pattern_id, features in rows:
+        if isinstance(features, str):
+            features = json.loads(features)
+        if not features or 'buy_trade_id' not in features or 'sell_trade_id' not in features:
+            continue
+
+        pair = (features['buy_trade_id'], features['sell_trade_id'])
+        if pair in seen_pairs:
+            duplicate_ids.append(pattern_id)
+            continue
+        seen_pairs.add(pair)
+
+        conn.execute(
+            sa.text(
+                "UPDATE trade_patterns SET buy_trade_id = :buy_id, sell_trade_id = :sell_id "
+                "WHERE id = :id"
+            ),
+            {"buy_id": pair[0], "sell_id": pair[1], "id": pattern_id}
+        )
+
+    for pattern_id in duplicate_ids:
+        conn.execute(sa.text("DELETE FROM trade_patterns WHERE id = :id"), {"id": pattern_id})
+
+    op.create_index(
+        'uq_pattern_trade_pair',
+        'trade_patterns',
+        ['buy_trade_id', 'sell_trade_id'],
+        unique=True
+    )
+
+
+def downgrade() -> None:
+    """
+    Remove the trade pair columns and index
+    """
+    from sqlalchemy import inspect
+
+    inspector = inspect(op.get_bind())
+
+    if inspector.has_table('trade_patterns'):
+        op.drop_index('uq_pattern_trade_pair', table_name='trade_patterns')
+        with op.batch_alter_table('trade_patterns') as batch_op:
+            batch_op.drop_column('sell_trade_id')
+            batch_op.drop_column('buy_trade_id')
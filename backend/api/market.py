@@ -113,9 +113,9 @@ async def analyze_market(
         # Step 3: Generate recommendation
         recommendation_engine = RecommendationEngine()
         try:
-            recommendation = recommendation_engine.generate_recommendation(trend_summary)
+            recommendation = await recommendation_engine.agenerate_recommendation(trend_summary)
         finally:
-            recommendation_engine.close()
+            await recommendation_engine.aclose()
         
         # Build response
         response_data = {
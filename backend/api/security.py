@@ -67,8 +67,8 @@ async def check_rate_limit(request: Request):
     # Use IP address as identifier
     client_ip = request.client.host
     
-    if not rate_limiter.is_allowed(client_ip):
-        remaining = rate_limiter.get_remaining(client_ip)
+    if not await rate_limiter.is_allowed_async(client_ip):
+        remaining = await rate_limiter.get_remaining_async(client_ip)
         raise HTTPException(
             status_code=429,
             detail=f"Rate limit exceeded. Try again later. Remaining: {remaining}"
@@ -132,6 +132,24 @@ async def revoke_api_key(
         raise HTTPException(status_code=500, detail="Failed to revoke API key")
 
 
+@router.delete("/api-keys/all")
+async def revoke_all_api_keys(user_id: str = Depends(verify_api_key)):
+    """Revoke all API keys of the current user"""
+    try:
+        revoked = api_key_manager.revoke_all(user_id)
+        
+        audit_logger.log_auth(
+            user_id=user_id,
+            action="api_keys_revoked_all",
+            success=True
+        )
+        
+        return {"message": f"Revoked {revoked} API keys", "revoked": revoked}
+    except Exception as e:
+        logger.error(f"Failed to revoke API keys: {e}")
+        raise HTTPException(status_code=500, detail="Failed to revoke API keys")
+
+
 @router.post("/2fa/setup", response_model=TwoFactorSetupResponse)
 async def setup_two_factor(
     user_id: str,
@@ -172,7 +190,7 @@ async def setup_two_factor(
 async def verify_two_factor(request: TwoFactorVerifyRequest):
     """Verify two-factor authentication token"""
     try:
-        is_valid = two_factor_auth.verify_token(request.user_id, request.token)
+        is_valid = await two_factor_auth.averify_token(request.user_id, request.token)
         
         audit_logger.log_auth(
             user_id=request.user_id,
@@ -212,7 +230,7 @@ async def get_rate_limit_status(
 ):
     """Get current rate limit status"""
     client_ip = request.client.host
-    remaining = rate_limiter.get_remaining(client_ip)
+    remaining = await rate_limiter.get_remaining_async(client_ip)
     
     return {
         "user_id": user_id,
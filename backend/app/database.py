@@ -14,6 +14,9 @@ from config import settings
 
 logger = logging.getLogger(__name__)
 
+# Compiled statement cache entries per engine (SQLAlchemy default is 500)
+QUERY_CACHE_SIZE = 1200
+
 # Determine if using SQLite
 is_sqlite = settings.database_url.startswith("sqlite")
 
@@ -24,6 +27,7 @@ if is_sqlite:
         settings.database_url,
         connect_args={"check_same_thread": False},
         poolclass=StaticPool,
+        query_cache_size=QUERY_CACHE_SIZE,
         echo=settings.debug
     )
     
@@ -40,6 +44,7 @@ else:
         pool_pre_ping=True,
         pool_size=5,
         max_overflow=10,
+        query_cache_size=QUERY_CACHE_SIZE,
         echo=settings.debug
     )
 
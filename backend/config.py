@@ -78,6 +78,13 @@ class Settings(BaseSettings):
     # Scheduler Settings
     news_collection_hour: int = 0
     news_collection_minute: int = 0
+    # News API has no "ko" filter; adding "ko" sends the Korean keyword query unfiltered
+    news_collection_languages: str = "en"
+    
+    @property
+    def news_collection_languages_list(self) -> List[str]:
+        """Parse news collection languages string into list"""
+        return [lang.strip() for lang in self.news_collection_languages.split(",") if lang.strip()]
     
     # Auto Trading Settings
     auto_trading_enabled: bool = False
@@ -89,6 +96,7 @@ class Settings(BaseSettings):
     llm_temperature: float = 0.7
     llm_max_tokens: int = 2048
     llm_timeout: int = 120
+    llm_parallel_requests: int = 4  # Concurrent Stage 1 requests (match llama.cpp --parallel)
     
     # Sentiment Scoring
     positive_score: float = 1.0
@@ -108,6 +116,8 @@ class Settings(BaseSettings):
     require_2fa_for_trading: bool = True
     require_2fa_threshold: float = 5000000.0  # 5M KRW
     audit_log_retention_days: int = 365
+    audit_trail_buffer_max_size: int = 500  # Trade audit rows per batched insert
+    audit_trail_buffer_flush_interval: float = 5.0  # seconds
     
     # Monitoring and Alerting Settings
     smtp_server: str = "smtp.gmail.com"
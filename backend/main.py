@@ -6,6 +6,7 @@ from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
+import asyncio
 import logging
 import time
 
@@ -71,11 +72,43 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning(f"Failed to start archiving scheduler: {e}")
     
+    # Start batched trade audit log writer
+    try:
+        from services.trade_audit_buffer import get_trade_audit_buffer
+        get_trade_audit_buffer().start()
+    except Exception as e:
+        logger.warning(f"Failed to start trade audit buffer: {e}")
+    
+    # Warm the llama.cpp prompt cache with the Step 3 system prompt (in the background)
+    llm_warmup_task = None
+    try:
+        from services.llm_client import get_llama_client
+        from services.recommendation_engine import STEP3_SYSTEM_PROMPT
+        llm_warmup_task = asyncio.create_task(get_llama_client().awarmup(STEP3_SYSTEM_PROMPT))
+    except Exception as e:
+        logger.warning(f"Failed to start LLM prompt cache warmup: {e}")
+    
     yield
     
     # Shutdown
     logger.info("Shutting down application")
     
+    # Flush pending trade audit rows
+    try:
+        from services.trade_audit_buffer import get_trade_audit_buffer
+        await get_trade_audit_buffer().stop()
+    except Exception as e:
+        logger.warning(f"Error stopping trade audit buffer: {e}")
+    
+    # Close the shared llama.cpp client
+    if llm_warmup_task is not None:
+        llm_warmup_task.cancel()
+        try:
+            await get_llama_client().aclose()
+            logger.info("llama.cpp client closed")
+        except Exception as e:
+            logger.warning(f"Error closing llama.cpp client: {e}")
+    
     # Stop cache scheduler
     try:
         from services.cache_scheduler import stop_cache_scheduler
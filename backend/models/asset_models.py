@@ -64,6 +64,7 @@ class AssetPrice(Base):
     asset = relationship("Asset", back_populates="prices")
     
     __table_args__ = (
+        # Serves latest-price (backward scan) and price-history range lookups
         Index('idx_asset_timestamp', 'asset_id', 'timestamp'),
     )
 
@@ -3,15 +3,20 @@ Machine Learning Models for Trading Pattern Analysis
 """
 from datetime import datetime
 from typing import Optional, Dict, Any
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, JSON, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, JSON, Text, Index
 from pydantic import BaseModel, Field
 from app.database import Base
 
 
 # SQLAlchemy Models
 class TradePattern(Base):
-    """거래 ?�턴 ?�??""
+    """거래 패턴 저장"""
     __tablename__ = "trade_patterns"
+    __table_args__ = (
+        Index('idx_pattern_type_symbol', 'pattern_type', 'symbol'),
+        # One pattern per buy/sell trade pair, so re-extraction can't duplicate it
+        Index('uq_pattern_trade_pair', 'buy_trade_id', 'sell_trade_id', unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     pattern_type = Column(String(50), nullable=False)  # 'winning', 'losing', 'neutral'
@@ -25,11 +30,13 @@ class TradePattern(Base):
     trade_size = Column(Float, nullable=False)
     market_condition = Column(String(20), nullable=True)
     features = Column(JSON, nullable=True)
+    buy_trade_id = Column(Integer, nullable=True)
+    sell_trade_id = Column(Integer, nullable=True)
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
 
 
 class LearnedStrategy(Base):
-    """?�습???�략 ?�라미터"""
+    """학습된 전략 파라미터"""
     __tablename__ = "learned_strategies"
     
     id = Column(Integer, primary_key=True, index=True)
@@ -51,7 +58,7 @@ class LearnedStrategy(Base):
 
 
 class LearningSession(Base):
-    """?�습 ?�션 기록"""
+    """학습 세션 기록"""
     __tablename__ = "learning_sessions"
     
     id = Column(Integer, primary_key=True, index=True)
@@ -68,7 +75,7 @@ class LearningSession(Base):
 
 # Pydantic Schemas
 class TradePatternCreate(BaseModel):
-    """거래 ?�턴 ?�성 ?�키�?""
+    """거래 패턴 생성 스키마"""
     pattern_type: str = Field(..., description="Pattern type: winning, losing, neutral")
     symbol: str
     entry_signal_score: float
@@ -83,7 +90,7 @@ class TradePatternCreate(BaseModel):
 
 
 class TradePatternResponse(BaseModel):
-    """거래 ?�턴 ?�답 ?�키�?""
+    """거래 패턴 응답 스키마"""
     id: int
     pattern_type: str
     symbol: str
@@ -103,7 +110,7 @@ class TradePatternResponse(BaseModel):
 
 
 class LearnedStrategyResponse(BaseModel):
-    """?�습???�략 ?�답 ?�키�?""
+    """학습된 전략 응답 스키마"""
     id: int
     strategy_name: str
     version: int
@@ -126,7 +133,7 @@ class LearnedStrategyResponse(BaseModel):
 
 
 class LearningSessionResponse(BaseModel):
-    """?�습 ?�션 ?�답 ?�키�?""
+    """학습 세션 응답 스키마"""
     id: int
     session_type: str
     start_time: datetime
@@ -143,7 +150,7 @@ class LearningSessionResponse(BaseModel):
 
 
 class PatternAnalysisRequest(BaseModel):
-    """?�턴 분석 ?�청 ?�키�?""
+    """패턴 분석 요청 스키마"""
     start_date: Optional[datetime] = None
     end_date: Optional[datetime] = None
     min_trades: int = Field(default=10, description="Minimum trades to analyze")
@@ -151,14 +158,14 @@ class PatternAnalysisRequest(BaseModel):
 
 
 class StrategyOptimizationRequest(BaseModel):
-    """?�략 최적???�청 ?�키�?""
+    """전략 최적화 요청 스키마"""
     strategy_name: str = Field(default="sentiment_based_v1")
     min_profit_threshold: float = Field(default=2.0, description="Minimum profit % to consider winning")
     optimization_metric: str = Field(default="sharpe_ratio", description="Metric to optimize")
 
 
 class PatternInsights(BaseModel):
-    """?�턴 분석 ?�사?�트"""
+    """패턴 분석 인사이트"""
     total_patterns: int
     winning_patterns: int
     losing_patterns: int
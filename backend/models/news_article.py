@@ -4,14 +4,17 @@ NewsArticle database model and Pydantic schemas
 
 from sqlalchemy import Column, Integer, String, Text, DateTime, Index
 from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
 from datetime import datetime
 from pydantic import BaseModel, Field, ConfigDict
 from typing import Optional
 
 try:
     from app.database import Base
+    from models.sentiment_analysis import SentimentAnalysis
 except ImportError:
     from app.database import Base
+    from models.sentiment_analysis import SentimentAnalysis
 
 
 class NewsArticle(Base):
@@ -22,6 +25,11 @@ class NewsArticle(Base):
     __tablename__ = "news_articles"
     __table_args__ = (
         Index('idx_published_asset', 'published_date', 'asset_type'),
+        # Duplicate checks in NewsScheduler._store_articles
+        Index('idx_news_url', 'url'),
+        Index('idx_news_title_published', 'title', 'published_date'),
+        # Recent news lookups in QueryOptimizer (INCLUDE is PostgreSQL-only)
+        Index('idx_news_published_asset_cover', 'published_date', 'asset_type', postgresql_include=['id']),
         {'extend_existing': True}
     )
     
@@ -35,6 +43,9 @@ class NewsArticle(Base):
     url = Column(String(500))
     asset_type = Column(String(50), default="general", index=True)
     created_at = Column(DateTime, default=func.now(), nullable=False)
+    
+    # Sentiment analysis result (read-only; rows are written via SentimentAnalysis)
+    sentiment = relationship(SentimentAnalysis, uselist=False, viewonly=True)
 
 
 # Pydantic Schemas
@@ -23,6 +23,8 @@ class SentimentAnalysis(Base):
     __tablename__ = "sentiment_analysis"
     __table_args__ = (
         Index('idx_article_analyzed', 'article_id', 'analyzed_at'),
+        # Daily sentiment aggregation in QueryOptimizer (INCLUDE is PostgreSQL-only)
+        Index('idx_sentiment_analyzed_cover', 'analyzed_at', 'sentiment', postgresql_include=['score', 'article_id']),
         {'extend_existing': True}
     )
     
@@ -0,0 +1,34 @@
+"""
+DailySentimentRollup database model
+"""
+
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Index
+from sqlalchemy.sql import func
+
+try:
+    from app.database import Base
+except ImportError:
+    from app.database import Base
+
+
+class DailySentimentRollup(Base):
+    """
+    Database model for daily sentiment aggregates
+    One row per (date, asset_type), refreshed from sentiment_analysis so daily
+    score queries read at most one row per day and asset type
+    """
+    __tablename__ = "daily_sentiment_rollup"
+    __table_args__ = (
+        Index('idx_rollup_date_asset', 'date', 'asset_type', unique=True),
+        {'extend_existing': True}
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    date = Column(Date, nullable=False)
+    asset_type = Column(String(50), nullable=False)
+    score_sum = Column(Float, nullable=False, default=0.0)  # Sum of scores (avg = score_sum / total_count)
+    total_count = Column(Integer, nullable=False, default=0)
+    positive_count = Column(Integer, nullable=False, default=0)
+    negative_count = Column(Integer, nullable=False, default=0)
+    neutral_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=func.now(), nullable=False)
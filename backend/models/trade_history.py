@@ -3,7 +3,7 @@ TradeHistory database model and Pydantic schemas
 Stores all executed trades for tracking and analysis
 """
 
-from sqlalchemy import Column, Integer, String, DECIMAL, DateTime, Text, Index
+from sqlalchemy import Column, Integer, String, DECIMAL, DateTime, Text, Index, text
 from sqlalchemy.sql import func
 from datetime import datetime
 from pydantic import BaseModel, Field, ConfigDict
@@ -27,6 +27,17 @@ class TradeHistory(Base):
         Index('idx_trade_executed_at', 'executed_at'),
         Index('idx_trade_type', 'trade_type'),
         Index('idx_trade_user_id', 'user_id'),
+        # Performance summary in QueryOptimizer (INCLUDE is PostgreSQL-only)
+        Index('idx_trade_user_executed', 'user_id', 'executed_at', postgresql_include=['trade_type', 'profit_loss', 'total_amount']),
+        # Daily loss limit check in RiskManager (partial index over completed trades)
+        Index(
+            'idx_trade_user_completed',
+            'user_id',
+            'executed_at',
+            postgresql_include=['profit_loss'],
+            postgresql_where=text("status = 'COMPLETED'"),
+            sqlite_where=text("status = 'COMPLETED'")
+        ),
         {'extend_existing': True}
     )
     
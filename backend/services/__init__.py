@@ -5,7 +5,8 @@ from .llm_client import (
     LlamaCppClientError,
     LlamaCppConnectionError,
     LlamaCppTimeoutError,
-    LLMResponse
+    LLMResponse,
+    get_llama_client
 )
 
 from .prompts import (
@@ -15,6 +16,7 @@ from .prompts import (
     create_step1_prompt,
     create_step2_prompt,
     create_step3_prompt,
+    truncate_content,
     validate_step1_response,
     validate_step3_response
 )
@@ -36,6 +38,7 @@ __all__ = [
     "LlamaCppConnectionError",
     "LlamaCppTimeoutError",
     "LLMResponse",
+    "get_llama_client",
     # Prompts
     "STEP1_SYSTEM_PROMPT",
     "STEP2_SYSTEM_PROMPT",
@@ -43,6 +46,7 @@ __all__ = [
     "create_step1_prompt",
     "create_step2_prompt",
     "create_step3_prompt",
+    "truncate_content",
     "validate_step1_response",
     "validate_step3_response",
     # Brokerage APIs
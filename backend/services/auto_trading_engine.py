@@ -17,7 +17,7 @@ try:
     from models.auto_trade_config import AutoTradeConfig
     from models.trade_history import TradeHistory
     from models.account_holding import AccountHolding
-    from services.risk_manager import RiskManager, RiskValidationError
+    from services.risk_manager import RiskManager, RiskValidationError, get_holdings_by_symbol, index_holdings_by_symbol
     from services.signal_generator import SignalCalculator
     from services.brokerage_connector import BrokerageAPIBase, StockPrice
     from models.trading_schemas import Order, TradeResult
@@ -25,7 +25,7 @@ except ImportError:
     from models.auto_trade_config import AutoTradeConfig
     from models.trade_history import TradeHistory
     from models.account_holding import AccountHolding
-    from services.risk_manager import RiskManager, RiskValidationError
+    from services.risk_manager import RiskManager, RiskValidationError, get_holdings_by_symbol, index_holdings_by_symbol
     from services.signal_generator import SignalCalculator
     from services.brokerage_connector import BrokerageAPIBase, StockPrice
     from models.trading_schemas import Order, TradeResult
@@ -335,8 +335,7 @@ class AutoTradingEngine:
         """
         try:
             # Find holding for this symbol
-            holdings = holdings_info.get("holdings", [])
-            holding = next((h for h in holdings if h.get("symbol") == symbol), None)
+            holding = get_holdings_by_symbol(holdings_info).get(symbol)
             
             if not holding:
                 return {
@@ -437,21 +436,24 @@ class AutoTradingEngine:
             holdings_info = self._get_holdings_info(config.user_id)
             holdings = holdings_info.get("holdings", [])
             
+            # Get current prices
+            current_prices = {}
             for holding in holdings:
                 symbol = holding.get("symbol")
                 
-                # Get current price
                 try:
                     stock_price = self.brokerage_api.get_stock_price(symbol)
-                    current_price = stock_price.price
+                    current_prices[symbol] = stock_price.price
                 except Exception as e:
                     logger.error(f"Failed to get price for {symbol}: {e}")
-                    continue
-                
-                # Check stop-loss
-                should_sell, quantity, reason = self.risk_manager.check_stop_loss(
-                    config, symbol, current_price, holdings_info
-                )
+            
+            # Check stop-loss for all positions at once
+            stop_loss_results = self.risk_manager.check_stop_loss_batch(
+                config, current_prices, holdings_info
+            )
+            
+            for symbol, current_price in current_prices.items():
+                should_sell, quantity, reason = stop_loss_results[symbol]
                 
                 if should_sell and quantity:
                     logger.warning(f"Stop-loss triggered for {symbol}: {reason}")
@@ -493,7 +495,8 @@ class AutoTradingEngine:
             return {
                 "cash_balance": account_info.available_cash,
                 "invested_amount": account_info.total_assets - account_info.available_cash,
-                "holdings": holdings_list
+                "holdings": holdings_list,
+                "holdings_by_symbol": index_holdings_by_symbol(holdings_list)
             }
         
         except Exception as e:
@@ -501,7 +504,8 @@ class AutoTradingEngine:
             return {
                 "cash_balance": Decimal("0.0"),
                 "invested_amount": Decimal("0.0"),
-                "holdings": []
+                "holdings": [],
+                "holdings_by_symbol": {}
             }
     
     def _record_trade(
@@ -544,6 +548,9 @@ class AutoTradingEngine:
             self.db.add(trade_record)
             self.db.commit()
             
+            if trade_record.status == "COMPLETED":
+                self.risk_manager.invalidate_daily_pnl(user_id)
+            
             logger.info(f"Trade recorded: {trade_result.trade_type} {trade_result.quantity} {trade_result.symbol}")
             
             # Record trade metrics
@@ -11,9 +11,11 @@ from datetime import datetime
 try:
     from app.database import SessionLocal
     from services.cache_manager import CacheManager
+    from services.query_optimizer import QueryOptimizer
 except ImportError:
     from app.database import SessionLocal
     from services.cache_manager import CacheManager
+    from services.query_optimizer import QueryOptimizer
 
 
 logger = logging.getLogger(__name__)
@@ -24,6 +26,10 @@ class CacheScheduler:
     Background scheduler for cache maintenance tasks
     """
     
+    # Days recomputed on each sentiment rollup refresh / on startup
+    ROLLUP_REFRESH_DAYS = 2
+    ROLLUP_BACKFILL_DAYS = 30
+    
     def __init__(self):
         """Initialize cache scheduler"""
         self.scheduler = BackgroundScheduler()
@@ -46,10 +52,26 @@ class CacheScheduler:
         except Exception as e:
             logger.error(f"Failed to clear expired cache: {e}")
     
+    def refresh_sentiment_rollup(self, days: int = ROLLUP_REFRESH_DAYS):
+        """
+        Refresh the daily sentiment rollup for recent days
+        This task runs periodically so daily sentiment queries stay current
+        """
+        db = SessionLocal()
+        try:
+            count = QueryOptimizer(db).refresh_daily_sentiment_rollup(days=days)
+            logger.info(f"Cache maintenance: Refreshed {count} daily sentiment rollup rows")
+            
+        except Exception as e:
+            logger.error(f"Failed to refresh daily sentiment rollup: {e}")
+        finally:
+            db.close()
+    
     def start(self):
         """
         Start the cache maintenance scheduler
-        Runs cache cleanup every hour
+        Runs cache cleanup every hour and the sentiment rollup refresh
+        every 5 minutes (after a backfill of recent history on startup)
         """
         if self.is_running:
             logger.warning("Cache scheduler is already running")
@@ -65,6 +87,23 @@ class CacheScheduler:
                 replace_existing=True
             )
             
+            # Backfill the sentiment rollup once, then keep recent days current
+            self.scheduler.add_job(
+                self.refresh_sentiment_rollup,
+                kwargs={"days": self.ROLLUP_BACKFILL_DAYS},
+                id="backfill_sentiment_rollup",
+                name="Backfill daily sentiment rollup",
+                replace_existing=True
+            )
+            self.scheduler.add_job(
+                self.refresh_sentiment_rollup,
+                trigger=IntervalTrigger(minutes=5),
+                id="refresh_sentiment_rollup",
+                name="Refresh daily sentiment rollup",
+                replace_existing=True,
+                max_instances=1
+            )
+            
             self.scheduler.start()
             self.is_running = True
             logger.info("Cache scheduler started successfully")
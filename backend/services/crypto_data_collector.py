@@ -14,6 +14,9 @@ logger = logging.getLogger(__name__)
 class CryptoDataCollector:
     """Collects cryptocurrency data from CoinGecko API"""
     
+    # Maximum coins returned per /coins/markets page
+    MARKETS_PAGE_SIZE = 250
+    
     def __init__(self):
         self.base_url = "https://api.coingecko.com/api/v3"
         self.session = requests.Session()
@@ -90,6 +93,60 @@ class CryptoDataCollector:
             logger.error(f"Failed to fetch price data for {coin_id}: {e}")
             return None
     
+    def get_prices_bulk(self, coin_ids: List[str], vs_currency: str = 'usd') -> Dict[str, Dict]:
+        """
+        Get current price data for many cryptocurrencies at once
+        
+        Uses the markets endpoint, which returns the same fields as
+        get_price_data for up to MARKETS_PAGE_SIZE coins per request.
+        
+        Args:
+            coin_ids: CoinGecko coin IDs (e.g., ['bitcoin', 'ethereum'])
+            vs_currency: Quote currency (default: 'usd')
+        
+        Returns:
+            Price data dictionaries keyed by coin ID (missing coins omitted)
+        """
+        results = {}
+        unique_ids = list(dict.fromkeys(coin_ids))
+        
+        for start in range(0, len(unique_ids), self.MARKETS_PAGE_SIZE):
+            chunk = unique_ids[start:start + self.MARKETS_PAGE_SIZE]
+            try:
+                response = self.session.get(
+                    f"{self.base_url}/coins/markets",
+                    params={
+                        'vs_currency': vs_currency,
+                        'ids': ','.join(chunk),
+                        'per_page': len(chunk),
+                        'page': 1,
+                        'sparkline': False
+                    },
+                    timeout=10
+                )
+                response.raise_for_status()
+                timestamp = datetime.utcnow()
+                
+                for coin in response.json():
+                    if coin.get('current_price') is None:
+                        continue
+                    results[coin['id']] = {
+                        'symbol': coin.get('symbol', '').upper(),
+                        'name': coin.get('name', ''),
+                        'current_price': coin['current_price'],
+                        'market_cap': coin.get('market_cap'),
+                        'total_volume': coin.get('total_volume'),
+                        'high_24h': coin.get('high_24h'),
+                        'low_24h': coin.get('low_24h'),
+                        'price_change_24h': coin.get('price_change_24h'),
+                        'price_change_percentage_24h': coin.get('price_change_percentage_24h'),
+                        'timestamp': timestamp
+                    }
+            except Exception as e:
+                logger.error(f"Failed to fetch bulk price data for {len(chunk)} coins: {e}")
+        
+        return results
+    
     def get_historical_data(
         self, 
         coin_id: str, 
@@ -3,12 +3,15 @@ llama.cpp Client Module
 Handles communication with local llama.cpp server for LLM inference
 """
 
+import asyncio
 import json
 import logging
 import time
-from typing import Optional, Dict, Any
+import weakref
+from typing import Optional, Dict, Any, Tuple
 from dataclasses import dataclass
 
+import httpx
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
@@ -79,6 +82,11 @@ class LlamaCppClient:
         # Configure session with retry strategy
         self.session = self._create_session(max_retries, backoff_factor)
         
+        # Async HTTP clients, one per event loop, created on first async call
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+            weakref.WeakKeyDictionary()
+        )
+        
         logger.info(
             f"Initialized LlamaCppClient: base_url={self.base_url}, "
             f"timeout={self.timeout}s, max_retries={max_retries}"
@@ -118,7 +126,8 @@ class LlamaCppClient:
         system_prompt: Optional[str] = None,
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
-        stop: Optional[list] = None
+        stop: Optional[list] = None,
+        json_schema: Optional[Dict[str, Any]] = None
     ) -> LLMResponse:
         """
         Generate text completion from llama.cpp server
@@ -129,6 +138,7 @@ class LlamaCppClient:
             temperature: Sampling temperature (default from settings)
             max_tokens: Maximum tokens to generate (default from settings)
             stop: Optional list of stop sequences
+            json_schema: Optional JSON schema the output is constrained to
             
         Returns:
             LLMResponse with generated content
@@ -141,7 +151,9 @@ class LlamaCppClient:
         temperature = temperature if temperature is not None else settings.llm_temperature
         max_tokens = max_tokens if max_tokens is not None else settings.llm_max_tokens
         
-        # Build the full prompt with system message if provided
+        # Build the full prompt with system message if provided.
+        # The static system prompt always comes first so consecutive calls
+        # that share it also share the same token prefix.
         full_prompt = prompt
         if system_prompt:
             full_prompt = f"{system_prompt}\n\n{prompt}"
@@ -151,8 +163,13 @@ class LlamaCppClient:
             "temperature": temperature,
             "n_predict": max_tokens,
             "stop": stop or [],
-            "stream": False
+            "stream": False,
+            # Let llama.cpp reuse the KV cache for the common prompt prefix
+            # instead of re-evaluating the system prompt on every call
+            "cache_prompt": True
         }
+        if json_schema is not None:
+            payload["json_schema"] = json_schema
         
         logger.debug(f"Sending request to llama.cpp: temperature={temperature}, max_tokens={max_tokens}")
         
@@ -234,7 +251,8 @@ class LlamaCppClient:
         prompt: str,
         system_prompt: Optional[str] = None,
         temperature: Optional[float] = None,
-        max_tokens: Optional[int] = None
+        max_tokens: Optional[int] = None,
+        json_schema: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
         Generate JSON response from llama.cpp server
@@ -247,6 +265,7 @@ class LlamaCppClient:
             system_prompt: Optional system prompt
             temperature: Sampling temperature
             max_tokens: Maximum tokens to generate
+            json_schema: Optional JSON schema the output is constrained to
             
         Returns:
             Parsed JSON dictionary
@@ -258,12 +277,28 @@ class LlamaCppClient:
             prompt=prompt,
             system_prompt=system_prompt,
             temperature=temperature,
-            max_tokens=max_tokens
+            max_tokens=max_tokens,
+            json_schema=json_schema
         )
         
+        return self._parse_json_content(response.content)
+    
+    def _parse_json_content(self, raw_content: str) -> Dict[str, Any]:
+        """
+        Extract and parse the JSON object in an LLM response
+        
+        Args:
+            raw_content: Generated text
+            
+        Returns:
+            Parsed JSON dictionary
+            
+        Raises:
+            LlamaCppClientError: If response is not valid JSON
+        """
         try:
             # Try to extract JSON from response
-            content = response.content.strip()
+            content = raw_content.strip()
             
             # Handle cases where LLM wraps JSON in markdown code blocks
             if "```json" in content:
@@ -308,11 +343,301 @@ class LlamaCppClient:
             return json.loads(content)
             
         except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse LLM response as JSON: {e}\nResponse: {response.content}")
+            logger.error(f"Failed to parse LLM response as JSON: {e}\nResponse: {raw_content}")
             raise LlamaCppClientError(
                 f"LLM response is not valid JSON: {str(e)}"
             ) from e
     
+    async def agenerate(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        stop: Optional[list] = None,
+        stop_after_json: bool = False,
+        json_schema: Optional[Dict[str, Any]] = None
+    ) -> LLMResponse:
+        """
+        Generate text completion from llama.cpp server without blocking
+
+        Async counterpart of generate(). The completion is streamed, so many
+        calls can be awaited concurrently (e.g. with asyncio.gather) and be
+        served by the server's parallel slots.
+
+        Args:
+            prompt: User prompt text
+            system_prompt: Optional system prompt for context
+            temperature: Sampling temperature (default from settings)
+            max_tokens: Maximum tokens to generate (default from settings)
+            stop: Optional list of stop sequences
+            stop_after_json: Close the stream as soon as the first JSON
+                object in the output is complete (stops generation early)
+            json_schema: Optional JSON schema the output is constrained to
+                (grammar-constrained sampling on the llama.cpp server)
+
+        Returns:
+            LLMResponse with generated content
+
+        Raises:
+            LlamaCppConnectionError: If connection fails
+            LlamaCppTimeoutError: If request times out
+            LlamaCppClientError: For other errors
+        """
+        temperature = temperature if temperature is not None else settings.llm_temperature
+        max_tokens = max_tokens if max_tokens is not None else settings.llm_max_tokens
+
+        # Same prompt layout as generate() so both share the cached prefix
+        full_prompt = prompt
+        if system_prompt:
+            full_prompt = f"{system_prompt}\n\n{prompt}"
+
+        payload = {
+            "prompt": full_prompt,
+            "temperature": temperature,
+            "n_predict": max_tokens,
+            "stop": stop or [],
+            "stream": True,
+            "cache_prompt": True
+        }
+
+        if json_schema is not None:
+            payload["json_schema"] = json_schema
+
+        logger.debug(f"Streaming request to llama.cpp: temperature={temperature}, max_tokens={max_tokens}")
+
+        start_time = time.time()
+
+        try:
+            content, tokens_generated = await self._stream_completion(payload, stop_after_json)
+            generation_time = time.time() - start_time
+
+            if not content:
+                logger.warning("llama.cpp returned empty content")
+
+            logger.info(
+                f"LLM generation completed: {tokens_generated} tokens "
+                f"in {generation_time:.2f}s"
+            )
+            self._record_inference(generation_time, tokens_generated, success=True)
+
+            return LLMResponse(
+                content=content,
+                tokens_generated=tokens_generated,
+                generation_time=generation_time
+            )
+
+        except httpx.TimeoutException as e:
+            self._record_inference(time.time() - start_time, success=False)
+            logger.error(f"llama.cpp request timed out after {self.timeout}s: {e}")
+            raise LlamaCppTimeoutError(f"Request timed out after {self.timeout}s") from e
+
+        except httpx.TransportError as e:
+            self._record_inference(time.time() - start_time, success=False)
+            logger.error(f"Failed to connect to llama.cpp server at {self.base_url}: {e}")
+            raise LlamaCppConnectionError(
+                f"Cannot connect to llama.cpp server at {self.base_url}. "
+                "Ensure the server is running."
+            ) from e
+
+        except LlamaCppClientError:
+            self._record_inference(time.time() - start_time, success=False)
+            raise
+
+        except Exception as e:
+            self._record_inference(time.time() - start_time, success=False)
+            logger.error(f"Unexpected error during LLM generation: {e}", exc_info=True)
+            raise LlamaCppClientError(f"LLM generation failed: {str(e)}") from e
+
+    async def agenerate_json(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        json_schema: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Generate JSON response from llama.cpp server without blocking
+
+        Async counterpart of generate_json(). Generation is stopped once the
+        JSON object is complete, so trailing text is never generated. With a
+        json_schema the grammar already ends generation there, so the stream
+        is read to the end.
+
+        Args:
+            prompt: User prompt text (should request JSON output)
+            system_prompt: Optional system prompt
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens to generate
+            json_schema: Optional JSON schema the output is constrained to
+
+        Returns:
+            Parsed JSON dictionary
+
+        Raises:
+            LlamaCppClientError: If response is not valid JSON
+        """
+        response = await self.agenerate(
+            prompt=prompt,
+            system_prompt=system_prompt,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stop_after_json=json_schema is None,
+            json_schema=json_schema
+        )
+
+        return self._parse_json_content(response.content)
+
+    async def awarmup(self, system_prompt: str) -> bool:
+        """
+        Pre-fill the server's prompt cache with a system prompt
+
+        Sends the system prompt as a prompt prefix with cache_prompt so that
+        later requests starting with it skip tokenizing and prefilling it.
+        Best effort: failures are logged and reported, never raised.
+
+        Args:
+            system_prompt: System prompt used by later requests
+
+        Returns:
+            True if the server processed the warmup request
+        """
+        payload = {
+            "prompt": f"{system_prompt}\n\n",
+            "n_predict": 1,
+            "temperature": 0.0,
+            "stream": False,
+            "cache_prompt": True
+        }
+
+        try:
+            client = self._get_async_client()
+            response = await client.post(f"{self.base_url}/completion", json=payload)
+            if response.status_code != 200:
+                logger.warning(f"llama.cpp prompt cache warmup returned status {response.status_code}")
+                return False
+
+            logger.info("llama.cpp prompt cache warmed up")
+            return True
+
+        except httpx.HTTPError as e:
+            logger.warning(f"llama.cpp prompt cache warmup failed: {e}")
+            return False
+
+    async def _stream_completion(
+        self,
+        payload: Dict[str, Any],
+        stop_after_json: bool
+    ) -> Tuple[str, Optional[int]]:
+        """
+        Stream a completion from the llama.cpp /completion endpoint
+
+        llama.cpp sends server-sent events ("data: {...}") carrying one
+        token's content each; the last event has "stop": true and the token
+        counts. Closing the stream early makes the server stop generating.
+
+        Args:
+            payload: Request payload dictionary (with "stream": True)
+            stop_after_json: Stop once the first JSON object is complete
+
+        Returns:
+            Tuple of (generated content, tokens generated)
+
+        Raises:
+            LlamaCppClientError: On HTTP or event format errors
+        """
+        client = self._get_async_client()
+        pieces = []
+        tokens_generated = None
+        depth = 0
+        json_started = False
+        # Braces inside JSON strings don't change the depth
+        in_string = False
+        escaped = False
+
+        async with client.stream("POST", f"{self.base_url}/completion", json=payload) as response:
+            if response.status_code != 200:
+                body = (await response.aread()).decode("utf-8", errors="replace")
+                error_msg = f"llama.cpp server returned status {response.status_code}: {body}"
+                logger.error(error_msg)
+                raise LlamaCppClientError(error_msg)
+
+            async for line in response.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
+
+                try:
+                    event = json.loads(line[6:])
+                except json.JSONDecodeError as e:
+                    raise LlamaCppClientError(f"Invalid stream event from llama.cpp: {str(e)}") from e
+
+                piece = event.get("content", "")
+                pieces.append(piece)
+
+                if event.get("stop"):
+                    tokens_generated = event.get("tokens_predicted", event.get("tokens_evaluated"))
+                    break
+
+                if stop_after_json:
+                    for char in piece:
+                        if in_string:
+                            if escaped:
+                                escaped = False
+                            elif char == "\\":
+                                escaped = True
+                            elif char == '"':
+                                in_string = False
+                        elif char == '"' and json_started:
+                            in_string = True
+                        elif char == "{":
+                            depth += 1
+                            json_started = True
+                        elif char == "}" and json_started:
+                            depth -= 1
+
+                    if json_started and depth <= 0:
+                        # One event per token, so the event count is the token count
+                        tokens_generated = len(pieces)
+                        break
+
+        return "".join(pieces), tokens_generated
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """
+        Get the async HTTP client for the running event loop
+
+        httpx connections belong to the loop they were opened on, so each
+        loop gets its own pooled (keep-alive) client, created on first use.
+
+        Returns:
+            httpx.AsyncClient (connection failures are retried max_retries times)
+        """
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(
+                timeout=self.timeout,
+                headers={"Content-Type": "application/json"},
+                transport=httpx.AsyncHTTPTransport(retries=self.max_retries)
+            )
+            self._async_clients[loop] = client
+        return client
+
+    def _record_inference(
+        self,
+        generation_time: float,
+        tokens_generated: Optional[int] = None,
+        success: bool = True
+    ):
+        """Record LLM inference metrics (best effort)"""
+        try:
+            from services.monitoring import get_metrics_collector
+            collector = get_metrics_collector()
+            collector.record_llm_inference(generation_time, tokens_generated, success=success)
+        except Exception as metric_error:
+            logger.debug(f"Failed to record LLM metrics: {metric_error}")
+
     def _make_request(self, payload: Dict[str, Any]) -> requests.Response:
         """
         Make HTTP POST request to llama.cpp /completion endpoint
@@ -415,6 +740,23 @@ class LlamaCppClient:
         """Close the HTTP session"""
         self.session.close()
         logger.debug("LlamaCppClient session closed")
+
+    async def close_async_client(self):
+        """
+        Close the async HTTP client of the running event loop
+
+        Close it before the loop ends (e.g. at the end of asyncio.run()).
+        Clients of other loops are left open; a new client is created on
+        the next async call.
+        """
+        client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    async def aclose(self):
+        """Close the HTTP session and the async HTTP client"""
+        await self.close_async_client()
+        self.close()
     
     def __enter__(self):
         """Context manager entry"""
@@ -423,3 +765,23 @@ class LlamaCppClient:
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Context manager exit"""
         self.close()
+
+
+# Global client instance
+_llama_client: Optional[LlamaCppClient] = None
+
+
+def get_llama_client() -> LlamaCppClient:
+    """
+    Get the process-wide llama.cpp client
+
+    Sharing one client keeps its pooled keep-alive connections to the
+    llama.cpp server across requests. Do not close it.
+
+    Returns:
+        LlamaCppClient instance
+    """
+    global _llama_client
+    if _llama_client is None:
+        _llama_client = LlamaCppClient()
+    return _llama_client
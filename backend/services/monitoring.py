@@ -5,50 +5,208 @@ Tracks API performance, LLM inference times, and trading success rates
 
 import time
 import logging
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Tuple
 from datetime import datetime, timedelta
-from collections import defaultdict, deque
+from dataclasses import dataclass
 from threading import Lock
 import json
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
 
+class RollingWindow:
+    """
+    Fixed-size window of recent values backed by a numpy ring buffer
+
+    Values are stored unboxed in a preallocated array, so appends do not
+    allocate and min/max/percentiles run vectorized over the buffer. A running
+    sum keeps total and mean O(1).
+    """
+    
+    def __init__(self, maxlen: int, dtype=np.float64):
+        """
+        Initialize rolling window
+        
+        Args:
+            maxlen: Maximum number of values to keep
+            dtype: numpy dtype of the stored values
+        """
+        self.maxlen = maxlen
+        self._buffer = np.empty(maxlen, dtype=dtype)
+        self._index: int = 0
+        self._filled: int = 0
+        self._sum: float = 0
+    
+    def append(self, value: float):
+        """
+        Add a value, overwriting the oldest one if the window is full
+        
+        Args:
+            value: Value to add
+        """
+        if self._filled == self.maxlen:
+            self._sum -= self._buffer[self._index].item()
+        else:
+            self._filled += 1
+        
+        self._buffer[self._index] = value
+        self._sum += value
+        self._index = (self._index + 1) % self.maxlen
+    
+    def clear(self):
+        """Remove all values"""
+        self._index = 0
+        self._filled = 0
+        self._sum = 0
+    
+    def values(self) -> np.ndarray:
+        """
+        Get a view of the stored values
+        
+        Returns:
+            Array view of the window (not in insertion order once wrapped)
+        """
+        return self._buffer[:self._filled]
+    
+    def snapshot(self) -> "RollingWindow":
+        """
+        Copy the window so it can be read without holding the collector lock
+        
+        Only the filled part of the buffer is copied; the snapshot is meant
+        for reading and should not be appended to.
+        
+        Returns:
+            Independent RollingWindow with the same contents
+        """
+        copy = RollingWindow.__new__(RollingWindow)
+        copy.maxlen = self.maxlen
+        copy._buffer = self.values().copy()
+        copy._index = self._index
+        copy._filled = self._filled
+        copy._sum = self._sum
+        return copy
+    
+    def __len__(self) -> int:
+        return self._filled
+    
+    def __iter__(self):
+        return iter(self.values().tolist())
+    
+    @property
+    def total(self) -> float:
+        """Sum of values in the window"""
+        return self._sum if self._filled else 0
+    
+    @property
+    def mean(self) -> float:
+        """Mean of values in the window (0 if empty)"""
+        return self._sum / self._filled if self._filled else 0
+    
+    @property
+    def min(self) -> float:
+        """Minimum value in the window (0 if empty)"""
+        return self.values().min().item() if self._filled else 0
+    
+    @property
+    def max(self) -> float:
+        """Maximum value in the window (0 if empty)"""
+        return self.values().max().item() if self._filled else 0
+    
+    def percentiles(self, *percentiles: float) -> List[float]:
+        """
+        Calculate percentiles of the values in the window
+        
+        All requested percentiles are computed in a single numpy pass, which
+        uses selection rather than a full sort.
+        
+        Args:
+            percentiles: Percentiles to calculate (0-100)
+        
+        Returns:
+            Percentile values in the order requested (0 for each if empty)
+        """
+        if not self._filled:
+            return [0] * len(percentiles)
+        
+        return np.percentile(self.values(), percentiles, method="higher").tolist()
+    
+    def summary(self) -> Tuple[float, float, float, float, float]:
+        """
+        Calculate mean, min, max, p95 and p99 of the window
+        
+        min and max are taken as the 0th and 100th percentiles so every order
+        statistic comes out of one selection pass over the buffer.
+        
+        Returns:
+            Tuple of (mean, min, max, p95, p99), all 0 if empty
+        """
+        if not self._filled:
+            return 0, 0, 0, 0, 0
+        
+        low, p95, p99, high = np.percentile(
+            self.values(), (0, 95, 99, 100), method="higher"
+        ).tolist()
+        return self.mean, low, high, p95, p99
+
+
+@dataclass(slots=True)
+class EndpointStats:
+    """
+    Per-endpoint API metrics kept in a single slotted record
+    """
+    response_times: RollingWindow
+    request_count: int = 0
+    error_count: int = 0
+    
+    def snapshot(self) -> "EndpointStats":
+        """Copy the stats for reading outside the collector lock"""
+        return EndpointStats(self.response_times.snapshot(), self.request_count, self.error_count)
+
+
 class MetricsCollector:
     """
     Collects and aggregates application metrics
     """
     
-    def __init__(self, window_size: int = 1000):
+    def __init__(self, window_size: int = 1000, cache_ttl: float = 1.0):
         """
         Initialize metrics collector
         
         Args:
             window_size: Number of recent metrics to keep in memory
+            cache_ttl: Seconds to reuse the get_all_metrics result (0 disables)
         """
         self.window_size = window_size
+        self.cache_ttl = cache_ttl
         self._lock = Lock()
         
+        # Cached get_all_metrics result as (monotonic time, metrics)
+        self._cache_lock = Lock()
+        self._cached_all: Optional[tuple] = None
+        
         # API metrics
-        self.api_response_times: Dict[str, deque] = defaultdict(lambda: deque(maxlen=window_size))
-        self.api_request_counts: Dict[str, int] = defaultdict(int)
-        self.api_error_counts: Dict[str, int] = defaultdict(int)
+        self.api_endpoints: Dict[str, EndpointStats] = {}
+        self.api_total_requests: int = 0
+        self.api_total_errors: int = 0
         
         # LLM metrics
-        self.llm_inference_times: deque = deque(maxlen=window_size)
+        self.llm_inference_times = RollingWindow(window_size)
         self.llm_request_counts: int = 0
         self.llm_error_counts: int = 0
-        self.llm_token_counts: deque = deque(maxlen=window_size)
+        self.llm_token_counts = RollingWindow(window_size, dtype=np.int32)
         
         # Trading metrics
         self.trade_success_count: int = 0
         self.trade_failure_count: int = 0
-        self.trade_amounts: deque = deque(maxlen=window_size)
-        self.trade_profits: deque = deque(maxlen=window_size)
+        self.trade_amounts = RollingWindow(window_size)
+        self.trade_profits = RollingWindow(window_size)
         
         # System metrics
         self.start_time = datetime.now()
-        self.last_reset_time = datetime.now()
+        self.last_reset_time = self.start_time
+        self._start_monotonic = time.monotonic()
     
     def record_api_request(self, endpoint: str, response_time: float, success: bool = True):
         """
@@ -60,13 +218,22 @@ class MetricsCollector:
             success: Whether request was successful
         """
         with self._lock:
-            self.api_response_times[endpoint].append(response_time)
-            self.api_request_counts[endpoint] += 1
+            stats = self.api_endpoints.get(endpoint)
+            if stats is None:
+                stats = self.api_endpoints[endpoint] = EndpointStats(RollingWindow(self.window_size))
             
-            if not success:
-                self.api_error_counts[endpoint] += 1
+            stats.response_times.append(response_time)
+            stats.request_count += 1
+            self.api_total_requests += 1
             
-            logger.debug(f"API metric recorded: {endpoint} - {response_time:.3f}s - {'success' if success else 'error'}")
+            if not success:
+                stats.error_count += 1
+                self.api_total_errors += 1
+        
+        logger.debug(
+            "API metric recorded: %s - %.3fs - %s",
+            endpoint, response_time, 'success' if success else 'error'
+        )
     
     def record_llm_inference(self, inference_time: float, token_count: Optional[int] = None, success: bool = True):
         """
@@ -81,13 +248,16 @@ class MetricsCollector:
             self.llm_inference_times.append(inference_time)
             self.llm_request_counts += 1
             
-            if token_count:
+            if token_count is not None:
                 self.llm_token_counts.append(token_count)
             
             if not success:
                 self.llm_error_counts += 1
-            
-            logger.debug(f"LLM metric recorded: {inference_time:.3f}s - {token_count or 0} tokens - {'success' if success else 'error'}")
+        
+        logger.debug(
+            "LLM metric recorded: %.3fs - %s tokens - %s",
+            inference_time, token_count or 0, 'success' if success else 'error'
+        )
     
     def record_trade(self, amount: float, profit: Optional[float] = None, success: bool = True):
         """
@@ -108,8 +278,11 @@ class MetricsCollector:
                 self.trade_success_count += 1
             else:
                 self.trade_failure_count += 1
-            
-            logger.debug(f"Trade metric recorded: {amount} - profit: {profit} - {'success' if success else 'failure'}")
+        
+        logger.debug(
+            "Trade metric recorded: %s - profit: %s - %s",
+            amount, profit, 'success' if success else 'failure'
+        )
     
     def get_api_metrics(self, endpoint: Optional[str] = None) -> Dict:
         """
@@ -121,40 +294,57 @@ class MetricsCollector:
         Returns:
             Dictionary containing API metrics
         """
+        # Copy state under the lock and aggregate outside it, so a scrape only
+        # blocks record_* calls for the duration of a few buffer copies
         with self._lock:
             if endpoint:
-                response_times = list(self.api_response_times.get(endpoint, []))
-                return {
-                    "endpoint": endpoint,
-                    "request_count": self.api_request_counts.get(endpoint, 0),
-                    "error_count": self.api_error_counts.get(endpoint, 0),
-                    "avg_response_time": sum(response_times) / len(response_times) if response_times else 0,
-                    "min_response_time": min(response_times) if response_times else 0,
-                    "max_response_time": max(response_times) if response_times else 0,
-                    "p95_response_time": self._percentile(response_times, 95) if response_times else 0,
-                    "p99_response_time": self._percentile(response_times, 99) if response_times else 0,
-                }
+                stats = self.api_endpoints.get(endpoint)
+                snapshots = [(endpoint, stats.snapshot() if stats else None)]
             else:
-                # Aggregate metrics for all endpoints
-                all_metrics = {}
-                for ep in list(self.api_response_times.keys()):
-                    response_times = list(self.api_response_times.get(ep, []))
-                    all_metrics[ep] = {
-                        "endpoint": ep,
-                        "request_count": self.api_request_counts.get(ep, 0),
-                        "error_count": self.api_error_counts.get(ep, 0),
-                        "avg_response_time": sum(response_times) / len(response_times) if response_times else 0,
-                        "min_response_time": min(response_times) if response_times else 0,
-                        "max_response_time": max(response_times) if response_times else 0,
-                        "p95_response_time": self._percentile(response_times, 95) if response_times else 0,
-                        "p99_response_time": self._percentile(response_times, 99) if response_times else 0,
-                    }
-                
-                return {
-                    "endpoints": all_metrics,
-                    "total_requests": sum(self.api_request_counts.values()),
-                    "total_errors": sum(self.api_error_counts.values()),
-                }
+                snapshots = [(ep, stats.snapshot()) for ep, stats in self.api_endpoints.items()]
+            total_requests = self.api_total_requests
+            total_errors = self.api_total_errors
+        
+        if endpoint:
+            return self._endpoint_metrics(*snapshots[0])
+        
+        # Aggregate metrics for all endpoints
+        all_metrics = {}
+        for ep, stats in snapshots:
+            all_metrics[ep] = self._endpoint_metrics(ep, stats)
+        
+        return {
+            "endpoints": all_metrics,
+            "total_requests": total_requests,
+            "total_errors": total_errors,
+        }
+    
+    @staticmethod
+    def _endpoint_metrics(endpoint: str, stats: Optional[EndpointStats]) -> Dict:
+        """
+        Build metrics summary for a single endpoint
+        
+        Args:
+            endpoint: API endpoint path
+            stats: Snapshot of the endpoint's stats (None if never recorded)
+        
+        Returns:
+            Dictionary containing endpoint metrics
+        """
+        if stats is None:
+            stats = EndpointStats(RollingWindow(0))
+        
+        avg, low, high, p95, p99 = stats.response_times.summary()
+        return {
+            "endpoint": endpoint,
+            "request_count": stats.request_count,
+            "error_count": stats.error_count,
+            "avg_response_time": avg,
+            "min_response_time": low,
+            "max_response_time": high,
+            "p95_response_time": p95,
+            "p99_response_time": p99,
+        }
     
     def get_llm_metrics(self) -> Dict:
         """
@@ -164,21 +354,26 @@ class MetricsCollector:
             Dictionary containing LLM metrics
         """
         with self._lock:
-            inference_times = list(self.llm_inference_times)
-            token_counts = list(self.llm_token_counts)
-            
-            return {
-                "request_count": self.llm_request_counts,
-                "error_count": self.llm_error_counts,
-                "success_rate": (self.llm_request_counts - self.llm_error_counts) / self.llm_request_counts if self.llm_request_counts > 0 else 0,
-                "avg_inference_time": sum(inference_times) / len(inference_times) if inference_times else 0,
-                "min_inference_time": min(inference_times) if inference_times else 0,
-                "max_inference_time": max(inference_times) if inference_times else 0,
-                "p95_inference_time": self._percentile(inference_times, 95) if inference_times else 0,
-                "p99_inference_time": self._percentile(inference_times, 99) if inference_times else 0,
-                "avg_tokens": sum(token_counts) / len(token_counts) if token_counts else 0,
-                "total_tokens": sum(token_counts),
-            }
+            request_count = self.llm_request_counts
+            error_count = self.llm_error_counts
+            inference_times = self.llm_inference_times.snapshot()
+            avg_tokens = self.llm_token_counts.mean
+            total_tokens = self.llm_token_counts.total
+        
+        avg, low, high, p95, p99 = inference_times.summary()
+        
+        return {
+            "request_count": request_count,
+            "error_count": error_count,
+            "success_rate": (request_count - error_count) / request_count if request_count > 0 else 0,
+            "avg_inference_time": avg,
+            "min_inference_time": low,
+            "max_inference_time": high,
+            "p95_inference_time": p95,
+            "p99_inference_time": p99,
+            "avg_tokens": avg_tokens,
+            "total_tokens": total_tokens,
+        }
     
     def get_trading_metrics(self) -> Dict:
         """
@@ -188,22 +383,26 @@ class MetricsCollector:
             Dictionary containing trading metrics
         """
         with self._lock:
-            trade_amounts = list(self.trade_amounts)
-            trade_profits = list(self.trade_profits)
-            
-            total_trades = self.trade_success_count + self.trade_failure_count
-            
-            return {
-                "total_trades": total_trades,
-                "success_count": self.trade_success_count,
-                "failure_count": self.trade_failure_count,
-                "success_rate": self.trade_success_count / total_trades if total_trades > 0 else 0,
-                "total_volume": sum(trade_amounts),
-                "avg_trade_amount": sum(trade_amounts) / len(trade_amounts) if trade_amounts else 0,
-                "total_profit": sum(trade_profits),
-                "avg_profit": sum(trade_profits) / len(trade_profits) if trade_profits else 0,
-                "win_rate": len([p for p in trade_profits if p > 0]) / len(trade_profits) if trade_profits else 0,
-            }
+            success_count = self.trade_success_count
+            failure_count = self.trade_failure_count
+            total_volume = self.trade_amounts.total
+            avg_trade_amount = self.trade_amounts.mean
+            trade_profits = self.trade_profits.snapshot()
+        
+        total_trades = success_count + failure_count
+        profits = trade_profits.values()
+        
+        return {
+            "total_trades": total_trades,
+            "success_count": success_count,
+            "failure_count": failure_count,
+            "success_rate": success_count / total_trades if total_trades > 0 else 0,
+            "total_volume": total_volume,
+            "avg_trade_amount": avg_trade_amount,
+            "total_profit": trade_profits.total,
+            "avg_profit": trade_profits.mean,
+            "win_rate": int(np.count_nonzero(profits > 0)) / profits.size if profits.size else 0,
+        }
     
     def get_system_metrics(self) -> Dict:
         """
@@ -212,11 +411,11 @@ class MetricsCollector:
         Returns:
             Dictionary containing system metrics
         """
-        uptime = datetime.now() - self.start_time
+        uptime_seconds = time.monotonic() - self._start_monotonic
         
         return {
-            "uptime_seconds": uptime.total_seconds(),
-            "uptime_hours": uptime.total_seconds() / 3600,
+            "uptime_seconds": uptime_seconds,
+            "uptime_hours": uptime_seconds / 3600,
             "start_time": self.start_time.isoformat(),
             "last_reset_time": self.last_reset_time.isoformat(),
         }
@@ -225,23 +424,38 @@ class MetricsCollector:
         """
         Get all metrics
         
+        Results are reused for cache_ttl seconds so concurrent scrapes share
+        one aggregation; callers must not mutate the returned dictionary.
+        
         Returns:
             Dictionary containing all metrics
         """
-        return {
-            "timestamp": datetime.now().isoformat(),
-            "system": self.get_system_metrics(),
-            "api": self.get_api_metrics(),
-            "llm": self.get_llm_metrics(),
-            "trading": self.get_trading_metrics(),
-        }
+        cached = self._cached_all
+        if cached and time.monotonic() - cached[0] < self.cache_ttl:
+            return cached[1]
+        
+        with self._cache_lock:
+            # Another caller may have rebuilt the cache while we waited
+            cached = self._cached_all
+            if cached and time.monotonic() - cached[0] < self.cache_ttl:
+                return cached[1]
+            
+            metrics = {
+                "timestamp": datetime.now().isoformat(),
+                "system": self.get_system_metrics(),
+                "api": self.get_api_metrics(),
+                "llm": self.get_llm_metrics(),
+                "trading": self.get_trading_metrics(),
+            }
+            self._cached_all = (time.monotonic(), metrics)
+            return metrics
     
     def reset_metrics(self):
         """Reset all metrics"""
         with self._lock:
-            self.api_response_times.clear()
-            self.api_request_counts.clear()
-            self.api_error_counts.clear()
+            self.api_endpoints.clear()
+            self.api_total_requests = 0
+            self.api_total_errors = 0
             
             self.llm_inference_times.clear()
             self.llm_request_counts = 0
@@ -254,27 +468,9 @@ class MetricsCollector:
             self.trade_profits.clear()
             
             self.last_reset_time = datetime.now()
+            self._cached_all = None
             
             logger.info("Metrics reset")
-    
-    @staticmethod
-    def _percentile(data: List[float], percentile: int) -> float:
-        """
-        Calculate percentile of data
-        
-        Args:
-            data: List of values
-            percentile: Percentile to calculate (0-100)
-        
-        Returns:
-            Percentile value
-        """
-        if not data:
-            return 0
-        
-        sorted_data = sorted(data)
-        index = int(len(sorted_data) * percentile / 100)
-        return sorted_data[min(index, len(sorted_data) - 1)]
 
 
 # Global metrics collector instance
@@ -3,10 +3,14 @@ Multi-asset management service
 Coordinates data collection across stocks, crypto, and forex
 """
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
+
+import numpy as np
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import bindparam, desc, func, select, update
 
 try:
     from models.asset_models import Asset, AssetPrice, AssetSentiment, AssetHolding, AssetType
@@ -21,14 +25,22 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on concurrent external price requests in update_all_prices
+MAX_PRICE_FETCH_WORKERS = 16
+
 
 class MultiAssetService:
     """Service for managing multiple asset types"""
     
+    ASSET_CACHE_TTL_SECONDS = 30
+    
     def __init__(self, db: Session, forex_api_key: Optional[str] = None):
         self.db = db
         self.crypto_collector = CryptoDataCollector()
         self.forex_collector = ForexDataCollector(api_key=forex_api_key)
+        # Active assets grouped by type as (monotonic load time, assets by type).
+        # Kept per instance because the cached rows belong to self.db.
+        self._asset_cache: Optional[Tuple[float, Dict[AssetType, List[Asset]]]] = None
     
     def add_asset(
         self,
@@ -51,6 +63,7 @@ class MultiAssetService:
         self.db.add(asset)
         self.db.commit()
         self.db.refresh(asset)
+        self._asset_cache = None
         logger.info(f"Added new asset: {symbol} ({asset_type})")
         return asset
     
@@ -63,13 +76,34 @@ class MultiAssetService:
     
     def list_assets(self, asset_type: Optional[AssetType] = None) -> List[Asset]:
         """List all assets, optionally filtered by type"""
-        query = self.db.query(Asset).filter(Asset.is_active == 1)
+        cache = self._asset_cache
+        if cache is None or time.monotonic() - cache[0] >= self.ASSET_CACHE_TTL_SECONDS:
+            assets_by_type: Dict[AssetType, List[Asset]] = {t: [] for t in AssetType}
+            for asset in self.db.query(Asset).filter(Asset.is_active == 1).all():
+                assets_by_type[asset.asset_type].append(asset)
+            cache = (time.monotonic(), assets_by_type)
+            self._asset_cache = cache
+        
+        assets_by_type = cache[1]
         if asset_type:
-            query = query.filter(Asset.asset_type == asset_type)
-        return query.all()
+            return list(assets_by_type[asset_type])
+        return [asset for assets in assets_by_type.values() for asset in assets]
     
-    def update_crypto_price(self, asset: Asset) -> Optional[AssetPrice]:
-        """Update cryptocurrency price"""
+    @staticmethod
+    def _crypto_price_from_data(asset: Asset, price_data: Dict) -> AssetPrice:
+        """Build an unsaved AssetPrice row from collector price data"""
+        return AssetPrice(
+            asset_id=asset.id,
+            timestamp=price_data['timestamp'],
+            close_price=price_data['current_price'],
+            high_price=price_data.get('high_24h'),
+            low_price=price_data.get('low_24h'),
+            volume=price_data.get('total_volume'),
+            market_cap=price_data.get('market_cap')
+        )
+    
+    def _build_crypto_price(self, asset: Asset) -> Optional[AssetPrice]:
+        """Fetch cryptocurrency price and build an unsaved AssetPrice row"""
         if asset.asset_type != AssetType.CRYPTO:
             return None
         
@@ -80,23 +114,10 @@ class MultiAssetService:
         if not price_data:
             return None
         
-        asset_price = AssetPrice(
-            asset_id=asset.id,
-            timestamp=price_data['timestamp'],
-            close_price=price_data['current_price'],
-            high_price=price_data.get('high_24h'),
-            low_price=price_data.get('low_24h'),
-            volume=price_data.get('total_volume'),
-            market_cap=price_data.get('market_cap')
-        )
-        
-        self.db.add(asset_price)
-        self.db.commit()
-        self.db.refresh(asset_price)
-        return asset_price
+        return self._crypto_price_from_data(asset, price_data)
     
-    def update_forex_rate(self, asset: Asset) -> Optional[AssetPrice]:
-        """Update forex exchange rate"""
+    def _build_forex_price(self, asset: Asset) -> Optional[AssetPrice]:
+        """Fetch forex exchange rate and build an unsaved AssetPrice row"""
         if asset.asset_type != AssetType.FOREX:
             return None
         
@@ -112,11 +133,28 @@ class MultiAssetService:
         if not rate_data:
             return None
         
-        asset_price = AssetPrice(
+        return AssetPrice(
             asset_id=asset.id,
             timestamp=rate_data['timestamp'],
             close_price=rate_data['rate']
         )
+    
+    def update_crypto_price(self, asset: Asset) -> Optional[AssetPrice]:
+        """Update cryptocurrency price"""
+        asset_price = self._build_crypto_price(asset)
+        if not asset_price:
+            return None
+        
+        self.db.add(asset_price)
+        self.db.commit()
+        self.db.refresh(asset_price)
+        return asset_price
+    
+    def update_forex_rate(self, asset: Asset) -> Optional[AssetPrice]:
+        """Update forex exchange rate"""
+        asset_price = self._build_forex_price(asset)
+        if not asset_price:
+            return None
         
         self.db.add(asset_price)
         self.db.commit()
@@ -126,20 +164,64 @@ class MultiAssetService:
     def update_all_prices(self) -> Dict[str, int]:
         """Update prices for all active assets"""
         stats = {'stock': 0, 'crypto': 0, 'forex': 0, 'errors': 0}
+        new_prices: List[AssetPrice] = []
+        
+        # Stock prices handled by existing stock_data_collector
+        crypto_assets = self.list_assets(AssetType.CRYPTO)
+        forex_assets = self.list_assets(AssetType.FOREX)
+        
+        if crypto_assets or forex_assets:
+            # External API calls are I/O bound, so fetch them concurrently and
+            # keep all session work on this thread. All crypto prices come
+            # from a single batched CoinGecko request.
+            workers = min(MAX_PRICE_FETCH_WORKERS, len(forex_assets) + 1)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                crypto_future = None
+                if crypto_assets:
+                    crypto_future = executor.submit(
+                        self.crypto_collector.get_prices_bulk,
+                        [asset.symbol.lower() for asset in crypto_assets]
+                    )
+                forex_futures = [
+                    (asset, executor.submit(self._build_forex_price, asset))
+                    for asset in forex_assets
+                ]
+                
+                if crypto_future:
+                    try:
+                        crypto_prices = crypto_future.result()
+                    except Exception as e:
+                        logger.error(f"Failed to update crypto prices: {e}")
+                        crypto_prices = {}
+                        stats['errors'] += len(crypto_assets)
+                    
+                    for asset in crypto_assets:
+                        price_data = crypto_prices.get(asset.symbol.lower())
+                        if price_data:
+                            new_prices.append(self._crypto_price_from_data(asset, price_data))
+                            stats['crypto'] += 1
+                
+                for asset, future in forex_futures:
+                    try:
+                        asset_price = future.result()
+                        if asset_price:
+                            new_prices.append(asset_price)
+                            stats['forex'] += 1
+                    except Exception as e:
+                        logger.error(f"Failed to update price for {asset.symbol}: {e}")
+                        stats['errors'] += 1
         
-        assets = self.list_assets()
-        for asset in assets:
+        # Write all collected prices in a single round-trip
+        if new_prices:
             try:
-                if asset.asset_type == AssetType.CRYPTO:
-                    if self.update_crypto_price(asset):
-                        stats['crypto'] += 1
-                elif asset.asset_type == AssetType.FOREX:
-                    if self.update_forex_rate(asset):
-                        stats['forex'] += 1
-                # Stock prices handled by existing stock_data_collector
+                self.db.bulk_save_objects(new_prices)
+                self.db.commit()
             except Exception as e:
-                logger.error(f"Failed to update price for {asset.symbol}: {e}")
-                stats['errors'] += 1
+                self.db.rollback()
+                logger.error(f"Failed to save {len(new_prices)} prices: {e}")
+                stats['errors'] += stats['crypto'] + stats['forex']
+                stats['crypto'] = 0
+                stats['forex'] = 0
         
         logger.info(f"Price update complete: {stats}")
         return stats
@@ -151,6 +233,29 @@ class MultiAssetService:
             .order_by(desc(AssetPrice.timestamp))\
             .first()
     
+    def get_latest_close_prices(self, asset_ids: List[int]) -> Dict[int, float]:
+        """Get latest close price for many assets in a single query"""
+        if not asset_ids:
+            return {}
+        
+        latest = self.db.query(
+            AssetPrice.asset_id,
+            func.max(AssetPrice.timestamp).label('timestamp')
+        )\
+            .filter(AssetPrice.asset_id.in_(asset_ids))\
+            .group_by(AssetPrice.asset_id)\
+            .subquery()
+        
+        rows = self.db.query(AssetPrice.asset_id, AssetPrice.close_price)\
+            .join(
+                latest,
+                (AssetPrice.asset_id == latest.c.asset_id) &
+                (AssetPrice.timestamp == latest.c.timestamp)
+            )\
+            .all()
+        
+        return {asset_id: close_price for asset_id, close_price in rows}
+    
     def get_price_history(
         self,
         asset_id: int,
@@ -168,36 +273,88 @@ class MultiAssetService:
     
     def get_portfolio_summary(self) -> PortfolioSummary:
         """Get portfolio summary across all asset types"""
-        holdings = self.db.query(AssetHolding).all()
-        
-        total_value = 0.0
-        total_cost = 0.0
-        stock_value = 0.0
-        crypto_value = 0.0
-        forex_value = 0.0
-        
-        for holding in holdings:
-            # Update current price
-            latest_price = self.get_latest_price(holding.asset_id)
-            if latest_price:
-                holding.current_price = latest_price.close_price
-                holding.total_value = holding.quantity * holding.current_price
-                cost = holding.quantity * holding.average_price
-                holding.profit_loss = holding.total_value - cost
-                holding.profit_loss_percent = (holding.profit_loss / cost * 100) if cost > 0 else 0
-                
-                total_value += holding.total_value
-                total_cost += cost
-                
-                # Categorize by asset type
-                if holding.asset.asset_type == AssetType.STOCK:
-                    stock_value += holding.total_value
-                elif holding.asset.asset_type == AssetType.CRYPTO:
-                    crypto_value += holding.total_value
-                elif holding.asset.asset_type == AssetType.FOREX:
-                    forex_value += holding.total_value
+        holding_table = AssetHolding.__table__
+        asset_table = Asset.__table__
         
-        self.db.commit()
+        # Read plain rows through Core: no identity map or change tracking
+        rows = self.db.execute(
+            select(holding_table, *[column.label(f"asset__{column.name}") for column in asset_table.c])
+            .join_from(holding_table, asset_table, holding_table.c.asset_id == asset_table.c.id)
+        ).mappings().all()
+        
+        holdings = []
+        for row in rows:
+            holding = {column.name: row[column.name] for column in holding_table.c}
+            holding['asset'] = {column.name: row[f"asset__{column.name}"] for column in asset_table.c}
+            holdings.append(holding)
+        
+        latest_prices = self.get_latest_close_prices(
+            list({holding['asset_id'] for holding in holdings})
+        )
+        
+        # Only holdings with a known price contribute to the summary
+        priced = [holding for holding in holdings if holding['asset_id'] in latest_prices]
+        
+        quantity = np.array([holding['quantity'] for holding in priced], dtype=np.float64)
+        average_price = np.array([holding['average_price'] for holding in priced], dtype=np.float64)
+        current_price = np.array([latest_prices[holding['asset_id']] for holding in priced], dtype=np.float64)
+        asset_types = np.array([holding['asset']['asset_type'].value for holding in priced], dtype=object)
+        
+        values = quantity * current_price
+        costs = quantity * average_price
+        profit_loss = values - costs
+        profit_loss_percent = np.divide(
+            profit_loss * 100, costs,
+            out=np.zeros_like(profit_loss), where=costs > 0
+        )
+        
+        now = datetime.utcnow()
+        for holding, price, value, pl, pl_percent in zip(
+            priced,
+            current_price.tolist(),
+            values.tolist(),
+            profit_loss.tolist(),
+            profit_loss_percent.tolist()
+        ):
+            holding.update(
+                current_price=price,
+                total_value=value,
+                profit_loss=pl,
+                profit_loss_percent=pl_percent,
+                last_updated=now
+            )
+        
+        # Persist refreshed valuations with one executemany UPDATE
+        if priced:
+            self.db.execute(
+                update(holding_table)
+                .where(holding_table.c.id == bindparam('holding_id'))
+                .values(
+                    current_price=bindparam('current_price'),
+                    total_value=bindparam('total_value'),
+                    profit_loss=bindparam('profit_loss'),
+                    profit_loss_percent=bindparam('profit_loss_percent'),
+                    last_updated=bindparam('last_updated')
+                ),
+                [
+                    {
+                        'holding_id': holding['id'],
+                        'current_price': holding['current_price'],
+                        'total_value': holding['total_value'],
+                        'profit_loss': holding['profit_loss'],
+                        'profit_loss_percent': holding['profit_loss_percent'],
+                        'last_updated': now
+                    }
+                    for holding in priced
+                ]
+            )
+            self.db.commit()
+        
+        total_value = float(values.sum())
+        total_cost = float(costs.sum())
+        stock_value = float(values[asset_types == AssetType.STOCK.value].sum())
+        crypto_value = float(values[asset_types == AssetType.CRYPTO.value].sum())
+        forex_value = float(values[asset_types == AssetType.FOREX.value].sum())
         
         total_profit_loss = total_value - total_cost
         total_profit_loss_percent = (total_profit_loss / total_cost * 100) if total_cost > 0 else 0
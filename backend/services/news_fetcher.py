@@ -10,33 +10,65 @@ Handles news collection from external APIs and scheduling
 
 import logging
 
+import re
+
+from collections import OrderedDict
+
+from concurrent.futures import ThreadPoolExecutor
+
 from datetime import datetime, timedelta
 
-from typing import List, Optional, Dict, Any
+from functools import lru_cache
+
+from threading import Lock
+
+from typing import List, Optional, Dict, Any, Tuple
 
 from dataclasses import dataclass
 
 
 
+from pydantic import TypeAdapter, ValidationError
+
 import requests
 
 from requests.adapters import HTTPAdapter
 
+from urllib3.util.request import ACCEPT_ENCODING
+
 from urllib3.util.retry import Retry
 
+from apscheduler.schedulers.background import BackgroundScheduler
+
+from apscheduler.triggers.cron import CronTrigger
+
+
+
+try:
+
+    import orjson
+
+    ORJSON_AVAILABLE = True
+
+except ImportError:
+
+    ORJSON_AVAILABLE = False
+
+    orjson = None
+
 
 
 try:
 
     from config import settings
 
-    from models.news_article import NewsArticleCreate
+    from models.news_article import NewsArticle, NewsArticleCreate
 
 except ImportError:
 
     from config import settings
 
-    from models.news_article import NewsArticleCreate
+    from models.news_article import NewsArticle, NewsArticleCreate
 
 
 
@@ -46,6 +78,46 @@ logger = logging.getLogger(__name__)
 
 
 
+# Validates a whole page of converted articles in a single pydantic call
+
+_ARTICLE_LIST_ADAPTER = TypeAdapter(List[NewsArticleCreate])
+
+
+
+@lru_cache(maxsize=4096)
+
+def _parse_published_at(published_at: str) -> datetime:
+
+    """
+
+    Parse a News API ISO-8601 timestamp
+
+    
+
+    Articles from the same batch usually share timestamps, so parses are
+
+    memoized.
+
+    
+
+    Args:
+
+        published_at: Timestamp such as "2024-01-15T10:30:00Z"
+
+        
+
+    Returns:
+
+        Timezone-aware datetime
+
+    """
+
+    return datetime.fromisoformat(published_at.replace("Z", "+00:00"))
+
+
+
+
+
 
 
 @dataclass
@@ -112,12 +184,56 @@ class NewsAPIClient:
 
         "nasdaq", "dow jones", "s&p 500", "forex", "bond",
 
-        "금융", "주식", "?�장", "?�자", "경제", "코인", "비트코인"
+        "금융", "주식", "시장", "투자", "경제", "코인", "비트코인"
 
     ]
 
     
 
+    # Single case-insensitive alternation over all keywords, so article text
+
+    # is scanned in place without building a lowercased copy
+
+    FINANCIAL_KEYWORD_PATTERN = re.compile(
+
+        "|".join(map(re.escape, FINANCIAL_KEYWORDS)),
+
+        re.IGNORECASE
+
+    )
+
+    
+
+    # News API limits the q parameter to 500 characters
+
+    MAX_QUERY_LENGTH = 500
+
+    
+
+    # Upper bound on concurrent page requests in _fetch_everything
+
+    MAX_CONCURRENT_PAGES = 4
+
+    
+
+    # Number of page responses kept for conditional (ETag) revalidation
+
+    RESPONSE_CACHE_SIZE = 64
+
+    
+
+    # Languages accepted by the News API /everything language parameter
+
+    # (others, e.g. "ko", are queried with their keywords and no language filter)
+
+    NEWSAPI_LANGUAGES = frozenset({
+
+        "ar", "de", "en", "es", "fr", "he", "it", "nl", "no", "pt", "ru", "sv", "ud", "zh"
+
+    })
+
+    
+
     # News sources focused on finance
 
     FINANCIAL_SOURCES = [
@@ -182,6 +298,14 @@ class NewsAPIClient:
 
         
 
+        # Page responses that carried ETag/Last-Modified, keyed by request params
+
+        self._response_cache: "OrderedDict[Tuple, Tuple[Dict[str, str], Dict[str, Any]]]" = OrderedDict()
+
+        self._response_cache_lock = Lock()
+
+        
+
         logger.info(f"Initialized NewsAPIClient: base_url={self.base_url}")
 
     
@@ -226,7 +350,19 @@ class NewsAPIClient:
 
         
 
-        adapter = HTTPAdapter(max_retries=retry_strategy)
+        # Keep enough pooled keep-alive connections for concurrent page fetches
+
+        # so repeated requests reuse the TCP/TLS session
+
+        adapter = HTTPAdapter(
+
+            max_retries=retry_strategy,
+
+            pool_connections=4,
+
+            pool_maxsize=16
+
+        )
 
         session.mount("http://", adapter)
 
@@ -234,6 +370,16 @@ class NewsAPIClient:
 
         
 
+        # Advertise every content coding urllib3 can decode here (gzip/deflate,
+
+        # plus br/zstd when brotli/zstandard are installed); article JSON
+
+        # compresses several times over
+
+        session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+
+        
+
         return session
 
     
@@ -242,7 +388,7 @@ class NewsAPIClient:
 
         self,
 
-        query: str = "finance OR stock OR market OR cryptocurrency",
+        query: Optional[str] = None,
 
         from_date: Optional[datetime] = None,
 
@@ -252,7 +398,9 @@ class NewsAPIClient:
 
         sort_by: str = "publishedAt",
 
-        page_size: int = 100
+        page_size: int = 100,
+
+        max_pages: int = 1
 
     ) -> List[NewsArticleCreate]:
 
@@ -264,7 +412,9 @@ class NewsAPIClient:
 
         Args:
 
-            query: Search query string
+            query: Search query string (default: OR of FINANCIAL_KEYWORDS for
+
+                the requested language, so News API does the financial filtering)
 
             from_date: Start date for news (default: 7 days ago)
 
@@ -276,6 +426,8 @@ class NewsAPIClient:
 
             page_size: Number of articles per page (max 100)
 
+            max_pages: Maximum number of pages to fetch (fetched concurrently)
+
             
 
         Returns:
@@ -296,15 +448,27 @@ class NewsAPIClient:
 
         
 
-        # Set default date range (last 7 days)
+        # Let News API filter for financial relevance instead of downloading
+
+        # unrelated articles and discarding them client-side
+
+        if query is None:
+
+            query = self.financial_query(language)
+
+            
+
+        # Set default date range (last 7 days), anchored to a single "now"
+
+        now = datetime.now()
 
         if from_date is None:
 
-            from_date = datetime.now() - timedelta(days=7)
+            from_date = now - timedelta(days=7)
 
         if to_date is None:
 
-            to_date = datetime.now()
+            to_date = now
 
         
 
@@ -334,7 +498,9 @@ class NewsAPIClient:
 
                 sort_by=sort_by,
 
-                page_size=page_size
+                page_size=page_size,
+
+                max_pages=max_pages
 
             )
 
@@ -374,6 +540,168 @@ class NewsAPIClient:
 
     
 
+    def fetch_news_multilingual(
+
+        self,
+
+        languages: List[str],
+
+        query: Optional[str] = None,
+
+        from_date: Optional[datetime] = None,
+
+        to_date: Optional[datetime] = None,
+
+        sort_by: str = "publishedAt",
+
+        page_size: int = 100,
+
+        max_pages: int = 1
+
+    ) -> List[NewsArticleCreate]:
+
+        """
+
+        Fetch news for several languages concurrently
+
+        
+
+        Each language is a separate News API query (the default query uses
+
+        that language's financial keywords; languages News API can't filter
+
+        by, such as "ko", rely on those keywords alone). Requests run in parallel over the
+
+        shared session and results are merged, de-duplicated by URL.
+
+        
+
+        Args:
+
+            languages: Language codes to query (e.g. ["en", "ko"])
+
+            query: Search query string (default: per-language financial query)
+
+            from_date: Start date for news (default: 7 days ago)
+
+            to_date: End date for news (default: now)
+
+            sort_by: Sort order (publishedAt, relevancy, popularity)
+
+            page_size: Number of articles per page (max 100)
+
+            max_pages: Maximum number of pages to fetch per language
+
+            
+
+        Returns:
+
+            List of NewsArticleCreate objects
+
+            
+
+        Raises:
+
+            NewsAPIClientError: If every language query fails
+
+        """
+
+        if not languages:
+
+            return []
+
+            
+
+        # Anchor all languages to the same date window
+
+        now = datetime.now()
+
+        from_date = from_date or now - timedelta(days=7)
+
+        to_date = to_date or now
+
+        
+
+        def fetch(language: str) -> List[NewsArticleCreate]:
+
+            return self.fetch_news(
+
+                query=query,
+
+                from_date=from_date,
+
+                to_date=to_date,
+
+                language=language,
+
+                sort_by=sort_by,
+
+                page_size=page_size,
+
+                max_pages=max_pages
+
+            )
+
+            
+
+        articles = []
+
+        seen_urls = set()
+
+        errors = []
+
+        
+
+        with ThreadPoolExecutor(max_workers=len(languages)) as executor:
+
+            futures = {executor.submit(fetch, language): language for language in languages}
+
+            
+
+            for future, language in futures.items():
+
+                try:
+
+                    results = future.result()
+
+                except NewsAPIClientError as e:
+
+                    logger.warning(f"News fetch failed for language '{language}': {e}")
+
+                    errors.append(e)
+
+                    continue
+
+                    
+
+                for article in results:
+
+                    if article.url:
+
+                        if article.url in seen_urls:
+
+                            continue
+
+                        seen_urls.add(article.url)
+
+                    articles.append(article)
+
+                    
+
+        if len(errors) == len(languages):
+
+            raise errors[-1]
+
+            
+
+        logger.info(f"Fetched {len(articles)} unique articles for languages {languages}")
+
+        
+
+        return articles
+
+    
+
     def _fetch_everything(
 
         self,
@@ -388,7 +716,9 @@ class NewsAPIClient:
 
         sort_by: str,
 
-        page_size: int
+        page_size: int,
+
+        max_pages: int = 1
 
     ) -> List[Dict[str, Any]]:
 
@@ -398,6 +728,12 @@ class NewsAPIClient:
 
         
 
+        The first page is fetched to learn totalResults; any further pages
+
+        (up to max_pages) are then requested concurrently.
+
+        
+
         Args:
 
             query: Search query
@@ -412,6 +748,8 @@ class NewsAPIClient:
 
             page_size: Results per page
 
+            max_pages: Maximum number of pages to fetch
+
             
 
         Returns:
@@ -426,10 +764,6 @@ class NewsAPIClient:
 
         """
 
-        url = f"{self.base_url}/everything"
-
-        
-
         params = {
 
             "q": query,
@@ -438,8 +772,6 @@ class NewsAPIClient:
 
             "to": to_date.strftime("%Y-%m-%d"),
 
-            "language": language,
-
             "sortBy": sort_by,
 
             "pageSize": page_size,
@@ -448,14 +780,128 @@ class NewsAPIClient:
 
         }
 
+        # News API rejects unsupported language codes
+
+        if language in self.NEWSAPI_LANGUAGES:
+
+            params["language"] = language
+
+        
+
+        data = self._fetch_page(params, page=1)
+
+        articles = list(data.get("articles", []))
+
+        total_results = data.get("totalResults", 0)
+
+        
+
+        total_pages = min(max_pages, -(-total_results // page_size)) if page_size > 0 else 1
+
+        
+
+        if total_pages > 1:
+
+            # Page requests are independent and I/O bound; the session's
+
+            # connection pool lets them share keep-alive connections
+
+            with ThreadPoolExecutor(max_workers=min(self.MAX_CONCURRENT_PAGES, total_pages - 1)) as executor:
+
+                pages = executor.map(
+
+                    lambda page: self._fetch_page(params, page),
+
+                    range(2, total_pages + 1)
+
+                )
+
+                for page_data in pages:
+
+                    articles.extend(page_data.get("articles", []))
+
+                    
+
+        logger.debug(f"News API returned {len(articles)} articles (total: {total_results})")
+
+        
+
+        return articles
+
+        
+
+    def _fetch_page(self, params: Dict[str, Any], page: int) -> Dict[str, Any]:
+
+        """
+
+        Fetch a single page from News API /everything endpoint
+
+        
+
+        Args:
+
+            params: Query parameters shared by all pages
+
+            page: Page number (1-based)
+
+            
+
+        Returns:
+
+            Decoded response payload
+
+            
+
+        Raises:
+
+            NewsAPIClientError: If request fails
+
+        """
+
+        url = f"{self.base_url}/everything"
+
+        page_params = {**params, "page": page}
+
+        cache_key = tuple(sorted(page_params.items()))
+
         
 
+        # Revalidate a previously seen page instead of downloading it again
+
+        headers = {}
+
+        with self._response_cache_lock:
+
+            cached = self._response_cache.get(cache_key)
+
+        if cached:
+
+            validators, _ = cached
+
+            if "ETag" in validators:
+
+                headers["If-None-Match"] = validators["ETag"]
+
+            if "Last-Modified" in validators:
+
+                headers["If-Modified-Since"] = validators["Last-Modified"]
+
+                
+
         try:
 
-            response = self.session.get(url, params=params, timeout=self.timeout)
+            response = self.session.get(url, params=page_params, headers=headers, timeout=self.timeout)
 
             
 
+            if response.status_code == 304 and cached:
+
+                logger.debug(f"News API page {page} not modified, using cached response")
+
+                return cached[1]
+
+                
+
             if response.status_code == 401:
 
                 raise NewsAPIClientError("Invalid News API key")
@@ -472,9 +918,9 @@ class NewsAPIClient:
 
                 )
 
-            
+                
 
-            data = response.json()
+            data = self._decode_json(response)
 
             
 
@@ -484,19 +930,23 @@ class NewsAPIClient:
 
                 raise NewsAPIClientError(f"News API error: {error_msg}")
 
-            
+            validators = {
 
-            articles = data.get("articles", [])
+                name: response.headers[name]
 
-            total_results = data.get("totalResults", 0)
+                for name in ("ETag", "Last-Modified")
 
-            
+                if name in response.headers
 
-            logger.debug(f"News API returned {len(articles)} articles (total: {total_results})")
+            }
 
-            
+            if validators:
 
-            return articles
+                self._store_cached_response(cache_key, validators, data)
+
+                
+
+            return data
 
             
 
@@ -512,7 +962,83 @@ class NewsAPIClient:
 
             raise NewsAPIClientError(f"News API request failed: {e}")
 
-    
+    @staticmethod
+
+    def _decode_json(response: requests.Response) -> Dict[str, Any]:
+
+        """
+
+        Decode a JSON response body
+
+        
+
+        Uses orjson on the raw bytes when it is installed, which is
+
+        considerably faster than the stdlib decoder for article-heavy pages.
+
+        
+
+        Args:
+
+            response: HTTP response with a JSON body
+
+            
+
+        Returns:
+
+            Decoded payload
+
+        """
+
+        if ORJSON_AVAILABLE:
+
+            try:
+
+                return orjson.loads(response.content)
+
+            except orjson.JSONDecodeError as e:
+
+                raise NewsAPIClientError(f"News API request failed: {e}")
+
+        return response.json()
+
+    def _store_cached_response(
+
+        self,
+
+        cache_key: Tuple,
+
+        validators: Dict[str, str],
+
+        data: Dict[str, Any]
+
+    ):
+
+        """
+
+        Remember a page response and its validators for conditional requests
+
+        
+
+        Args:
+
+            cache_key: Normalized request parameters
+
+            validators: ETag / Last-Modified headers from the response
+
+            data: Decoded response payload
+
+        """
+
+        with self._response_cache_lock:
+
+            self._response_cache[cache_key] = (validators, data)
+
+            self._response_cache.move_to_end(cache_key)
+
+            while len(self._response_cache) > self.RESPONSE_CACHE_SIZE:
+
+                self._response_cache.popitem(last=False)
 
     def _convert_to_articles(self, raw_articles: List[Dict[str, Any]]) -> List[NewsArticleCreate]:
 
@@ -534,7 +1060,9 @@ class NewsAPIClient:
 
         """
 
-        articles = []
+        rows = []
+
+        now = datetime.now()
 
         
 
@@ -572,13 +1100,13 @@ class NewsAPIClient:
 
                 try:
 
-                    published_date = datetime.fromisoformat(published_at.replace("Z", "+00:00"))
+                    published_date = _parse_published_at(published_at)
 
                 except (ValueError, AttributeError):
 
                     logger.warning(f"Invalid date format: {published_at}, using current time")
 
-                    published_date = datetime.now()
+                    published_date = now
 
                 
 
@@ -599,7 +1127,7 @@ class NewsAPIClient:
                 # Get author
                 author = raw.get("author", None)
                 
-                article = NewsArticleCreate(
+                rows.append(dict(
 
                     title=title[:500],  # Truncate to max length
 
@@ -617,11 +1145,7 @@ class NewsAPIClient:
 
                     asset_type="general"
 
-                )
-
-                
-
-                articles.append(article)
+                ))
 
                 
 
@@ -633,10 +1157,92 @@ class NewsAPIClient:
 
         
 
-        return articles
+        # Validate the whole page in one call; fall back to per-article
+
+        # validation so a single bad article does not drop the page
+
+        try:
+
+            return _ARTICLE_LIST_ADAPTER.validate_python(rows)
+
+        except ValidationError:
+
+            articles = []
+
+            for row in rows:
+
+                try:
+
+                    articles.append(NewsArticleCreate(**row))
+
+                except ValidationError as e:
+
+                    logger.warning(f"Failed to parse article: {e}")
+
+            return articles
 
     
 
+    @classmethod
+
+    def financial_query(cls, language: str = "en") -> str:
+
+        """
+
+        Build a News API q expression matching the financial keywords
+
+        
+
+        Korean keywords are used for "ko", English ones otherwise. Keywords are
+
+        added in order until the News API query length limit is reached.
+
+        
+
+        Args:
+
+            language: Language code (en, ko, etc.)
+
+            
+
+        Returns:
+
+            Boolean OR expression such as '"stock" OR "market"'
+
+        """
+
+        korean = language == "ko"
+
+        terms = []
+
+        length = 0
+
+        for keyword in cls.FINANCIAL_KEYWORDS:
+
+            if keyword.isascii() == korean:
+
+                continue
+
+                
+
+            term = f'"{keyword}"'
+
+            added = len(term) + (4 if terms else 0)  # " OR " separator
+
+            if length + added > cls.MAX_QUERY_LENGTH:
+
+                break
+
+                
+
+            terms.append(term)
+
+            length += added
+
+            
+
+        return " OR ".join(terms)
+
     def filter_financial_news(self, articles: List[NewsArticleCreate]) -> List[NewsArticleCreate]:
 
         """
@@ -667,15 +1273,15 @@ class NewsAPIClient:
 
         for article in articles:
 
-            # Combine title and content for keyword search
+            # Check if any financial keyword is present in the title or content
 
-            text = f"{article.title} {article.content}".lower()
+            is_financial = (
 
-            
+                self.FINANCIAL_KEYWORD_PATTERN.search(article.title) is not None
 
-            # Check if any financial keyword is present
+                or self.FINANCIAL_KEYWORD_PATTERN.search(article.content) is not None
 
-            is_financial = any(keyword.lower() in text for keyword in self.FINANCIAL_KEYWORDS)
+            )
 
             
 
@@ -737,6 +1343,10 @@ class NewsScheduler:
 
     """
 
+    # Rows removed per DELETE statement/transaction in cleanup_old_news
+
+    CLEANUP_BATCH_SIZE = 1000
+
     
 
     def __init__(
@@ -775,10 +1385,6 @@ class NewsScheduler:
 
         """
 
-        from apscheduler.schedulers.background import BackgroundScheduler
-
-        from apscheduler.triggers.cron import CronTrigger
-
         
 
         self.db_session_factory = db_session_factory
@@ -821,8 +1427,6 @@ class NewsScheduler:
 
         """
 
-        from apscheduler.triggers.cron import CronTrigger
-
         
 
         # Create cron trigger for daily execution
@@ -955,13 +1559,15 @@ class NewsScheduler:
 
                 # Fetch news from last 7 days
 
-                from_date = datetime.now() - timedelta(days=7)
-
                 to_date = datetime.now()
 
+                from_date = to_date - timedelta(days=7)
+
                 
 
-                articles = self.news_client.fetch_news(
+                articles = self.news_client.fetch_news_multilingual(
+
+                    languages=settings.news_collection_languages_list,
 
                     from_date=from_date,
 
@@ -1033,6 +1639,12 @@ class NewsScheduler:
 
         
 
+        Existing articles are looked up with one query by URL and one by
+
+        title, and new rows are written with a single bulk insert.
+
+        
+
         Args:
 
             db: Database session
@@ -1047,98 +1659,110 @@ class NewsScheduler:
 
         """
 
-        from models.news_article import NewsArticle
-
         
 
-        stored_count = 0
+        if not articles:
+
+            return 0
+
+            
+
+        # Check which articles already exist (by URL or title+date)
+
+        urls = {article.url for article in articles if article.url}
+
+        titles = {article.title for article in articles}
 
         
 
-        for article_data in articles:
+        existing_urls = set()
 
-            try:
+        if urls:
 
-                # Check if article already exists (by URL or title+date)
+            existing_urls = {
 
-                existing = None
+                url for (url,) in db.query(NewsArticle.url).filter(NewsArticle.url.in_(urls))
 
-                
+            }
 
-                if article_data.url:
+            
 
-                    existing = db.query(NewsArticle).filter(
+        # Also match title and published date to catch duplicates without URLs
 
-                        NewsArticle.url == article_data.url
+        existing_keys = {
 
-                    ).first()
+            (title, published_date.replace(tzinfo=None))
 
-                
+            for title, published_date in db.query(
 
-                if not existing:
+                NewsArticle.title, NewsArticle.published_date
 
-                    # Also check by title and published date to catch duplicates without URLs
+            ).filter(NewsArticle.title.in_(titles))
 
-                    existing = db.query(NewsArticle).filter(
+        }
 
-                        NewsArticle.title == article_data.title,
+        
 
-                        NewsArticle.published_date == article_data.published_date
+        rows = []
 
-                    ).first()
+        for article_data in articles:
 
-                
+            key = (article_data.title, article_data.published_date.replace(tzinfo=None))
 
-                if existing:
+            
 
-                    logger.debug(f"Article already exists: {article_data.title[:50]}...")
+            if (article_data.url and article_data.url in existing_urls) or key in existing_keys:
 
-                    continue
+                logger.debug(f"Article already exists: {article_data.title[:50]}...")
+
+                continue
 
                 
 
-                # Create new article
+            # Track the new article so duplicates within this batch are skipped too
 
-                article = NewsArticle(
+            if article_data.url:
 
-                    title=article_data.title,
+                existing_urls.add(article_data.url)
 
-                    content=article_data.content,
-                    
-                    description=article_data.description,
-                    
-                    author=article_data.author,
+            existing_keys.add(key)
 
-                    published_date=article_data.published_date,
+            
 
-                    source=article_data.source,
+            rows.append({
 
-                    url=article_data.url,
+                "title": article_data.title,
 
-                    asset_type=article_data.asset_type
+                "content": article_data.content,
 
-                )
+                "description": article_data.description,
 
-                
+                "author": article_data.author,
 
-                db.add(article)
+                "published_date": article_data.published_date,
 
-                stored_count += 1
+                "source": article_data.source,
 
-                
+                "url": article_data.url,
 
-            except Exception as e:
+                "asset_type": article_data.asset_type
 
-                logger.error(f"Failed to store article: {e}")
+            })
 
-                continue
+            
 
-        
+        if not rows:
+
+            return 0
+
+            
 
-        # Commit all articles at once
+        # Insert and commit all articles at once
 
         try:
 
+            db.bulk_insert_mappings(NewsArticle, rows)
+
             db.commit()
 
         except Exception as e:
@@ -1149,11 +1773,9 @@ class NewsScheduler:
 
             raise
 
-        
-
-        return stored_count
+            
 
-    
+        return len(rows)
 
     def cleanup_old_news(self, db, days: int = 7) -> int:
 
@@ -1177,8 +1799,6 @@ class NewsScheduler:
 
         """
 
-        from models.news_article import NewsArticle
-
         
 
         try:
@@ -1187,17 +1807,43 @@ class NewsScheduler:
 
             
 
-            # Delete old articles
+            # Delete old articles in bounded batches so each transaction
 
-            deleted = db.query(NewsArticle).filter(
+            # (and the locks it holds) stays short
 
-                NewsArticle.published_date < cutoff_date
+            deleted = 0
 
-            ).delete()
+            while True:
 
-            
+                batch_ids = [
 
-            db.commit()
+                    row[0] for row in db.query(NewsArticle.id).filter(
+
+                        NewsArticle.published_date < cutoff_date
+
+                    ).limit(self.CLEANUP_BATCH_SIZE).all()
+
+                ]
+
+                if not batch_ids:
+
+                    break
+
+                    
+
+                deleted += db.query(NewsArticle).filter(
+
+                    NewsArticle.id.in_(batch_ids)
+
+                ).delete(synchronize_session=False)
+
+                db.commit()
+
+                
+
+                if len(batch_ids) < self.CLEANUP_BATCH_SIZE:
+
+                    break
 
             
 
@@ -5,13 +5,19 @@ Trade Pattern Analyzer - 거래 _턴 분석 "
 
 import logging
 
+import math
+
+from collections import OrderedDict
+
 from datetime import datetime, timedelta
 
 from typing import List, Dict, Any, Optional, Tuple
 
-from sqlalchemy.orm import Session
+from threading import Lock
+
+from sqlalchemy.orm import Session, aliased
 
-from sqlalchemy import func, and_
+from sqlalchemy import func, and_, exists, extract
 
 
 
@@ -29,7 +35,31 @@ logger = logging.getLogger(__name__)
 
 class PatternAnalyzer:
 
-    """거래 ?�턴 분석�?""
+    """거래 패턴 분석기"""
+
+    
+
+    # 패턴 추출 대상이 되는 체결 완료 거래 상태
+
+    EXECUTED_STATUSES = ('COMPLETED', 'SUCCESS')
+
+    
+
+    # 점수(0-100) 분산 계산 시 값을 중앙으로 이동시키는 기준값
+
+    SCORE_SHIFT = 50.0
+
+    
+
+    # analyze_patterns 결과 캐시 (인스턴스 간 공유, 패턴 데이터 버전별)
+
+    INSIGHTS_CACHE_SIZE = 128
+
+    _insights_cache: "OrderedDict[Tuple, PatternInsights]" = OrderedDict()
+
+    _insights_lock = Lock()
+
+    _patterns_version = 0
 
     
 
@@ -53,32 +83,138 @@ class PatternAnalyzer:
 
         """
 
-        거래 _역"
+        거래 내역의 매수-매도 쌍에서 패턴 추출
+
+        
+
+        각 매수 거래와 같은 사용자·종목의 바로 다음 매도 거래를 SQL 자체 조인으로
+
+        한 번에 짝지으므로 Python에서 거래 쌍을 탐색하지 않습니다.
+
+        이미 패턴으로 저장된 거래 쌍은 건너뛰므로 기간이 겹쳐도 중복 저장되지 않습니다.
+
         """
 
         try:
 
-            # 거래 _역 조회
+            buy = aliased(TradeHistory)
+
+            sell = aliased(TradeHistory)
+
+            earlier_sell = aliased(TradeHistory)
+
+            
+
+            # 매수 이후, 이 매도보다 먼저 체결된 매도가 없어야 "다음 매도"
+
+            earlier_sell_exists = exists().where(
+
+                earlier_sell.user_id == buy.user_id,
+
+                earlier_sell.symbol == buy.symbol,
+
+                earlier_sell.trade_type == 'SELL',
+
+                earlier_sell.status.in_(self.EXECUTED_STATUSES),
 
-            query = self.db.query(TradeHistory)
+                earlier_sell.executed_at > buy.executed_at,
+
+                earlier_sell.executed_at < sell.executed_at
+
+            )
+
+            
+
+            # 이전 실행에서 이미 추출한 거래 쌍
+
+            pattern_exists = exists().where(
+
+                TradePattern.buy_trade_id == buy.id,
+
+                TradePattern.sell_trade_id == sell.id
+
+            )
+
+            
+
+            # 거래 쌍 조회
+
+            query = self.db.query(buy, sell).join(
+
+                sell,
+
+                and_(
+
+                    sell.user_id == buy.user_id,
+
+                    sell.symbol == buy.symbol,
+
+                    sell.trade_type == 'SELL',
+
+                    sell.status.in_(self.EXECUTED_STATUSES),
+
+                    sell.executed_at > buy.executed_at
+
+                )
+
+            ).filter(
+
+                buy.trade_type == 'BUY',
+
+                buy.status.in_(self.EXECUTED_STATUSES),
+
+                ~earlier_sell_exists,
+
+                ~pattern_exists
+
+            )
 
             
 
             if start_date:
 
-                query = query.filter(TradeHistory.executed_at >= start_date)
+                query = query.filter(buy.executed_at >= start_date)
 
             if end_date:
 
-                query = query.filter(TradeHistory.executed_at <= end_date)
+                query = query.filter(sell.executed_at <= end_date)
 
             if symbols:
 
-                query = query.filter(TradeHistory.symbol.in_(symbols))
+                query = query.filter(buy.symbol.in_(symbols))
+
+                
+
+            patterns = []
+
+            for buy_trade, sell_trade in query.all():
+
+                pattern = self._create_pattern_from_trade_pair(buy_trade, sell_trade)
+
+                if pattern:
+
+                    patterns.append(pattern)
+
+                    
+
+            if patterns:
+
+                self.db.add_all(patterns)
+
+                self.db.commit()
+
+                
+
+            patterns_created = len(patterns)
 
             
 
-            # "
+            if patterns_created:
+
+                self._invalidate_insights_cache()
+
+                
+
             logger.info(f"Extracted {patterns_created} patterns from trades")
 
             return patterns_created
@@ -93,7 +229,7 @@ class PatternAnalyzer:
 
             raise
 
-    
+            
 
     def _create_pattern_from_trade_pair(
 
@@ -105,17 +241,86 @@ class PatternAnalyzer:
 
     ) -> Optional[TradePattern]:
 
-        """매수-매도 ?�에???�턴 ?�성"""
+        """매수-매도 쌍에서 패턴 생성"""
 
         try:
 
-            # _익�"
+            # 수익률 및 보유 시간 계산
+
+            buy_price = float(buy_trade.executed_price)
+
+            sell_price = float(sell_trade.executed_price)
+
+            if buy_price <= 0:
+
+                return None
+
+                
+
+            profit_loss = (sell_price - buy_price) / buy_price * 100
+
+            holding_hours = (sell_trade.executed_at - buy_trade.executed_at).total_seconds() / 3600
+
+            
+
+            if profit_loss > 0:
+
+                pattern_type = 'winning'
+
+            elif profit_loss < 0:
+
+                pattern_type = 'losing'
+
+            else:
+
+                pattern_type = 'neutral'
+
+                
+
+            return TradePattern(
+
+                pattern_type=pattern_type,
+
+                symbol=buy_trade.symbol,
+
+                entry_signal_score=float(buy_trade.signal_ratio if buy_trade.signal_ratio is not None else 50),
+
+                exit_signal_score=float(sell_trade.signal_ratio) if sell_trade.signal_ratio is not None else None,
+
+                # 거래 내역에는 감성 점수가 없으므로 중립값 사용
+
+                sentiment_score=50.0,
+
+                holding_period_hours=round(holding_hours, 2),
+
+                profit_loss_percent=round(profit_loss, 4),
+
+                trade_size=float(buy_trade.total_amount),
+
+                market_condition=self._determine_market_condition(profit_loss),
+
+                features={
+
+                    'buy_trade_id': buy_trade.id,
+
+                    'sell_trade_id': sell_trade.id
+
+                },
+
+                buy_trade_id=buy_trade.id,
+
+                sell_trade_id=sell_trade.id
+
+            )
+
+            
+
+        except Exception as e:
+
             logger.error(f"Error creating pattern: {e}")
 
             return None
 
-    
-
     def _determine_market_condition(self, profit_loss: float) -> str:
 
         """?�장 ?�황 ?�단"""
@@ -148,65 +353,185 @@ class PatternAnalyzer:
 
         """
 
-        _턴 분석 �"
+        패턴 분석 및 인사이트 생성
+
+        
+
+        패턴 유형별 건수/평균/편차 합계를 단일 GROUP BY 쿼리로 집계하여
+
+        개별 패턴 행을 애플리케이션으로 전송하지 않습니다. 결과는 패턴 데이터가
+
+        바뀔 때까지 (pattern_type, symbol, min_samples) 별로 캐시됩니다.
+
         """
 
-        try:
+        cache_key = (pattern_type, symbol, min_samples, PatternAnalyzer._patterns_version)
 
-            query = self.db.query(TradePattern)
+        with self._insights_lock:
 
-            
+            cached = self._insights_cache.get(cache_key)
+
+            if cached is not None:
+
+                self._insights_cache.move_to_end(cache_key)
+
+                return cached.model_copy(deep=True)
+
+                
+
+        try:
+
+            filters = []
 
             if pattern_type:
 
-                query = query.filter(TradePattern.pattern_type == pattern_type)
+                filters.append(TradePattern.pattern_type == pattern_type)
 
             if symbol:
 
-                query = query.filter(TradePattern.symbol == symbol)
+                filters.append(TradePattern.symbol == symbol)
+
+                
+
+            # 통계 계산 (패턴 유형별 SQL 집계)
+
+            rows = self.db.query(
+
+                TradePattern.pattern_type,
+
+                func.count(TradePattern.id),
+
+                func.avg(TradePattern.profit_loss_percent),
+
+                *self._shifted_sums(TradePattern.entry_signal_score),
+
+                *self._shifted_sums(TradePattern.sentiment_score),
+
+                func.avg(TradePattern.holding_period_hours)
+
+            ).filter(*filters).group_by(TradePattern.pattern_type).all()
 
             
 
-            patterns = query.all()
+            stats = {row[0]: row[1:] for row in rows}
+
+            total = sum(row[1] for row in rows)
 
             
 
-            if len(patterns) < min_samples:
+            if total < min_samples:
 
-                logger.warning(f"Insufficient patterns: {len(patterns)} < {min_samples}")
+                logger.warning(f"Insufficient patterns: {total} < {min_samples}")
 
                 return self._empty_insights()
 
+                
+
+            win_stats = stats.get('winning')
+
+            loss_stats = stats.get('losing')
+
             
 
-            # _계 계산
+            win_count = win_stats[0] if win_stats else 0
 
-            winning = [p for p in patterns if p.pattern_type == 'winning']
+            loss_count = loss_stats[0] if loss_stats else 0
 
-            losing = [p for p in patterns if p.pattern_type == 'losing']
+            win_rate = win_count / total if total > 0 else 0.0
 
             
 
-            total = len(patterns)
+            avg_win = float(win_stats[1]) if win_stats else 0.0
+
+            avg_loss = float(loss_stats[1]) if loss_stats else 0.0
 
-            win_count = len(winning)
+            
 
-            loss_count = len(losing)
+            # 최적 진입 조건 (승리 패턴 기준)
 
-            win_rate = win_count / total if total > 0 else 0.0
+            if win_stats:
+
+                _, _, entry_sum, entry_sq_sum, sentiment_sum, sentiment_sq_sum, holding_mean = win_stats
+
+                best_entry_range = self._find_optimal_range(win_count, entry_sum, entry_sq_sum)
+
+                best_sentiment_range = self._find_optimal_range(win_count, sentiment_sum, sentiment_sq_sum)
+
+                optimal_holding = float(holding_mean)
+
+            else:
+
+                best_entry_range = (0.0, 100.0)
+
+                best_sentiment_range = (0.0, 100.0)
+
+                optimal_holding = 24.0
+
+                
+
+            best_hour = self._find_best_hour(filters) if win_count else None
+
+            
+
+            recommendations = self._generate_recommendations(
+
+                best_hour,
+
+                win_rate,
+
+                avg_win,
+
+                avg_loss,
+
+                best_entry_range,
+
+                optimal_holding
+
+            )
 
             
 
-            avg_win = sum(p.profit_loss_percent for p in winning) / len(winning) if winning else 0.0
+            insights = PatternInsights(
+
+                total_patterns=total,
+
+                winning_patterns=win_count,
+
+                losing_patterns=loss_count,
+
+                avg_winning_profit=round(avg_win, 2),
+
+                avg_losing_loss=round(avg_loss, 2),
+
+                win_rate=round(win_rate, 4),
 
-            avg_loss = sum(p.profit_loss_percent for p in losing) / len(losing) if losing else 0.0
+                best_entry_score_range=best_entry_range,
+
+                best_sentiment_range=best_sentiment_range,
+
+                optimal_holding_hours=round(optimal_holding, 1),
+
+                recommendations=recommendations
+
+            )
 
             
 
-            # 최적 진입 "
             logger.info(f"Pattern analysis completed: {total} patterns, {win_rate*100:.1f}% win rate")
 
-            return insights
+            
+
+            with self._insights_lock:
+
+                self._insights_cache[cache_key] = insights
+
+                if len(self._insights_cache) > self.INSIGHTS_CACHE_SIZE:
+
+                    self._insights_cache.popitem(last=False)
+
+                    
+
+            return insights.model_copy(deep=True)
 
             
 
@@ -216,26 +541,78 @@ class PatternAnalyzer:
 
             return self._empty_insights()
 
-    
+            
 
-    def _find_optimal_range(self, values: List[float]) -> Tuple[float, float]:
+    @classmethod
 
-        """최적 �?범위 찾기 (?�균 ± ?��??�차)"""
+    def _invalidate_insights_cache(cls):
 
-        if not values:
+        """패턴 데이터 변경 시 analyze_patterns 캐시 무효화"""
 
-            return (0.0, 100.0)
+        with cls._insights_lock:
+
+            cls._patterns_version += 1
+
+            cls._insights_cache.clear()
+
+    @classmethod
+
+    def _shifted_sums(cls, column) -> Tuple[Any, Any]:
+
+        """SUM(x - K), SUM((x - K)^2) 집계식 (K = SCORE_SHIFT)"""
+
+        shifted = column - cls.SCORE_SHIFT
+
+        return func.sum(shifted), func.sum(shifted * shifted)
 
         
 
-        import statistics
+    def _find_optimal_range(
+
+        self,
+
+        count: int,
+
+        shifted_sum: Optional[float],
 
-        mean = statistics.mean(values)
+        shifted_sq_sum: Optional[float]
 
-        stdev = statistics.stdev(values) if len(values) > 1 else 0.0
+    ) -> Tuple[float, float]:
+
+        """
+
+        최적 값 범위 찾기 (평균 ± 표본 표준편차)
 
         
 
+        SCORE_SHIFT 만큼 이동한 값의 합/제곱합으로 계산하므로 한 번의 집계로
+
+        구하면서도 큰 제곱합끼리의 뺄셈에서 생기는 정밀도 손실을 피합니다.
+
+        """
+
+        if not count or shifted_sum is None:
+
+            return (0.0, 100.0)
+
+            
+
+        shifted_mean = float(shifted_sum) / count
+
+        mean = self.SCORE_SHIFT + shifted_mean
+
+        if count > 1:
+
+            variance = (float(shifted_sq_sum) - count * shifted_mean * shifted_mean) / (count - 1)
+
+            stdev = math.sqrt(max(variance, 0.0))
+
+        else:
+
+            stdev = 0.0
+
+            
+
         return (
 
             round(max(0, mean - stdev), 1),
@@ -244,13 +621,47 @@ class PatternAnalyzer:
 
         )
 
-    
+    def _find_best_hour(self, filters: List[Any]) -> Optional[int]:
+
+        """
+
+        승리 패턴이 가장 많이 발생한 시간대 조회
+
+        
+
+        패턴 행의 생성 시각(추출 작업 시각)이 아니라 매수 거래의 체결 시각 기준입니다.
+
+        """
+
+        hour = extract('hour', TradeHistory.executed_at)
+
+        win_count = func.count(TradePattern.id)
+
+        
+
+        row = self.db.query(hour, win_count).join(
+
+            TradeHistory,
+
+            TradeHistory.id == TradePattern.buy_trade_id
+
+        ).filter(
+
+            *filters,
+
+            TradePattern.pattern_type == 'winning'
+
+        ).group_by(hour).order_by(win_count.desc(), hour).first()
+
+        
+
+        return int(row[0]) if row and row[0] is not None else None
 
     def _generate_recommendations(
 
         self,
 
-        patterns: List[TradePattern],
+        best_hour: Optional[int],
 
         win_rate: float,
 
@@ -264,7 +675,7 @@ class PatternAnalyzer:
 
     ) -> List[str]:
 
-        """추천?�항 ?�성"""
+        """추천사항 생성"""
 
         recommendations = []
 
@@ -272,23 +683,23 @@ class PatternAnalyzer:
 
         if win_rate < 0.4:
 
-            recommendations.append("?�률????��?�다. 진입 조건?????�격?�게 ?�정?�세??")
+            recommendations.append("승률이 낮습니다. 진입 조건을 더 엄격하게 설정하세요.")
 
         elif win_rate > 0.6:
 
-            recommendations.append("좋�? ?�률???��??�고 ?�습?�다.")
+            recommendations.append("좋은 승률을 유지하고 있습니다.")
 
-        
+            
 
         if abs(avg_loss) > avg_win * 1.5:
 
-            recommendations.append("?�실 규모가 ?�니?? ?�절매�? ??빠르�??�행?�세??")
+            recommendations.append("손실 규모가 큽니다. 손절매를 더 빠르게 실행하세요.")
 
-        
+            
 
         recommendations.append(
 
-            f"최적 진입 ?�호 ?�수: {best_entry_range[0]}-{best_entry_range[1]}"
+            f"최적 진입 신호 점수: {best_entry_range[0]}-{best_entry_range[1]}"
 
         )
 
@@ -296,14 +707,30 @@ class PatternAnalyzer:
 
         recommendations.append(
 
-            f"권장 보유 ?�간: ??{optimal_holding:.1f}?�간"
+            f"권장 보유 시간: 약 {optimal_holding:.1f}시간"
 
         )
 
         
 
-        # _간"
-                f"가??좋�? 거래 _간"
+        # 시간대별 승리 패턴 분포
+
+        if best_hour is not None:
+
+            recommendations.append(
+
+                f"가장 좋은 거래 시간대: {best_hour}시"
+
+            )
+
+            
+
+        return recommendations
+
+        
+
+    def _empty_insights(self) -> PatternInsights:
+
         """�??�사?�트 반환"""
 
         return PatternInsights(
@@ -338,7 +765,15 @@ class PatternAnalyzer:
 
         try:
 
-            query = self.db.query(TradePattern)
+            query = self.db.query(
+
+                TradePattern.pattern_type,
+
+                func.count(TradePattern.id),
+
+                func.avg(TradePattern.profit_loss_percent)
+
+            )
 
             if symbol:
 
@@ -346,29 +781,31 @@ class PatternAnalyzer:
 
             
 
-            total = query.count()
+            # 유형별 건수와 평균 손익을 한 번의 GROUP BY로 조회
 
-            winning = query.filter(TradePattern.pattern_type == 'winning').count()
+            stats = {
 
-            losing = query.filter(TradePattern.pattern_type == 'losing').count()
+                row[0]: (row[1], row[2])
 
-            neutral = query.filter(TradePattern.pattern_type == 'neutral').count()
+                for row in query.group_by(TradePattern.pattern_type).all()
+
+            }
 
             
 
-            avg_profit = self.db.query(func.avg(TradePattern.profit_loss_percent)).filter(
+            total = sum(count for count, _ in stats.values())
 
-                TradePattern.pattern_type == 'winning'
+            winning = stats.get('winning', (0, None))[0]
 
-            ).scalar() or 0.0
+            losing = stats.get('losing', (0, None))[0]
 
-            
+            neutral = stats.get('neutral', (0, None))[0]
 
-            avg_loss = self.db.query(func.avg(TradePattern.profit_loss_percent)).filter(
+            
 
-                TradePattern.pattern_type == 'losing'
+            avg_profit = stats.get('winning', (0, None))[1] or 0.0
 
-            ).scalar() or 0.0
+            avg_loss = stats.get('losing', (0, None))[1] or 0.0
 
             
 
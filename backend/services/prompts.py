@@ -3,6 +3,7 @@ Prompt Templates for Market Sentiment Analysis
 Defines the 3-stage prompt chain for analyzing news and generating recommendations
 """
 
+from bisect import bisect_left, bisect_right
 from typing import List, Dict, Any
 from datetime import datetime
 
@@ -32,6 +33,39 @@ STEP1_SYSTEM_PROMPT = """당신은 금융 뉴스 감성 분석 전문가입니
 중요: 반드시 유효한 JSON만 출력하고, 추가 설명이나 마크다운은 포함하지 마세요."""
 
 
+# Article content budget for Stage 1 (head + tail of the article, in characters)
+STEP1_CONTENT_HEAD_CHARS = 1600
+STEP1_CONTENT_TAIL_CHARS = 400
+CONTENT_TRUNCATION_MARKER = "\n...[중략]...\n"
+
+
+def truncate_content(
+    content: str,
+    head_chars: int = STEP1_CONTENT_HEAD_CHARS,
+    tail_chars: int = STEP1_CONTENT_TAIL_CHARS
+) -> str:
+    """
+    Cap article content to a fixed budget, keeping its beginning and end
+    
+    Long articles are cut to the first head_chars and last tail_chars
+    characters joined by CONTENT_TRUNCATION_MARKER, so prompt size (and
+    prefill time) is bounded and identical content always truncates the same way.
+    
+    Args:
+        content: Article content
+        head_chars: Characters kept from the start
+        tail_chars: Characters kept from the end
+        
+    Returns:
+        Content within the budget
+    """
+    if not content or len(content) <= head_chars + tail_chars:
+        return content
+    
+    tail = content[-tail_chars:] if tail_chars > 0 else ""
+    return f"{content[:head_chars]}{CONTENT_TRUNCATION_MARKER}{tail}"
+
+
 def create_step1_prompt(title: str, content: str, source: str, published_date: datetime) -> str:
     """
     Create Stage 1 prompt for individual article analysis
@@ -52,7 +86,7 @@ def create_step1_prompt(title: str, content: str, source: str, published_date: d
 발행일: {published_date}
 
 내용:
-{content}
+{truncate_content(content)}
 
 이 기사의 시장 감성을 분석하고 JSON 형식으로 응답하세요."""
 
@@ -78,6 +112,15 @@ STEP2_SYSTEM_PROMPT = """당신은 주간 시장 트렌드 분석 전문가입
 전문 용어를 최소화하고 핵심 메시지에 집중하세요."""
 
 
+def _format_step2_item(item: Dict[str, Any]) -> str:
+    """Format one sentiment result for the Stage 2 prompt"""
+    return (
+        f"[{item.get('date', 'Unknown')}] {item.get('title', 'No title')}\n"
+        f"  감성: {item.get('sentiment', 'Unknown')} (점수: {item.get('score', 0.0):.2f})\n"
+        f"  근거: {item.get('reasoning', '')}"
+    )
+
+
 def create_step2_prompt(sentiment_data: List[Dict[str, Any]]) -> str:
     """
     Create Stage 2 prompt for weekly trend aggregation
@@ -89,23 +132,7 @@ def create_step2_prompt(sentiment_data: List[Dict[str, Any]]) -> str:
     Returns:
         Formatted prompt string
     """
-    # Group by date and summarize
-    daily_summaries = []
-    
-    for item in sentiment_data:
-        date = item.get('date', 'Unknown')
-        title = item.get('title', 'No title')
-        sentiment = item.get('sentiment', 'Unknown')
-        score = item.get('score', 0.0)
-        reasoning = item.get('reasoning', '')
-        
-        daily_summaries.append(
-            f"[{date}] {title}\n"
-            f"  감성: {sentiment} (?�수: {score:.2f})\n"
-            f"  근거: {reasoning}"
-        )
-    
-    articles_text = "\n\n".join(daily_summaries)
+    articles_text = "\n\n".join(map(_format_step2_item, sentiment_data))
     
     return f"""최근 7일간의 뉴스 감성 분석 결과입니다:
 
@@ -142,7 +169,36 @@ STEP3_SYSTEM_PROMPT = """당신은 보수적인 투자 전략 전문가입니다
 - 0-30: 방어적 (현금 보유 우선)
 - 30-50: 중립적 (균형 잡힌 포지션)
 - 50-70: 적극적 (선별적 매수)
-- 70-100: 공격적 (강한 매수 신호, 매우 드물게 사용)"""
+- 70-100: 공격적 (강한 매수 신호, 매우 드물게 사용)
+
+VIX 수준 해석 (정규화 VIX 기준):
+- 0.3 미만: 낮음 (시장 안정)
+- 0.3-0.6: 보통 (정상 변동성)
+- 0.6 이상: 높음 (시장 불안)
+
+주간 감성 점수 해석:
+- 3.0 초과: 강한 긍정
+- 0.5 초과: 약한 긍정
+- -0.5 초과: 중립
+- -3.0 초과: 약한 부정
+- 그 이하: 강한 부정"""
+
+
+# Static opening of every Stage 3 user prompt. Kept ahead of all per-call
+# values so the system prompt plus this prefix is byte-identical across
+# requests and can be served from the inference server's prompt cache.
+STEP3_USER_PROMPT_PREFIX = """다음 정보를 바탕으로 투자 추천을 제공해주세요.
+보수적 투자 원칙을 적용하여 적절한 매수/매도 비율을 추천하고,
+JSON 형식으로만 응답하세요.
+
+"""
+
+
+# Interpretation bands (boundaries ascending, one more label than boundaries)
+VIX_BAND_BOUNDARIES = (0.3, 0.6)
+VIX_BAND_LABELS = ("낮음 (시장 안정)", "보통 (정상 변동성)", "높음 (시장 불안)")
+SIGNAL_BAND_BOUNDARIES = (-3.0, -0.5, 0.5, 3.0)
+SIGNAL_BAND_LABELS = ("강한 부정", "약한 부정", "중립", "약한 긍정", "강한 긍정")
 
 
 def create_step3_prompt(
@@ -163,29 +219,14 @@ def create_step3_prompt(
     Returns:
         Formatted prompt string
     """
-    # Interpret VIX level
-    if vix_normalized < 0.3:
-        vix_interpretation = "??�� (?�장 ?�정)"
-    elif vix_normalized < 0.6:
-        vix_interpretation = "보통 (?�상 변?�성)"
-    else:
-        vix_interpretation = "?�음 (?�장 불안)"
+    # Interpret VIX level (a boundary value belongs to the upper band)
+    vix_interpretation = VIX_BAND_LABELS[bisect_right(VIX_BAND_BOUNDARIES, vix_normalized)]
     
-    # Interpret signal score
-    if weekly_signal_score > 3.0:
-        signal_interpretation = "강한 긍정"
-    elif weekly_signal_score > 0.5:
-        signal_interpretation = "약한 긍정"
-    elif weekly_signal_score > -0.5:
-        signal_interpretation = "중립"
-    elif weekly_signal_score > -3.0:
-        signal_interpretation = "약한 부정"
-    else:
-        signal_interpretation = "강한 부정"
+    # Interpret signal score (a boundary value belongs to the lower band)
+    signal_interpretation = SIGNAL_BAND_LABELS[bisect_left(SIGNAL_BAND_BOUNDARIES, weekly_signal_score)]
     
-    return f"""다음 정보를 바탕으로 투자 추천을 제공해주세요:
-
-=== 주간 트렌드 요약 ===
+    # Only per-call values follow the static prefix
+    return STEP3_USER_PROMPT_PREFIX + f"""=== 주간 트렌드 요약 ===
 {trend_summary}
 
 === 시장 변동성 지표 ===
@@ -195,16 +236,20 @@ VIX 수준: {vix_interpretation}
 
 === 주간 감성 점수 ===
 점수: {weekly_signal_score:.2f}
-해석: {signal_interpretation}
-
-보수적 투자 원칙을 적용하여 적절한 매수/매도 비율을 추천하고,
-JSON 형식으로만 응답하세요."""
+해석: {signal_interpretation}"""
 
 
 # ============================================================================
 # Utility Functions
 # ============================================================================
 
+# Response validation constants
+STEP1_REQUIRED_FIELDS = frozenset({"sentiment", "reasoning"})
+VALID_SENTIMENTS = frozenset({"Positive", "Negative", "Neutral"})
+STEP3_REQUIRED_FIELDS = frozenset({"buy_sell_ratio", "confidence", "reasoning"})
+VALID_CONFIDENCE_LEVELS = frozenset({"low", "medium", "high"})
+
+
 def validate_step1_response(response: Dict[str, Any]) -> bool:
     """
     Validate Stage 1 response format
@@ -215,13 +260,11 @@ def validate_step1_response(response: Dict[str, Any]) -> bool:
     Returns:
         True if valid, False otherwise
     """
-    required_fields = ["sentiment", "reasoning"]
-    valid_sentiments = ["Positive", "Negative", "Neutral"]
-    
-    if not all(field in response for field in required_fields):
+    if not STEP1_REQUIRED_FIELDS <= response.keys():
         return False
     
-    if response["sentiment"] not in valid_sentiments:
+    sentiment = response["sentiment"]
+    if not isinstance(sentiment, str) or sentiment not in VALID_SENTIMENTS:
         return False
     
     if not isinstance(response["reasoning"], str) or not response["reasoning"].strip():
@@ -240,17 +283,15 @@ def validate_step3_response(response: Dict[str, Any]) -> bool:
     Returns:
         True if valid, False otherwise
     """
-    required_fields = ["buy_sell_ratio", "confidence", "reasoning"]
-    valid_confidence = ["low", "medium", "high"]
-    
-    if not all(field in response for field in required_fields):
+    if not STEP3_REQUIRED_FIELDS <= response.keys():
         return False
     
     ratio = response["buy_sell_ratio"]
     if not isinstance(ratio, (int, float)) or not (0 <= ratio <= 100):
         return False
     
-    if response["confidence"] not in valid_confidence:
+    confidence = response["confidence"]
+    if not isinstance(confidence, str) or confidence not in VALID_CONFIDENCE_LEVELS:
         return False
     
     if not isinstance(response["reasoning"], str) or not response["reasoning"].strip():
@@ -5,9 +5,9 @@ Provides optimized database queries for common operations
 
 import logging
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any, Tuple
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_, desc, asc, case
+from typing import Iterator, List, Optional, Dict, Any, Tuple
+from sqlalchemy.orm import Session, aliased, load_only, selectinload
+from sqlalchemy import func, and_, or_, desc, asc, case, cast, select, bindparam, union_all, text, Date, DateTime, Float
 from decimal import Decimal
 
 try:
@@ -18,6 +18,7 @@ try:
     from models.analysis_cache import AnalysisCache
     from models.stock_news_relation import StockNewsRelation
     from models.account_holding import AccountHolding
+    from models.sentiment_rollup import DailySentimentRollup
 except ImportError:
     from models.news_article import NewsArticle
     from models.sentiment_analysis import SentimentAnalysis
@@ -26,16 +27,80 @@ except ImportError:
     from models.analysis_cache import AnalysisCache
     from models.stock_news_relation import StockNewsRelation
     from models.account_holding import AccountHolding
+    from models.sentiment_rollup import DailySentimentRollup
 
 logger = logging.getLogger(__name__)
 
 
+# Prebuilt statements for the hot read paths. Values are supplied as bound
+# parameters at execution time, so each statement is constructed once and its
+# compiled form is reused from the engine's query cache on every call.
+_RECENT_NEWS_STMT = select(NewsArticle).options(
+    selectinload(NewsArticle.sentiment)
+).where(
+    NewsArticle.published_date >= bindparam('cutoff')
+).order_by(
+    desc(NewsArticle.published_date)
+).limit(bindparam('limit'))
+
+_RECENT_NEWS_BY_ASSET_STMT = _RECENT_NEWS_STMT.where(
+    NewsArticle.asset_type == bindparam('asset_type')
+)
+
+_PRICE_HISTORY_STMT = select(StockPrice).options(
+    load_only(StockPrice.timestamp, StockPrice.price, StockPrice.volume)
+).where(
+    StockPrice.symbol == bindparam('symbol'),
+    StockPrice.timestamp >= bindparam('cutoff')
+).order_by(
+    desc(StockPrice.timestamp)
+).limit(bindparam('limit'))
+
+_TRADE_SUMMARY_SQL = """
+SELECT COUNT(*) AS total_trades,
+       COALESCE(SUM(CASE WHEN trade_type = 'BUY' THEN 1 ELSE 0 END), 0) AS buy_count,
+       COALESCE(SUM(CASE WHEN trade_type = 'SELL' THEN 1 ELSE 0 END), 0) AS sell_count,
+       CAST(COALESCE(SUM(profit_loss), 0) AS FLOAT) AS total_profit_loss,
+       CAST(COALESCE(AVG(profit_loss), 0) AS FLOAT) AS avg_profit_loss,
+       CAST(COALESCE(SUM(total_amount), 0) AS FLOAT) AS total_volume
+FROM trade_history
+WHERE user_id = :user_id
+"""
+
+_TRADE_SUMMARY_STMT = text(_TRADE_SUMMARY_SQL)
+
+_TRADE_SUMMARY_SINCE_STMT = text(
+    _TRADE_SUMMARY_SQL + "  AND executed_at >= :cutoff\n"
+).bindparams(bindparam('cutoff', type_=DateTime))
+
+_CACHE_STATS_STMT = select(
+    func.count(AnalysisCache.id),
+    func.sum(case((AnalysisCache.expires_at < bindparam('now'), 1), else_=0))
+)
+
+
 class QueryOptimizer:
     """
     Provides optimized queries for common database operations
     Uses proper indexing and query patterns for performance
     """
     
+    # Tables maintained by vacuum_analyze_tables
+    VACUUM_TABLES = (
+        'news_articles',
+        'sentiment_analysis',
+        'stock_prices',
+        'trade_history',
+        'analysis_cache',
+        'stock_news_relation',
+        'account_holdings',
+        'auto_trade_config',
+        'daily_sentiment_rollup'
+    )
+    
+    # Symbol lists up to this size use one index lookup per symbol
+    LATEST_PRICE_LOOKUP_LIMIT = 64
+    
     def __init__(self, db: Session):
         """
         Initialize the query optimizer
@@ -45,139 +110,255 @@ class QueryOptimizer:
         """
         self.db = db
     
-    def get_recent_news_with_sentiment(
+    @staticmethod
+    def _resolve_cutoff(days: int, cutoff: Optional[datetime]) -> datetime:
+        """
+        Resolve the lower time bound of a query
+        
+        Args:
+            days: Number of days to look back
+            cutoff: Explicit cutoff (takes precedence over days)
+            
+        Returns:
+            Cutoff datetime
+        """
+        if cutoff is not None:
+            return cutoff
+        return datetime.now() - timedelta(days=days)
+    
+    def get_recent_news(
         self,
         days: int = 7,
         asset_type: Optional[str] = None,
-        limit: int = 100
-    ) -> List[Tuple[NewsArticle, Optional[SentimentAnalysis]]]:
+        limit: int = 100,
+        cutoff: Optional[datetime] = None
+    ) -> List[NewsArticle]:
         """
-        Optimized query to get recent news with their sentiment analysis
-        Uses composite index on published_date and asset_type
+        Optimized query to get recent news with their sentiment analysis loaded
+        Uses composite index on published_date and asset_type; sentiments are
+        fetched by a second IN query (selectinload) instead of an outer join
         
         Args:
             days: Number of days to look back
             asset_type: Filter by asset type
             limit: Maximum number of results
+            cutoff: Explicit cutoff datetime (overrides days)
             
         Returns:
-            List of (NewsArticle, SentimentAnalysis) tuples
+            List of NewsArticle records with .sentiment populated (or None)
         """
-        cutoff_date = datetime.now() - timedelta(days=days)
-        
-        query = self.db.query(NewsArticle, SentimentAnalysis).outerjoin(
-            SentimentAnalysis,
-            NewsArticle.id == SentimentAnalysis.article_id
-        ).filter(
-            NewsArticle.published_date >= cutoff_date
-        )
+        params = {'cutoff': self._resolve_cutoff(days, cutoff), 'limit': limit}
         
+        # Ordered by published_date descending (uses index)
         if asset_type:
-            query = query.filter(NewsArticle.asset_type == asset_type)
+            params['asset_type'] = asset_type
+            return self.db.execute(_RECENT_NEWS_BY_ASSET_STMT, params).scalars().all()
         
-        # Order by published_date descending (uses index)
-        query = query.order_by(desc(NewsArticle.published_date))
+        return self.db.execute(_RECENT_NEWS_STMT, params).scalars().all()
+    
+    def get_recent_news_with_sentiment(
+        self,
+        days: int = 7,
+        asset_type: Optional[str] = None,
+        limit: int = 100,
+        cutoff: Optional[datetime] = None
+    ) -> List[Tuple[NewsArticle, Optional[SentimentAnalysis]]]:
+        """
+        Get recent news paired with their sentiment analysis
+        Tuple form of get_recent_news
         
-        return query.limit(limit).all()
+        Args:
+            days: Number of days to look back
+            asset_type: Filter by asset type
+            limit: Maximum number of results
+            cutoff: Explicit cutoff datetime (overrides days)
+            
+        Returns:
+            List of (NewsArticle, SentimentAnalysis) tuples
+        """
+        articles = self.get_recent_news(days, asset_type, limit, cutoff)
+        return [(article, article.sentiment) for article in articles]
+    
+    def _day_bucket(self, column):
+        """
+        Truncate a datetime column to its calendar day in the database
+        
+        Args:
+            column: DateTime column expression
+            
+        Returns:
+            Day expression (DATE on PostgreSQL, 'YYYY-MM-DD' text on SQLite)
+        """
+        if self.db.get_bind().dialect.name == 'postgresql':
+            return cast(column, Date)
+        return func.date(column)
     
     def get_daily_sentiment_scores(
         self,
         days: int = 7,
-        asset_type: Optional[str] = None
+        asset_type: Optional[str] = None,
+        cutoff: Optional[datetime] = None
     ) -> List[Dict[str, Any]]:
         """
         Optimized query to get daily aggregated sentiment scores
-        Uses indexes on analyzed_at and sentiment
+        Reads the daily_sentiment_rollup table (at most one row per day and
+        asset type) kept current by refresh_daily_sentiment_rollup
         
         Args:
             days: Number of days to aggregate
             asset_type: Filter by asset type
+            cutoff: Explicit cutoff datetime (overrides days)
             
         Returns:
             List of daily sentiment aggregates
         """
-        cutoff_date = datetime.now() - timedelta(days=days)
+        cutoff_day = self._resolve_cutoff(days, cutoff).date()
+        rollup_table = DailySentimentRollup.__table__
+        total_count = func.sum(rollup_table.c.total_count)
+        
+        stmt = select(
+            rollup_table.c.date,
+            cast(func.sum(rollup_table.c.score_sum) / total_count, Float).label('avg_score'),
+            total_count.label('count'),
+            func.sum(rollup_table.c.positive_count).label('positive_count'),
+            func.sum(rollup_table.c.negative_count).label('negative_count'),
+            func.sum(rollup_table.c.neutral_count).label('neutral_count')
+        ).where(
+            rollup_table.c.date >= cutoff_day
+        )
+        
+        # Add asset type filter if specified
+        if asset_type:
+            stmt = stmt.where(rollup_table.c.asset_type == asset_type)
+        
+        # Group by date and order
+        stmt = stmt.group_by(rollup_table.c.date).order_by(asc(rollup_table.c.date))
+        
+        results = self.db.execute(stmt).mappings()
+        
+        return [
+            {
+                'date': r['date'].isoformat(),
+                'avg_score': r['avg_score'] or 0.0,
+                'count': r['count'],
+                'positive_count': r['positive_count'],
+                'negative_count': r['negative_count'],
+                'neutral_count': r['neutral_count']
+            }
+            for r in results
+        ]
+    
+    def refresh_daily_sentiment_rollup(self, days: int = 2) -> int:
+        """
+        Recompute the daily sentiment rollup for recent days
+        Replaces the rollup rows of the last `days` days with aggregates
+        computed from sentiment_analysis in a single INSERT ... SELECT
+        
+        Args:
+            days: Number of recent days to recompute (including today)
+            
+        Returns:
+            Number of rollup rows written
+        """
+        cutoff_day = (datetime.now() - timedelta(days=days - 1)).date()
+        cutoff_date = datetime.combine(cutoff_day, datetime.min.time())
+        
+        sentiment_table = SentimentAnalysis.__table__
+        news_table = NewsArticle.__table__
+        rollup_table = DailySentimentRollup.__table__
         
-        # Build base query with join
-        query = self.db.query(
-            func.date(SentimentAnalysis.analyzed_at).label('date'),
-            func.avg(SentimentAnalysis.score).label('avg_score'),
-            func.count(SentimentAnalysis.id).label('count'),
+        day = self._day_bucket(sentiment_table.c.analyzed_at)
+        asset_type = func.coalesce(news_table.c.asset_type, 'general')
+        
+        aggregates = select(
+            day,
+            asset_type,
+            func.sum(sentiment_table.c.score),
+            func.count(sentiment_table.c.id),
             func.sum(
                 case(
-                    (SentimentAnalysis.sentiment == 'Positive', 1),
+                    (sentiment_table.c.sentiment == 'Positive', 1),
                     else_=0
                 )
-            ).label('positive_count'),
+            ),
             func.sum(
                 case(
-                    (SentimentAnalysis.sentiment == 'Negative', 1),
+                    (sentiment_table.c.sentiment == 'Negative', 1),
                     else_=0
                 )
-            ).label('negative_count'),
+            ),
             func.sum(
                 case(
-                    (SentimentAnalysis.sentiment == 'Neutral', 1),
+                    (sentiment_table.c.sentiment == 'Neutral', 1),
                     else_=0
                 )
-            ).label('neutral_count')
-        ).filter(
-            SentimentAnalysis.analyzed_at >= cutoff_date
-        )
-        
-        # Add asset type filter if specified
-        if asset_type:
-            query = query.join(
-                NewsArticle,
-                SentimentAnalysis.article_id == NewsArticle.id
-            ).filter(
-                NewsArticle.asset_type == asset_type
+            ),
+            func.now()
+        ).select_from(
+            sentiment_table.join(
+                news_table,
+                sentiment_table.c.article_id == news_table.c.id
             )
+        ).where(
+            sentiment_table.c.analyzed_at >= cutoff_date
+        ).group_by(day, asset_type)
         
-        # Group by date and order
-        query = query.group_by(func.date(SentimentAnalysis.analyzed_at))
-        query = query.order_by(asc(func.date(SentimentAnalysis.analyzed_at)))
-        
-        results = query.all()
+        try:
+            self.db.execute(
+                rollup_table.delete().where(rollup_table.c.date >= cutoff_day)
+            )
+            result = self.db.execute(
+                rollup_table.insert().from_select(
+                    [
+                        'date', 'asset_type', 'score_sum', 'total_count',
+                        'positive_count', 'negative_count', 'neutral_count',
+                        'updated_at'
+                    ],
+                    aggregates
+                )
+            )
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Failed to refresh daily sentiment rollup: {e}")
+            raise
         
-        return [
-            {
-                'date': r.date.isoformat(),
-                'avg_score': float(r.avg_score) if r.avg_score else 0.0,
-                'count': r.count,
-                'positive_count': r.positive_count,
-                'negative_count': r.negative_count,
-                'neutral_count': r.neutral_count
-            }
-            for r in results
-        ]
+        logger.info(f"Refreshed daily sentiment rollup from {cutoff_day} ({result.rowcount} rows)")
+        return result.rowcount
     
     def get_stock_price_history(
         self,
         symbol: str,
         days: int = 30,
-        limit: int = 1000
-    ) -> List[StockPrice]:
+        limit: int = 1000,
+        cutoff: Optional[datetime] = None
+    ) -> Iterator[StockPrice]:
         """
         Optimized query to get stock price history
-        Uses composite index on symbol and timestamp
+        Uses composite index on symbol and timestamp and streams rows in
+        batches (server-side cursor on PostgreSQL) instead of loading them
+        all at once; wrap in list() when a list is needed
         
         Args:
             symbol: Stock symbol
             days: Number of days to look back
             limit: Maximum number of results
+            cutoff: Explicit cutoff datetime (overrides days)
             
         Returns:
-            List of StockPrice records
+            Iterator of StockPrice records with timestamp, price and volume loaded
         """
-        cutoff_date = datetime.now() - timedelta(days=days)
+        params = {
+            'symbol': symbol,
+            'cutoff': self._resolve_cutoff(days, cutoff),
+            'limit': limit
+        }
         
-        return self.db.query(StockPrice).filter(
-            and_(
-                StockPrice.symbol == symbol,
-                StockPrice.timestamp >= cutoff_date
-            )
-        ).order_by(desc(StockPrice.timestamp)).limit(limit).all()
+        return iter(self.db.execute(
+            _PRICE_HISTORY_STMT,
+            params,
+            execution_options={'stream_results': True, 'yield_per': 200}
+        ).scalars())
     
     def get_latest_stock_prices(
         self,
@@ -185,7 +366,10 @@ class QueryOptimizer:
     ) -> List[StockPrice]:
         """
         Optimized query to get latest price for each symbol
-        Uses subquery with index on symbol and timestamp
+        Small symbol lists run a UNION ALL of per-symbol "newest row" lookups,
+        each a single probe of the (symbol, timestamp) index. Otherwise rows
+        are ranked per symbol with ROW_NUMBER() and the newest one is kept,
+        so stock_prices is read once
         
         Args:
             symbols: List of symbols to query (None for all)
@@ -193,32 +377,45 @@ class QueryOptimizer:
         Returns:
             List of latest StockPrice records
         """
-        # Subquery to get latest timestamp per symbol
-        subquery = self.db.query(
-            StockPrice.symbol,
-            func.max(StockPrice.timestamp).label('max_timestamp')
-        ).group_by(StockPrice.symbol)
+        if symbols and len(symbols) <= self.LATEST_PRICE_LOOKUP_LIMIT:
+            # Each branch is wrapped in a subquery because SQLite does not
+            # accept ORDER BY/LIMIT directly inside UNION ALL members
+            lookups = [
+                select(StockPrice).where(
+                    StockPrice.symbol == symbol
+                ).order_by(
+                    desc(StockPrice.timestamp)
+                ).limit(1).subquery().select()
+                for symbol in dict.fromkeys(symbols)
+            ]
+            stmt = select(StockPrice).from_statement(union_all(*lookups))
+            return self.db.execute(stmt).scalars().all()
+        
+        # Number each symbol's rows newest-first in a single pass
+        ranked = self.db.query(
+            StockPrice,
+            func.row_number().over(
+                partition_by=StockPrice.symbol,
+                order_by=StockPrice.timestamp.desc()
+            ).label('row_number')
+        )
         
         if symbols:
-            subquery = subquery.filter(StockPrice.symbol.in_(symbols))
+            ranked = ranked.filter(StockPrice.symbol.in_(symbols))
         
-        subquery = subquery.subquery()
+        ranked = ranked.subquery()
+        latest = aliased(StockPrice, ranked)
         
-        # Join to get full records
-        query = self.db.query(StockPrice).join(
-            subquery,
-            and_(
-                StockPrice.symbol == subquery.c.symbol,
-                StockPrice.timestamp == subquery.c.max_timestamp
-            )
-        )
+        # Keep only the newest row per symbol
+        query = self.db.query(latest).filter(ranked.c.row_number == 1)
         
         return query.all()
     
     def get_trade_performance_summary(
         self,
         user_id: str,
-        days: Optional[int] = None
+        days: Optional[int] = None,
+        cutoff: Optional[datetime] = None
     ) -> Dict[str, Any]:
         """
         Optimized query to get trade performance summary
@@ -227,45 +424,16 @@ class QueryOptimizer:
         Args:
             user_id: User identifier
             days: Number of days to analyze (None for all time)
+            cutoff: Explicit cutoff datetime (overrides days)
             
         Returns:
             Performance summary dictionary
         """
-        query = self.db.query(
-            func.count(TradeHistory.id).label('total_trades'),
-            func.sum(
-                case(
-                    (TradeHistory.trade_type == 'BUY', 1),
-                    else_=0
-                )
-            ).label('buy_count'),
-            func.sum(
-                case(
-                    (TradeHistory.trade_type == 'SELL', 1),
-                    else_=0
-                )
-            ).label('sell_count'),
-            func.sum(TradeHistory.profit_loss).label('total_profit_loss'),
-            func.avg(TradeHistory.profit_loss).label('avg_profit_loss'),
-            func.sum(TradeHistory.total_amount).label('total_volume')
-        ).filter(
-            TradeHistory.user_id == user_id
-        )
+        if days or cutoff is not None:
+            params = {'user_id': user_id, 'cutoff': self._resolve_cutoff(days, cutoff)}
+            return dict(self.db.execute(_TRADE_SUMMARY_SINCE_STMT, params).mappings().one())
         
-        if days:
-            cutoff_date = datetime.now() - timedelta(days=days)
-            query = query.filter(TradeHistory.executed_at >= cutoff_date)
-        
-        result = query.first()
-        
-        return {
-            'total_trades': result.total_trades or 0,
-            'buy_count': result.buy_count or 0,
-            'sell_count': result.sell_count or 0,
-            'total_profit_loss': float(result.total_profit_loss) if result.total_profit_loss else 0.0,
-            'avg_profit_loss': float(result.avg_profit_loss) if result.avg_profit_loss else 0.0,
-            'total_volume': float(result.total_volume) if result.total_volume else 0.0
-        }
+        return dict(self.db.execute(_TRADE_SUMMARY_STMT, {'user_id': user_id}).mappings().one())
     
     def get_top_performing_stocks(
         self,
@@ -285,9 +453,9 @@ class QueryOptimizer:
         """
         results = self.db.query(
             TradeHistory.symbol,
-            func.sum(TradeHistory.profit_loss).label('total_profit_loss'),
+            cast(func.sum(TradeHistory.profit_loss), Float).label('total_profit_loss'),
             func.count(TradeHistory.id).label('trade_count'),
-            func.avg(TradeHistory.signal_ratio).label('avg_signal_ratio')
+            cast(func.avg(TradeHistory.signal_ratio), Float).label('avg_signal_ratio')
         ).filter(
             TradeHistory.user_id == user_id
         ).group_by(
@@ -299,9 +467,9 @@ class QueryOptimizer:
         return [
             {
                 'symbol': r.symbol,
-                'total_profit_loss': float(r.total_profit_loss) if r.total_profit_loss else 0.0,
+                'total_profit_loss': r.total_profit_loss or 0.0,
                 'trade_count': r.trade_count,
-                'avg_signal_ratio': float(r.avg_signal_ratio) if r.avg_signal_ratio else None
+                'avg_signal_ratio': r.avg_signal_ratio or None
             }
             for r in results
         ]
@@ -309,7 +477,8 @@ class QueryOptimizer:
     def get_stock_sentiment_summary(
         self,
         symbol: str,
-        days: int = 7
+        days: int = 7,
+        cutoff: Optional[datetime] = None
     ) -> Dict[str, Any]:
         """
         Optimized query to get sentiment summary for a specific stock
@@ -318,15 +487,53 @@ class QueryOptimizer:
         Args:
             symbol: Stock symbol
             days: Number of days to analyze
+            cutoff: Explicit cutoff datetime (overrides days)
             
         Returns:
             Sentiment summary dictionary
         """
-        cutoff_date = datetime.now() - timedelta(days=days)
+        return self.get_stock_sentiment_summaries([symbol], days, cutoff)[symbol]
+    
+    def get_stock_sentiment_summaries(
+        self,
+        symbols: List[str],
+        days: int = 7,
+        cutoff: Optional[datetime] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Optimized query to get sentiment summaries for several stocks at once
+        Groups by stock_symbol in a single query instead of one query per symbol
+        
+        Args:
+            symbols: Stock symbols
+            days: Number of days to analyze
+            cutoff: Explicit cutoff datetime (overrides days)
+            
+        Returns:
+            Dictionary mapping each symbol to its sentiment summary
+            (symbols without articles get zero counts)
+        """
+        summaries = {
+            symbol: {
+                'symbol': symbol,
+                'total_articles': 0,
+                'avg_score': 0.0,
+                'positive_count': 0,
+                'negative_count': 0,
+                'neutral_count': 0
+            }
+            for symbol in symbols
+        }
+        
+        if not symbols:
+            return summaries
         
-        result = self.db.query(
+        cutoff_date = self._resolve_cutoff(days, cutoff)
+        
+        results = self.db.query(
+            StockNewsRelation.stock_symbol,
             func.count(SentimentAnalysis.id).label('total_articles'),
-            func.avg(SentimentAnalysis.score).label('avg_score'),
+            cast(func.avg(SentimentAnalysis.score), Float).label('avg_score'),
             func.sum(
                 case(
                     (SentimentAnalysis.sentiment == 'Positive', 1),
@@ -350,19 +557,23 @@ class QueryOptimizer:
             SentimentAnalysis.article_id == StockNewsRelation.article_id
         ).filter(
             and_(
-                StockNewsRelation.stock_symbol == symbol,
+                StockNewsRelation.stock_symbol.in_(symbols),
                 SentimentAnalysis.analyzed_at >= cutoff_date
             )
-        ).first()
-        
-        return {
-            'symbol': symbol,
-            'total_articles': result.total_articles or 0,
-            'avg_score': float(result.avg_score) if result.avg_score else 0.0,
-            'positive_count': result.positive_count or 0,
-            'negative_count': result.negative_count or 0,
-            'neutral_count': result.neutral_count or 0
-        }
+        ).group_by(
+            StockNewsRelation.stock_symbol
+        ).all()
+        
+        for r in results:
+            summaries[r.stock_symbol].update({
+                'total_articles': r.total_articles or 0,
+                'avg_score': r.avg_score or 0.0,
+                'positive_count': r.positive_count or 0,
+                'negative_count': r.negative_count or 0,
+                'neutral_count': r.neutral_count or 0
+            })
+        
+        return summaries
     
     def get_cache_hit_rate(self) -> Dict[str, Any]:
         """
@@ -371,15 +582,18 @@ class QueryOptimizer:
         Returns:
             Cache statistics dictionary
         """
-        total = self.db.query(func.count(AnalysisCache.id)).scalar()
-        expired = self.db.query(func.count(AnalysisCache.id)).filter(
-            AnalysisCache.expires_at < datetime.now()
-        ).scalar()
-        
+        # Count total and expired entries in a single pass
+        total, expired = self.db.execute(
+            _CACHE_STATS_STMT,
+            {'now': datetime.now()}
+        ).one()
+        total = total or 0
+        expired = expired or 0
+
         return {
-            'total_entries': total or 0,
-            'expired_entries': expired or 0,
-            'valid_entries': (total or 0) - (expired or 0),
+            'total_entries': total,
+            'expired_entries': expired,
+            'valid_entries': total - expired,
             'expiry_rate': (expired / total * 100) if total else 0.0
         }
     
@@ -388,36 +602,30 @@ class QueryOptimizer:
         Run VACUUM ANALYZE on all tables (PostgreSQL only)
         This updates statistics and reclaims space
         
+        VACUUM cannot run inside a transaction block, so the statements run on
+        a separate AUTOCOMMIT connection. Only tables in VACUUM_TABLES are used.
+        
         Note: This is a maintenance operation and should be run during low-traffic periods
         """
         try:
+            engine = self.db.get_bind()
+            
             # Check if we're using PostgreSQL
-            if 'postgresql' in str(self.db.bind.url):
-                tables = [
-                    'news_articles',
-                    'sentiment_analysis',
-                    'stock_prices',
-                    'trade_history',
-                    'analysis_cache',
-                    'stock_news_relation',
-                    'account_holdings',
-                    'auto_trade_config'
-                ]
+            if engine.dialect.name == 'postgresql':
+                quote = engine.dialect.identifier_preparer.quote
                 
-                for table in tables:
-                    try:
-                        self.db.execute(f"VACUUM ANALYZE {table}")
-                        logger.info(f"VACUUM ANALYZE completed for {table}")
-                    except Exception as e:
-                        logger.warning(f"Could not VACUUM ANALYZE {table}: {str(e)}")
-                
-                self.db.commit()
+                with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                    for table in self.VACUUM_TABLES:
+                        try:
+                            conn.exec_driver_sql(f"VACUUM (ANALYZE) {quote(table)}")
+                            logger.info(f"VACUUM ANALYZE completed for {table}")
+                        except Exception as e:
+                            logger.warning(f"Could not VACUUM ANALYZE {table}: {str(e)}")
             else:
                 logger.info("VACUUM ANALYZE is only supported for PostgreSQL")
                 
         except Exception as e:
             logger.error(f"Error during VACUUM ANALYZE: {str(e)}")
-            self.db.rollback()
 
 
 def create_query_optimizer(db: Session) -> QueryOptimizer:
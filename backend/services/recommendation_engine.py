@@ -8,9 +8,13 @@ Generates conservative investment recommendations using LLM
 
 
 
+import asyncio
+
 import logging
 
-from typing import Optional, Dict, Any
+from bisect import bisect_right
+
+from typing import Optional, Dict, Any, List
 
 from pydantic import BaseModel, Field
 
@@ -18,7 +22,9 @@ from datetime import datetime
 
 
 
-from services.llm_client import LlamaCppClient, LlamaCppClientError
+from config import settings
+
+from services.llm_client import LlamaCppClient, LlamaCppClientError, get_llama_client
 
 from services.trend_aggregator import TrendSummary
 
@@ -54,7 +60,9 @@ STEP3_SYSTEM_PROMPT = """당신은 보수적인 투자 자문가입니다.
 
 
 
-STEP3_USER_PROMPT_TEMPLATE = """다음 정보를 바탕으로 투자 추천을 제공해주세요:
+# Static instructions come first so only the trailing values differ between calls
+
+STEP3_USER_PROMPT_TEMPLATE = """아래 정보를 종합하여 보수적인 투자 추천을 JSON 형식으로 제공해주세요:
 
 ## 주간 트렌드 분석
 - 기간: {period_start} ~ {period_end}
@@ -75,9 +83,57 @@ STEP3_USER_PROMPT_TEMPLATE = """다음 정보를 바탕으로 투자 추천을 
 
 ## 계산된 신호
 - 주간 신호 점수: {signal_score:.2f}
-- 매수/매도 비율: {calculated_ratio}
+- 매수/매도 비율: {calculated_ratio}"""
+
+# Bound once; the template is static
+
+_format_step3_user_prompt = STEP3_USER_PROMPT_TEMPLATE.format
+
+
+
+
+
+# Shape of the Step 3 LLM output, used to constrain generation
+
+STEP3_RESPONSE_SCHEMA = {
+
+    "type": "object",
+
+    "properties": {
+
+        "recommendation": {"type": "string"},
+
+        "confidence": {"type": "string", "enum": ["low", "medium", "high"]},
+
+        "risk_assessment": {"type": "string"},
+
+        "key_considerations": {"type": "array", "items": {"type": "string"}}
+
+    },
+
+    "required": ["recommendation", "confidence", "risk_assessment", "key_considerations"]
+
+}
+
+
+
 
-이 정보를 종합하여 보수적인 투자 추천을 JSON 형식으로 제공해주세요."""
+
+# Volatility bands for raw VIX (boundaries ascending, one more label than boundaries)
+
+VOLATILITY_BAND_BOUNDARIES = (15.0, 20.0, 30.0)
+
+VOLATILITY_BAND_LABELS = (
+
+    "낮음 (Low) - 안정적인 시장",
+
+    "보통 (Normal) - 정상적인 변동성",
+
+    "높음 (Elevated) - 불확실성 증가",
+
+    "매우 높음 (High) - 시장 공포 수준"
+
+)
 
 
 
@@ -155,7 +211,7 @@ class RecommendationEngine:
 
         Args:
 
-            llama_client: LlamaCppClient instance (creates new one if not provided)
+            llama_client: LlamaCppClient instance (uses the shared client if not provided)
 
             vix_fetcher: VIXFetcher instance (creates new one if not provided)
 
@@ -163,7 +219,11 @@ class RecommendationEngine:
 
         """
 
-        self.llama_client = llama_client or LlamaCppClient()
+        # The shared client keeps its pooled connections, so it is never closed here
+
+        self._uses_shared_client = llama_client is None
+
+        self.llama_client = llama_client or get_llama_client()
 
         self.vix_fetcher = vix_fetcher or VIXFetcher(api_source="mock")
 
@@ -233,13 +293,393 @@ class RecommendationEngine:
 
         
 
+        context = self._prepare_recommendation(trend, vix)
+
+        
+
+        try:
+
+            # Call LLM with Step 3 prompt (high reasoning)
+
+            response_json = self.llama_client.generate_json(
+
+                prompt=context["user_prompt"],
+
+                system_prompt=STEP3_SYSTEM_PROMPT,
+
+                temperature=temperature,
+
+                max_tokens=max_tokens,
+
+                json_schema=STEP3_RESPONSE_SCHEMA
+
+            )
+
+            
+
+            return self._build_recommendation(trend, context, response_json)
+
+            
+
+        except LlamaCppClientError as e:
+
+            logger.error(f"LLM request failed during recommendation generation: {e}")
+
+            raise
+
+            
+
+        except (KeyError, ValueError) as e:
+
+            logger.error(f"Invalid LLM response format: {e}")
+
+            raise ValueError(f"Invalid recommendation response: {str(e)}") from e
+
+            
+
+    async def agenerate_recommendation(
+
+        self,
+
+        trend: TrendSummary,
+
+        vix: Optional[float] = None,
+
+        temperature: float = 0.7,
+
+        max_tokens: int = 1500
+
+    ) -> Recommendation:
+
+        """
+
+        Generate conservative investment recommendation without blocking
+
+        
+
+        Async counterpart of generate_recommendation() for use inside the
+
+        event loop. The VIX fetch runs in a worker thread and the LLM
+
+        response is streamed, stopping as soon as the JSON object is complete.
+
+        
+
+        Args:
+
+            trend: TrendSummary from TrendAggregator
+
+            vix: Optional VIX value (fetches if not provided)
+
+            temperature: LLM temperature for generation
+
+            max_tokens: Maximum tokens for LLM response
+
+            
+
+        Returns:
+
+            Recommendation with buy/sell ratio and detailed analysis
+
+            
+
+        Raises:
+
+            LlamaCppClientError: If LLM request fails
+
+            ValueError: If invalid response or data
+
+        """
+
+        logger.info("Generating investment recommendation (async)")
+
+        
+
+        context = await asyncio.to_thread(self._prepare_recommendation, trend, vix)
+
+        
+
+        try:
+
+            response_json = await self.llama_client.agenerate_json(
+
+                prompt=context["user_prompt"],
+
+                system_prompt=STEP3_SYSTEM_PROMPT,
+
+                temperature=temperature,
+
+                max_tokens=max_tokens,
+
+                json_schema=STEP3_RESPONSE_SCHEMA
+
+            )
+
+            
+
+            return self._build_recommendation(trend, context, response_json)
+
+            
+
+        except LlamaCppClientError as e:
+
+            logger.error(f"LLM request failed during recommendation generation: {e}")
+
+            raise
+
+            
+
+        except (KeyError, ValueError) as e:
+
+            logger.error(f"Invalid LLM response format: {e}")
+
+            raise ValueError(f"Invalid recommendation response: {str(e)}") from e
+
+            
+
+    def generate_batch(
+
+        self,
+
+        trends: List[TrendSummary],
+
+        vix: Optional[float] = None,
+
+        temperature: float = 0.7,
+
+        max_tokens: int = 1500
+
+    ) -> List[Recommendation]:
+
+        """
+
+        Generate recommendations for many trend summaries
+
+        
+
+        For offline recomputes and backtests. The requests are sent
+
+        concurrently so the llama.cpp server batches them across its
+
+        parallel slots; a single trend uses generate_recommendation().
+
+        Must not be called from a running event loop (await
+
+        agenerate_batch() there instead).
+
+        
+
+        Args:
+
+            trends: TrendSummary list from TrendAggregator
+
+            vix: Optional VIX value shared by all trends (fetched once if not provided)
+
+            temperature: LLM temperature for generation
+
+            max_tokens: Maximum tokens for each LLM response
+
+            
+
+        Returns:
+
+            Recommendations in the same order as trends
+
+            
+
+        Raises:
+
+            LlamaCppClientError: If an LLM request fails
+
+            ValueError: If a response is invalid
+
+        """
+
+        if not trends:
+
+            return []
+
+            
+
+        if len(trends) == 1:
+
+            return [self.generate_recommendation(trends[0], vix, temperature, max_tokens)]
+
+            
+
+        async def run_batch() -> List[Recommendation]:
+
+            try:
+
+                return await self.agenerate_batch(trends, vix, temperature, max_tokens)
+
+            finally:
+
+                # The async client is bound to this event loop
+
+                await self.llama_client.close_async_client()
+
+                
+
+        return asyncio.run(run_batch())
+
+        
+
+    async def agenerate_batch(
+
+        self,
+
+        trends: List[TrendSummary],
+
+        vix: Optional[float] = None,
+
+        temperature: float = 0.7,
+
+        max_tokens: int = 1500
+
+    ) -> List[Recommendation]:
+
+        """
+
+        Generate recommendations for many trend summaries without blocking
+
+        
+
+        At most settings.llm_parallel_requests requests are in flight, matching
+
+        the server's parallel slots. Output is constrained to
+
+        STEP3_RESPONSE_SCHEMA.
+
+        
+
+        Args:
+
+            trends: TrendSummary list from TrendAggregator
+
+            vix: Optional VIX value shared by all trends (fetched once if not provided)
+
+            temperature: LLM temperature for generation
+
+            max_tokens: Maximum tokens for each LLM response
+
+            
+
+        Returns:
+
+            Recommendations in the same order as trends
+
+            
+
+        Raises:
+
+            LlamaCppClientError: If an LLM request fails
+
+            ValueError: If a response is invalid
+
+        """
+
+        if not trends:
+
+            return []
+
+            
+
+        logger.info(f"Generating {len(trends)} investment recommendations (batch)")
+
+        
+
+        if vix is None:
+
+            vix = await asyncio.to_thread(self.vix_fetcher.get_current_vix)
+
+            
+
+        contexts = [self._prepare_recommendation(trend, vix) for trend in trends]
+
+        semaphore = asyncio.Semaphore(max(1, settings.llm_parallel_requests))
+
+        
+
+        async def generate_one(trend: TrendSummary, context: Dict[str, Any]) -> Recommendation:
+
+            async with semaphore:
+
+                response_json = await self.llama_client.agenerate_json(
+
+                    prompt=context["user_prompt"],
+
+                    system_prompt=STEP3_SYSTEM_PROMPT,
+
+                    temperature=temperature,
+
+                    max_tokens=max_tokens,
+
+                    json_schema=STEP3_RESPONSE_SCHEMA
+
+                )
+
+                
+
+            try:
+
+                return self._build_recommendation(trend, context, response_json)
+
+            except (KeyError, ValueError) as e:
+
+                logger.error(f"Invalid LLM response format: {e}")
+
+                raise ValueError(f"Invalid recommendation response: {str(e)}") from e
+
+                
+
+        return list(await asyncio.gather(
+
+            *(generate_one(trend, context) for trend, context in zip(trends, contexts))
+
+        ))
+
+    
+
+    def _prepare_recommendation(
+
+        self,
+
+        trend: TrendSummary,
+
+        vix: Optional[float] = None
+
+    ) -> Dict[str, Any]:
+
+        """
+
+        Fetch VIX, calculate the signal and build the Step 3 user prompt
+
+        
+
+        Args:
+
+            trend: TrendSummary from TrendAggregator
+
+            vix: Optional VIX value (fetches if not provided)
+
+            
+
+        Returns:
+
+            Dictionary with vix, vix_normalized, signal_score,
+
+            calculated_ratio and user_prompt
+
+        """
+
         # Fetch VIX if not provided
 
         if vix is None:
 
             vix = self.vix_fetcher.get_current_vix()
 
-        
+            
 
         vix_normalized = self.vix_fetcher.normalize_vix(vix)
 
@@ -293,107 +733,129 @@ class RecommendationEngine:
 
         
 
-        try:
-
-            # Call LLM with Step 3 prompt (high reasoning)
+        return {
 
-            response_json = self.llama_client.generate_json(
+            "vix": vix,
 
-                prompt=user_prompt,
+            "vix_normalized": vix_normalized,
 
-                system_prompt=STEP3_SYSTEM_PROMPT,
+            "signal_score": signal_score,
 
-                temperature=temperature,
+            "calculated_ratio": calculated_ratio,
 
-                max_tokens=max_tokens
+            "user_prompt": user_prompt
 
-            )
+        }
 
-            
+        
 
-            # Parse and validate response
+    def _build_recommendation(
 
-            recommendation_text = response_json.get("recommendation", "")
+        self,
 
-            confidence = response_json.get("confidence", "medium")
+        trend: TrendSummary,
 
-            risk_assessment = response_json.get("risk_assessment", "")
+        context: Dict[str, Any],
 
-            key_considerations = response_json.get("key_considerations", [])
+        response_json: Dict[str, Any]
 
-            
+    ) -> Recommendation:
 
-            if not recommendation_text:
+        """
 
-                raise ValueError("LLM response missing recommendation text")
+        Validate the LLM response and create the Recommendation
 
-            
+        
 
-            # Validate confidence level
+        Args:
 
-            if confidence not in ["low", "medium", "high"]:
+            trend: TrendSummary the recommendation is based on
 
-                logger.warning(f"Invalid confidence level '{confidence}', defaulting to 'medium'")
+            context: Result of _prepare_recommendation()
 
-                confidence = "medium"
+            response_json: Parsed Step 3 LLM response
 
             
 
-            # Create Recommendation object
+        Returns:
 
-            recommendation = Recommendation(
+            Recommendation object
 
-                buy_sell_ratio=calculated_ratio,
+            
 
-                recommendation=recommendation_text,
+        Raises:
 
-                confidence=confidence,
+            ValueError: If the response is missing the recommendation text
 
-                risk_assessment=risk_assessment,
+        """
 
-                key_considerations=key_considerations,
+        # Parse and validate response
 
-                trend_summary=trend.summary_text,
+        recommendation_text = response_json.get("recommendation", "")
 
-                vix=vix,
+        confidence = response_json.get("confidence", "medium")
 
-                vix_normalized=vix_normalized,
+        risk_assessment = response_json.get("risk_assessment", "")
 
-                signal_score=signal_score,
+        key_considerations = response_json.get("key_considerations", [])
 
-                last_updated=datetime.now()
+        
 
-            )
+        if not recommendation_text:
+
+            raise ValueError("LLM response missing recommendation text")
 
             
 
-            logger.info(
+        # Validate confidence level
 
-                f"Recommendation generated: ratio={calculated_ratio}, "
+        if confidence not in ["low", "medium", "high"]:
 
-                f"confidence={confidence}, VIX={vix:.2f}"
+            logger.warning(f"Invalid confidence level '{confidence}', defaulting to 'medium'")
 
-            )
+            confidence = "medium"
 
             
 
-            return recommendation
+        # Create Recommendation object
 
-            
+        recommendation = Recommendation(
 
-        except LlamaCppClientError as e:
+            buy_sell_ratio=context["calculated_ratio"],
 
-            logger.error(f"LLM request failed during recommendation generation: {e}")
+            recommendation=recommendation_text,
 
-            raise
+            confidence=confidence,
 
-            
+            risk_assessment=risk_assessment,
 
-        except (KeyError, ValueError) as e:
+            key_considerations=key_considerations,
 
-            logger.error(f"Invalid LLM response format: {e}")
+            trend_summary=trend.summary_text,
 
-            raise ValueError(f"Invalid recommendation response: {str(e)}") from e
+            vix=context["vix"],
+
+            vix_normalized=context["vix_normalized"],
+
+            signal_score=context["signal_score"],
+
+            last_updated=datetime.now()
+
+        )
+
+        
+
+        logger.info(
+
+            f"Recommendation generated: ratio={context['calculated_ratio']}, "
+
+            f"confidence={confidence}, VIX={context['vix']:.2f}"
+
+        )
+
+        
+
+        return recommendation
 
     
 
@@ -417,21 +879,9 @@ class RecommendationEngine:
 
         """
 
-        if vix < 15:
-
-            return "낮음 (Low) - 안정적인 시장"
-
-        elif vix < 20:
-
-            return "보통 (Normal) - 정상적인 변동성"
-
-        elif vix < 30:
-
-            return "높음 (Elevated) - 불확실성 증가"
+        # A boundary value belongs to the band above it
 
-        else:
-
-            return "매우 높음 (High) - 시장 공포 수준"
+        return VOLATILITY_BAND_LABELS[bisect_right(VOLATILITY_BAND_BOUNDARIES, vix)]
 
     
 
@@ -483,23 +933,23 @@ class RecommendationEngine:
 
         # Format key drivers
 
-        key_drivers_text = "\n".join([
+        if trend.key_drivers:
 
-            f"  - {driver}"
+            key_drivers_text = "\n".join([
 
-            for driver in trend.key_drivers
+                f"  - {driver}"
 
-        ])
+                for driver in trend.key_drivers
 
-        
+            ])
 
-        if not key_drivers_text:
+        else:
 
             key_drivers_text = "  (식별된 주요 동인 없음)"
 
         
 
-        prompt = STEP3_USER_PROMPT_TEMPLATE.format(
+        prompt = _format_step3_user_prompt(
 
             period_start=trend.period_start.strftime("%Y-%m-%d"),
 
@@ -537,7 +987,7 @@ class RecommendationEngine:
 
         """Close LLM client connection"""
 
-        if self.llama_client:
+        if self.llama_client and not self._uses_shared_client:
 
             self.llama_client.close()
 
@@ -545,6 +995,18 @@ class RecommendationEngine:
 
     
 
+    async def aclose(self):
+
+        """Close LLM client connections (sync session and async client)"""
+
+        if self.llama_client and not self._uses_shared_client:
+
+            await self.llama_client.aclose()
+
+            logger.debug("RecommendationEngine closed")
+
+    
+
     def __enter__(self):
 
         """Context manager entry"""
@@ -3,12 +3,16 @@ Risk Management Module for Auto Trading System
 Validates trades, calculates position sizes, and enforces safety limits
 """
 
-from datetime import datetime, time
+from datetime import datetime, date, time
+from functools import lru_cache
+from time import monotonic
 from decimal import Decimal
-from typing import Optional, Dict, Any, Tuple
+from typing import Optional, Dict, Any, List, Tuple, FrozenSet, Mapping
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_
+from sqlalchemy.exc import SQLAlchemyError
 import logging
+import sys
 
 try:
     from models.auto_trade_config import AutoTradeConfig
@@ -23,6 +27,55 @@ except ImportError:
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=256)
+def _parse_symbol_list(symbols: str) -> FrozenSet[str]:
+    """Parse a comma-separated symbol list (cached per raw string, symbols interned)"""
+    return frozenset(sys.intern(s.strip()) for s in symbols.split(","))
+
+
+@lru_cache(maxsize=128)
+def _parse_trading_time(value: str) -> time:
+    """Parse an HH:MM trading hour (cached per raw string)"""
+    return time.fromisoformat(value)
+
+
+def index_holdings_by_symbol(holdings: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Index holdings by symbol for O(1) lookups
+    
+    The first entry for a symbol wins, as with a linear search.
+    
+    Args:
+        holdings: Holdings list from the brokerage API
+    
+    Returns:
+        Dictionary mapping symbol to holding
+    """
+    holdings_by_symbol: Dict[str, Dict[str, Any]] = {}
+    for holding in holdings:
+        holdings_by_symbol.setdefault(holding.get("symbol"), holding)
+    return holdings_by_symbol
+
+
+def get_holdings_by_symbol(current_holdings: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    Get the symbol index of a holdings information dictionary
+    
+    Uses the "holdings_by_symbol" entry when present (built once per tick
+    by AutoTradingEngine), otherwise indexes the "holdings" list.
+    
+    Args:
+        current_holdings: Holdings information dictionary
+    
+    Returns:
+        Dictionary mapping symbol to holding
+    """
+    holdings_by_symbol = current_holdings.get("holdings_by_symbol")
+    if holdings_by_symbol is None:
+        holdings_by_symbol = index_holdings_by_symbol(current_holdings.get("holdings", []))
+    return holdings_by_symbol
+
+
 class RiskValidationError(Exception):
     """Exception raised when a trade fails risk validation"""
     pass
@@ -34,6 +87,16 @@ class RiskManager:
     Validates trades, calculates position sizes, and enforces safety limits
     """
     
+    # Seconds a user's realized P&L for today is reused across validate_trade calls
+    DAILY_PNL_CACHE_TTL = 1.0
+    
+    # Share of max_position_size used per risk level, in percent
+    RISK_LEVEL_PERCENT = {
+        "LOW": 50,
+        "MEDIUM": 75,
+        "HIGH": 100
+    }
+    
     def __init__(self, db: Session):
         """
         Initialize RiskManager
@@ -42,6 +105,8 @@ class RiskManager:
             db: Database session
         """
         self.db = db
+        self._daily_pnl_cache: Dict[Tuple[str, date], Tuple[Decimal, float]] = {}
+        self._today_start: Optional[Tuple[date, datetime]] = None
     
     def validate_trade(
         self,
@@ -79,17 +144,22 @@ class RiskManager:
             if not self._is_symbol_allowed(config, symbol):
                 return False, f"Symbol {symbol} is not in allowed list or is excluded"
             
-            # Check daily loss limit
-            if not self._check_daily_loss_limit(config):
-                return False, "Daily loss limit exceeded"
-            
-            # Validate based on action
+            # Validate based on action (in-memory checks, before any DB access)
             if action == "BUY":
-                return self._validate_buy(config, symbol, quantity, price, current_holdings)
+                is_valid, message = self._validate_buy(config, symbol, quantity, price, current_holdings)
             elif action == "SELL":
-                return self._validate_sell(config, symbol, quantity, current_holdings)
+                is_valid, message = self._validate_sell(config, symbol, quantity, current_holdings)
             else:
                 return False, f"Invalid action: {action}"
+            
+            if not is_valid:
+                return False, message
+            
+            # Check daily loss limit (queries today's P&L) only for otherwise valid trades
+            if not self._check_daily_loss_limit(config):
+                return False, "Daily loss limit exceeded"
+            
+            return True, message
         
         except Exception as e:
             logger.error(f"Error validating trade: {e}")
@@ -108,8 +178,8 @@ class RiskManager:
         now = datetime.now().time()
         
         try:
-            start_time = time.fromisoformat(config.trading_start_time)
-            end_time = time.fromisoformat(config.trading_end_time)
+            start_time = _parse_trading_time(config.trading_start_time)
+            end_time = _parse_trading_time(config.trading_end_time)
             
             return start_time <= now <= end_time
         except Exception as e:
@@ -129,14 +199,12 @@ class RiskManager:
         """
         # Check excluded symbols first
         if config.excluded_symbols:
-            excluded = [s.strip() for s in config.excluded_symbols.split(",")]
-            if symbol in excluded:
+            if symbol in _parse_symbol_list(config.excluded_symbols):
                 return False
         
         # If allowed symbols list exists, check if symbol is in it
         if config.allowed_symbols:
-            allowed = [s.strip() for s in config.allowed_symbols.split(",")]
-            return symbol in allowed
+            return symbol in _parse_symbol_list(config.allowed_symbols)
         
         # If no allowed list, all symbols (except excluded) are allowed
         return True
@@ -155,27 +223,65 @@ class RiskManager:
             return True  # No limit set
         
         try:
-            # Get today's trades
-            today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-            
-            daily_pnl = self.db.query(func.sum(TradeHistory.profit_loss)).filter(
-                and_(
-                    TradeHistory.user_id == config.user_id,
-                    TradeHistory.executed_at >= today_start,
-                    TradeHistory.status == "COMPLETED"
-                )
-            ).scalar() or Decimal("0.0")
-            
-            # If loss exceeds limit, block trading
-            if daily_pnl < -abs(config.daily_loss_limit):
-                logger.warning(f"Daily loss limit exceeded: {daily_pnl} < -{config.daily_loss_limit}")
-                return False
-            
-            return True
-        
-        except Exception as e:
+            daily_pnl = self._get_daily_pnl(config.user_id)
+        except SQLAlchemyError as e:
             logger.error(f"Error checking daily loss limit: {e}")
             return False
+        
+        # If loss exceeds limit, block trading
+        if daily_pnl < -abs(config.daily_loss_limit):
+            logger.warning("Daily loss limit exceeded: %s < -%s", daily_pnl, config.daily_loss_limit)
+            return False
+        
+        return True
+    
+    def _get_daily_pnl(self, user_id: str) -> Decimal:
+        """
+        Get today's realized profit/loss for a user
+        
+        The aggregate is cached per (user, day) for DAILY_PNL_CACHE_TTL
+        seconds; invalidate_daily_pnl() drops it when a trade completes.
+        
+        Args:
+            user_id: User identifier
+        
+        Returns:
+            Sum of profit_loss over today's completed trades
+        """
+        today = date.today()
+        key = (user_id, today)
+        
+        cached = self._daily_pnl_cache.get(key)
+        if cached is not None and monotonic() - cached[1] < self.DAILY_PNL_CACHE_TTL:
+            return cached[0]
+        
+        # Get today's trades (midnight is computed once per day)
+        if self._today_start is None or self._today_start[0] != today:
+            self._today_start = (today, datetime.combine(today, time.min))
+        today_start = self._today_start[1]
+        
+        daily_pnl = self.db.query(func.sum(TradeHistory.profit_loss)).filter(
+            and_(
+                TradeHistory.user_id == user_id,
+                TradeHistory.executed_at >= today_start,
+                TradeHistory.status == "COMPLETED"
+            )
+        ).scalar() or Decimal("0.0")
+        
+        self._daily_pnl_cache[key] = (daily_pnl, monotonic())
+        return daily_pnl
+    
+    def invalidate_daily_pnl(self, user_id: str):
+        """
+        Drop cached daily profit/loss for a user
+        
+        Call after recording a completed trade for the user.
+        
+        Args:
+            user_id: User identifier
+        """
+        for key in [key for key in self._daily_pnl_cache if key[0] == user_id]:
+            del self._daily_pnl_cache[key]
     
     def _validate_buy(
         self,
@@ -238,8 +344,7 @@ class RiskManager:
         """
         # Check if we have enough shares to sell
         if current_holdings:
-            holdings = current_holdings.get("holdings", [])
-            holding = next((h for h in holdings if h.get("symbol") == symbol), None)
+            holding = get_holdings_by_symbol(current_holdings).get(symbol)
             
             if not holding:
                 return False, f"No holdings found for symbol {symbol}"
@@ -275,19 +380,10 @@ class RiskManager:
             # Base position size from max_position_size
             base_amount = config.max_position_size
             
-            # Adjust based on risk level
-            risk_multipliers = {
-                "LOW": Decimal("0.5"),
-                "MEDIUM": Decimal("0.75"),
-                "HIGH": Decimal("1.0")
-            }
-            risk_multiplier = risk_multipliers.get(config.risk_level, Decimal("0.75"))
-            
-            # Adjust based on signal strength (normalize to 0-1)
-            signal_strength = Decimal(signal_ratio) / Decimal("100")
-            
-            # Calculate position amount
-            position_amount = base_amount * risk_multiplier * signal_strength
+            # Adjust based on risk level and signal strength (both percentages),
+            # combined as integers so the Decimal math is one exact multiply/divide
+            risk_percent = self.RISK_LEVEL_PERCENT.get(config.risk_level, 75)
+            position_amount = base_amount * (risk_percent * signal_ratio) / 10000
             
             # Check available cash
             if current_holdings:
@@ -302,13 +398,14 @@ class RiskManager:
             if price <= 0:
                 return 0
             
-            quantity = int(position_amount / price)
+            quantity = int(position_amount // price)
             
             # Ensure at least 1 share if we have enough money
             if quantity == 0 and position_amount >= price:
                 quantity = 1
             
-            logger.info(f"Calculated position size for {symbol}: {quantity} shares at {price}")
+            # Lazy %-formatting: Decimal is only formatted when INFO is emitted
+            logger.info("Calculated position size for %s: %s shares at %s", symbol, quantity, price)
             return quantity
         
         except Exception as e:
@@ -334,38 +431,70 @@ class RiskManager:
         Returns:
             Tuple of (should_sell, quantity_to_sell, reason)
         """
-        try:
-            if not current_holdings:
-                return False, None, "No holdings information"
-            
-            holdings = current_holdings.get("holdings", [])
-            holding = next((h for h in holdings if h.get("symbol") == symbol), None)
-            
-            if not holding:
-                return False, None, f"No position found for {symbol}"
-            
-            average_price = holding.get("average_price", Decimal("0.0"))
-            quantity = holding.get("quantity", 0)
-            
-            if average_price <= 0:
-                return False, None, "Invalid average price"
-            
-            # Calculate loss percentage
-            loss_percentage = ((current_price - average_price) / average_price) * Decimal("100")
-            
-            # Check if stop-loss threshold is breached
-            stop_loss_threshold = -abs(config.stop_loss_percentage)
-            
-            if loss_percentage <= stop_loss_threshold:
-                reason = f"Stop-loss triggered: {loss_percentage:.2f}% loss (threshold: {stop_loss_threshold}%)"
-                logger.warning(f"{reason} for {symbol}")
-                return True, quantity, reason
-            
-            return False, None, "Within stop-loss threshold"
+        return self.check_stop_loss_batch(
+            config, {symbol: current_price}, current_holdings
+        )[symbol]
+    
+    def check_stop_loss_batch(
+        self,
+        config: AutoTradeConfig,
+        current_prices: Mapping[str, Decimal],
+        current_holdings: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Tuple[bool, Optional[int], str]]:
+        """
+        Check stop-loss for several positions in one pass over the holdings
         
-        except Exception as e:
-            logger.error(f"Error checking stop-loss: {e}")
-            return False, None, f"Error: {str(e)}"
+        Args:
+            config: Auto-trade configuration
+            current_prices: Current market price per symbol
+            current_holdings: Current holdings information
+        
+        Returns:
+            Dictionary mapping each symbol in current_prices to
+            (should_sell, quantity_to_sell, reason)
+        """
+        if not current_holdings:
+            return {symbol: (False, None, "No holdings information") for symbol in current_prices}
+        
+        holdings_by_symbol = get_holdings_by_symbol(current_holdings)
+        
+        results = {}
+        stop_loss_threshold = None
+        
+        for symbol, current_price in current_prices.items():
+            try:
+                holding = holdings_by_symbol.get(symbol)
+                
+                if not holding:
+                    results[symbol] = (False, None, f"No position found for {symbol}")
+                    continue
+                
+                average_price = holding.get("average_price", Decimal("0.0"))
+                quantity = holding.get("quantity", 0)
+                
+                if average_price <= 0:
+                    results[symbol] = (False, None, "Invalid average price")
+                    continue
+                
+                # Calculate loss percentage
+                loss_percentage = ((current_price - average_price) / average_price) * Decimal("100")
+                
+                # Check if stop-loss threshold is breached
+                if stop_loss_threshold is None:
+                    stop_loss_threshold = -abs(config.stop_loss_percentage)
+                
+                if loss_percentage <= stop_loss_threshold:
+                    reason = f"Stop-loss triggered: {loss_percentage:.2f}% loss (threshold: {stop_loss_threshold}%)"
+                    logger.warning(f"{reason} for {symbol}")
+                    results[symbol] = (True, quantity, reason)
+                else:
+                    results[symbol] = (False, None, "Within stop-loss threshold")
+            
+            except Exception as e:
+                logger.error(f"Error checking stop-loss: {e}")
+                results[symbol] = (False, None, f"Error: {str(e)}")
+        
+        return results
     
     def detect_abnormal_market(self, vix_value: Optional[Decimal] = None) -> Tuple[bool, str]:
         """
@@ -410,11 +539,30 @@ class RiskManager:
         Returns:
             True if successfully stopped
         """
+        return self.emergency_stop_many([config], reason)
+    
+    def emergency_stop_many(self, configs: List[AutoTradeConfig], reason: str) -> bool:
+        """
+        Emergency stop for several accounts in a single transaction
+        
+        All configurations are disabled with one commit (one flush and one
+        fsync) instead of one per account. The commit stays synchronous so
+        a stop is durable when this returns.
+        
+        Args:
+            configs: Auto-trade configurations to disable
+            reason: Reason for emergency stop
+        
+        Returns:
+            True if all accounts were successfully stopped
+        """
         try:
-            config.is_enabled = False
+            for config in configs:
+                config.is_enabled = False
             self.db.commit()
             
-            logger.critical(f"EMERGENCY STOP activated for user {config.user_id}: {reason}")
+            for config in configs:
+                logger.critical(f"EMERGENCY STOP activated for user {config.user_id}: {reason}")
             
             # TODO: Send emergency notification
             
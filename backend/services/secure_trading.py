@@ -4,10 +4,12 @@ Secure trading wrapper with 2FA and audit logging
 
 from typing import Optional, Dict, Any
 from sqlalchemy.orm import Session
+from datetime import datetime, timezone
 from decimal import Decimal
 import logging
 
 from services.security import audit_logger, two_factor_auth
+from services.trade_audit_buffer import get_trade_audit_buffer
 from services.auto_trading_engine import AutoTradingEngine
 from models.trade_history import TradeHistory
 
@@ -68,29 +70,32 @@ class SecureTradingWrapper:
             ValueError: If 2FA required but not provided or invalid
         """
         total_amount = Decimal(quantity) * price
+        trade_action = action.upper()
+        price_value = float(price)
+        needs_2fa = self.requires_2fa(total_amount)
         
         # Check if 2FA is required
-        if self.requires_2fa(total_amount):
+        if needs_2fa:
             if not two_fa_token:
                 audit_logger.log_trade(
                     user_id=self.user_id,
                     action=action,
                     symbol=symbol,
                     quantity=quantity,
-                    price=float(price),
+                    price=price_value,
                     status="REJECTED",
                     reason="2FA_REQUIRED"
                 )
                 raise ValueError("2FA verification required for this trade amount")
             
             # Verify 2FA token
-            if not two_factor_auth.verify_token(self.user_id, two_fa_token):
+            if not await two_factor_auth.averify_token(self.user_id, two_fa_token):
                 audit_logger.log_trade(
                     user_id=self.user_id,
                     action=action,
                     symbol=symbol,
                     quantity=quantity,
-                    price=float(price),
+                    price=price_value,
                     status="REJECTED",
                     reason="2FA_INVALID"
                 )
@@ -98,10 +103,10 @@ class SecureTradingWrapper:
         
         # Execute trade
         try:
-            if action.upper() == "BUY":
-                result = self.engine.execute_buy(symbol, quantity, float(price))
-            elif action.upper() == "SELL":
-                result = self.engine.execute_sell(symbol, quantity, float(price))
+            if trade_action == "BUY":
+                result = self.engine.execute_buy(symbol, quantity, price_value)
+            elif trade_action == "SELL":
+                result = self.engine.execute_sell(symbol, quantity, price_value)
             else:
                 raise ValueError(f"Invalid action: {action}")
             
@@ -111,7 +116,7 @@ class SecureTradingWrapper:
                 action=action,
                 symbol=symbol,
                 quantity=quantity,
-                price=float(price),
+                price=price_value,
                 status="SUCCESS",
                 ip_address=ip_address,
                 two_fa_verified=bool(two_fa_token)
@@ -122,8 +127,9 @@ class SecureTradingWrapper:
                 action=action,
                 symbol=symbol,
                 quantity=quantity,
-                price=price,
+                price=price_value,
                 total_amount=total_amount,
+                requires_2fa=needs_2fa,
                 status="SUCCESS",
                 ip_address=ip_address,
                 two_fa_verified=bool(two_fa_token)
@@ -140,7 +146,7 @@ class SecureTradingWrapper:
                 action=action,
                 symbol=symbol,
                 quantity=quantity,
-                price=float(price),
+                price=price_value,
                 status="FAILED",
                 error=str(e),
                 ip_address=ip_address
@@ -151,8 +157,9 @@ class SecureTradingWrapper:
                 action=action,
                 symbol=symbol,
                 quantity=quantity,
-                price=price,
+                price=price_value,
                 total_amount=total_amount,
+                requires_2fa=needs_2fa,
                 status="FAILED",
                 error_message=str(e),
                 ip_address=ip_address,
@@ -166,31 +173,44 @@ class SecureTradingWrapper:
         action: str,
         symbol: str,
         quantity: int,
-        price: Decimal,
+        price: float,
         total_amount: Decimal,
+        requires_2fa: bool,
         status: str,
         error_message: Optional[str] = None,
         ip_address: Optional[str] = None,
         two_fa_verified: bool = False
     ):
-        """Store trade in audit log database"""
+        """
+        Store trade in audit log database
+        
+        Rows go through the batched trade audit buffer when it is running
+        (started with the application); otherwise they are committed directly.
+        """
         from models.security_models import TradeAuditLog
         
-        audit_entry = TradeAuditLog(
+        audit_values = dict(
+            # Trade time, not the time the buffered row is flushed
+            timestamp=datetime.now(timezone.utc),
             user_id=self.user_id,
             action=action,
             symbol=symbol,
             quantity=quantity,
-            price=float(price),
+            price=price,
             total_amount=float(total_amount),
             status=status,
             error_message=error_message,
             ip_address=ip_address,
-            requires_2fa=self.requires_2fa(total_amount),
+            requires_2fa=requires_2fa,
             two_fa_verified=two_fa_verified
         )
         
-        self.db.add(audit_entry)
+        audit_buffer = get_trade_audit_buffer()
+        if audit_buffer.is_running:
+            audit_buffer.add(audit_values)
+            return
+        
+        self.db.add(TradeAuditLog(**audit_values))
         self.db.commit()
     
     async def start_auto_trading(
@@ -219,7 +239,7 @@ class SecureTradingWrapper:
                 )
                 raise ValueError("2FA verification required to start auto-trading")
             
-            if not two_factor_auth.verify_token(self.user_id, two_fa_token):
+            if not await two_factor_auth.averify_token(self.user_id, two_fa_token):
                 audit_logger.log_security_event(
                     event_type="AUTO_TRADING_START",
                     severity="WARNING",
@@ -2,10 +2,14 @@
 Security services for authentication, encryption, and audit logging
 """
 
+import atexit
 import hashlib
+import queue
 import secrets
 import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
+from threading import Lock
 from typing import Optional, Dict, Any
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
@@ -14,21 +18,61 @@ from cryptography.hazmat.backends import default_backend
 import base64
 import pyotp
 import logging
+from pythonjsonlogger import jsonlogger
+
+try:
+    import redis
+    import redis.asyncio as redis_asyncio
+    from redis.exceptions import RedisError
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+    redis = None
+    redis_asyncio = None
+    RedisError = Exception
+
+try:
+    from config import settings
+except ImportError:
+    from config import settings
 
 logger = logging.getLogger(__name__)
 
+try:
+    import _hashlib
+    HASHLIB_OPENSSL = hashlib.sha256 is _hashlib.openssl_sha256
+except (ImportError, AttributeError):
+    HASHLIB_OPENSSL = False
+
+if not HASHLIB_OPENSSL:
+    # The builtin fallback doesn't use CPU SHA extensions (SHA-NI)
+    logger.warning("hashlib.sha256 is not OpenSSL-backed; API key hashing will be slower")
+
 
 class APIKeyManager:
     """Manages API key generation, validation, and storage"""
     
+    # Recently validated keys skip hashing and the metadata lookup
+    VALIDATION_CACHE_SIZE = 10000
+    VALIDATION_CACHE_TTL = 60  # seconds
+    
     def __init__(self):
-        self._api_keys: Dict[str, Dict[str, Any]] = {}
+        # Keyed by the raw 32-byte SHA-256 digest of the API key
+        self._api_keys: Dict[bytes, Dict[str, Any]] = {}
+        # raw key -> (user_id, expires_at), least recently used first
+        self._validation_cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._cache_lock = Lock()
+    
+    @staticmethod
+    def _hash_key(api_key: str) -> bytes:
+        """Hash an API key for storage and lookup"""
+        return hashlib.sha256(api_key.encode()).digest()
     
     def generate_api_key(self, user_id: str, name: str = "default") -> str:
         """Generate a new API key for a user"""
         # Generate secure random key
         key = secrets.token_urlsafe(32)
-        key_hash = hashlib.sha256(key.encode()).hexdigest()
+        key_hash = self._hash_key(key)
         
         # Store key metadata
         self._api_keys[key_hash] = {
@@ -43,86 +87,239 @@ class APIKeyManager:
         return key
     
     def validate_api_key(self, api_key: str) -> Optional[str]:
-        """Validate API key and return user_id if valid"""
-        key_hash = hashlib.sha256(api_key.encode()).hexdigest()
+        """
+        Validate API key and return user_id if valid
         
-        if key_hash not in self._api_keys:
-            logger.warning(f"Invalid API key attempt: {key_hash[:8]}...")
-            return None
+        Successful validations are cached for VALIDATION_CACHE_TTL seconds,
+        so last_used is refreshed at most once per TTL for a busy key.
+        """
+        now = time.monotonic()
+        with self._cache_lock:
+            cached = self._validation_cache.get(api_key)
+            if cached is not None:
+                if cached[1] > now:
+                    self._validation_cache.move_to_end(api_key)
+                    return cached[0]
+                del self._validation_cache[api_key]
         
-        key_data = self._api_keys[key_hash]
+        key_hash = self._hash_key(api_key)
+        key_data = self._api_keys.get(key_hash)
+        
+        if key_data is None:
+            logger.warning(f"Invalid API key attempt: {key_hash[:4].hex()}...")
+            return None
         
         if not key_data["is_active"]:
-            logger.warning(f"Inactive API key used: {key_hash[:8]}...")
+            logger.warning(f"Inactive API key used: {key_hash[:4].hex()}...")
             return None
         
         # Update last used timestamp
         key_data["last_used"] = datetime.utcnow()
         
+        with self._cache_lock:
+            self._validation_cache[api_key] = (key_data["user_id"], now + self.VALIDATION_CACHE_TTL)
+            if len(self._validation_cache) > self.VALIDATION_CACHE_SIZE:
+                self._validation_cache.popitem(last=False)
+        
         return key_data["user_id"]
     
     def revoke_api_key(self, api_key: str) -> bool:
         """Revoke an API key"""
-        key_hash = hashlib.sha256(api_key.encode()).hexdigest()
+        with self._cache_lock:
+            self._validation_cache.pop(api_key, None)
         
-        if key_hash in self._api_keys:
-            self._api_keys[key_hash]["is_active"] = False
-            logger.info(f"Revoked API key: {key_hash[:8]}...")
+        key_hash = self._hash_key(api_key)
+        key_data = self._api_keys.get(key_hash)
+        
+        if key_data is not None:
+            key_data["is_active"] = False
+            logger.info(f"Revoked API key: {key_hash[:4].hex()}...")
             return True
         
         return False
+    
+    def revoke_all(self, user_id: str) -> int:
+        """Revoke all API keys of a user, returning how many were revoked"""
+        revoked = 0
+        for key_data in self._api_keys.values():
+            if key_data["user_id"] == user_id and key_data["is_active"]:
+                key_data["is_active"] = False
+                revoked += 1
+        
+        with self._cache_lock:
+            cached_keys = [key for key, (cached_user, _) in self._validation_cache.items() if cached_user == user_id]
+            for key in cached_keys:
+                del self._validation_cache[key]
+        
+        logger.info(f"Revoked {revoked} API keys for user {user_id}")
+        return revoked
 
 
 class RateLimiter:
-    """Rate limiting for API endpoints"""
+    """
+    Rate limiting for API endpoints
+    
+    Token bucket per identifier: up to max_requests requests in a burst,
+    refilled at max_requests per window_seconds. Each identifier keeps
+    two floats instead of one timestamp per request.
+    
+    With Redis enabled the buckets live in Redis and are updated by a Lua
+    script, so all workers share one limit per identifier. The in-process
+    buckets are used when Redis is disabled or unreachable.
+    """
     
-    def __init__(self, max_requests: int = 100, window_seconds: int = 60):
+    # KEYS[1]: bucket key; ARGV: capacity, refill rate, now, ttl (ms), cost
+    REDIS_BUCKET_SCRIPT = """
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local capacity = tonumber(ARGV[1])
+local now = tonumber(ARGV[3])
+local tokens = tonumber(bucket[1])
+local ts = tonumber(bucket[2])
+if tokens == nil then
+    tokens = capacity
+    ts = now
+end
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * tonumber(ARGV[2]))
+local allowed = 0
+if tokens >= tonumber(ARGV[5]) then
+    tokens = tokens - tonumber(ARGV[5])
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], ARGV[4])
+return {allowed, tostring(tokens)}
+"""
+    
+    def __init__(
+        self,
+        max_requests: int = 100,
+        window_seconds: int = 60,
+        key_prefix: str = "rate_limit",
+        use_redis: Optional[bool] = None
+    ):
         self.max_requests = max_requests
         self.window_seconds = window_seconds
-        self._requests: Dict[str, list] = {}
+        self.refill_rate = max_requests / window_seconds  # tokens per second
+        self.key_prefix = key_prefix
+        # [tokens, last_refill] per identifier
+        self._buckets: Dict[str, list] = {}
+        
+        if use_redis is None:
+            use_redis = settings.redis_enabled
+        self.use_redis = use_redis and REDIS_AVAILABLE
+        self._redis = None
+        self._redis_script = None
+        self._async_redis = None
+        self._async_redis_script = None
+    
+    def _refill(self, identifier: str, now: float) -> list:
+        """Get the identifier's bucket with tokens refilled up to now"""
+        bucket = self._buckets.get(identifier)
+        if bucket is None:
+            bucket = self._buckets[identifier] = [float(self.max_requests), now]
+        else:
+            bucket[0] = min(float(self.max_requests), bucket[0] + (now - bucket[1]) * self.refill_rate)
+            bucket[1] = now
+        return bucket
+    
+    def _take_local(self, identifier: str, cost: float) -> tuple:
+        """Take cost tokens from the in-process bucket, returning (allowed, tokens)"""
+        bucket = self._refill(identifier, time.time())
+        if bucket[0] < cost:
+            return False, bucket[0]
+        bucket[0] -= cost
+        return True, bucket[0]
+    
+    def _script_args(self, cost: float) -> list:
+        """Arguments for REDIS_BUCKET_SCRIPT"""
+        return [self.max_requests, self.refill_rate, time.time(), self.window_seconds * 1000, cost]
+    
+    def _redis_key(self, identifier: str) -> str:
+        return f"{self.key_prefix}:{identifier}"
+    
+    def _take(self, identifier: str, cost: float) -> tuple:
+        """Take cost tokens from the shared bucket, falling back to the local one"""
+        if self.use_redis:
+            try:
+                if self._redis_script is None:
+                    self._redis = redis.from_url(settings.redis_url, socket_connect_timeout=1, socket_timeout=1)
+                    self._redis_script = self._redis.register_script(self.REDIS_BUCKET_SCRIPT)
+                allowed, tokens = self._redis_script(keys=[self._redis_key(identifier)], args=self._script_args(cost))
+                return bool(allowed), float(tokens)
+            except RedisError as e:
+                logger.warning(f"Redis rate limit check failed, using in-process limit: {e}")
+        return self._take_local(identifier, cost)
+    
+    async def _take_async(self, identifier: str, cost: float) -> tuple:
+        """Async version of _take for use inside the event loop"""
+        if self.use_redis:
+            try:
+                if self._async_redis_script is None:
+                    self._async_redis = redis_asyncio.from_url(settings.redis_url, socket_connect_timeout=1, socket_timeout=1)
+                    self._async_redis_script = self._async_redis.register_script(self.REDIS_BUCKET_SCRIPT)
+                allowed, tokens = await self._async_redis_script(keys=[self._redis_key(identifier)], args=self._script_args(cost))
+                return bool(allowed), float(tokens)
+            except RedisError as e:
+                logger.warning(f"Redis rate limit check failed, using in-process limit: {e}")
+        return self._take_local(identifier, cost)
     
     def is_allowed(self, identifier: str) -> bool:
         """Check if request is allowed for given identifier"""
-        now = time.time()
-        
-        # Initialize or get request history
-        if identifier not in self._requests:
-            self._requests[identifier] = []
-        
-        # Remove old requests outside the window
-        self._requests[identifier] = [
-            req_time for req_time in self._requests[identifier]
-            if now - req_time < self.window_seconds
-        ]
+        allowed, _ = self._take(identifier, 1.0)
         
         # Check if limit exceeded
-        if len(self._requests[identifier]) >= self.max_requests:
+        if not allowed:
             logger.warning(f"Rate limit exceeded for {identifier}")
-            return False
+        return allowed
+    
+    async def is_allowed_async(self, identifier: str) -> bool:
+        """Check if request is allowed for given identifier without blocking"""
+        allowed, _ = await self._take_async(identifier, 1.0)
         
-        # Add current request
-        self._requests[identifier].append(now)
-        return True
+        if not allowed:
+            logger.warning(f"Rate limit exceeded for {identifier}")
+        return allowed
     
     def get_remaining(self, identifier: str) -> int:
         """Get remaining requests for identifier"""
-        now = time.time()
-        
-        if identifier not in self._requests:
+        if not self.use_redis and identifier not in self._buckets:
             return self.max_requests
         
-        # Count recent requests
-        recent_requests = [
-            req_time for req_time in self._requests[identifier]
-            if now - req_time < self.window_seconds
-        ]
+        # A zero-cost take refills the bucket without consuming a token
+        return max(0, int(self._take(identifier, 0.0)[1]))
+    
+    async def get_remaining_async(self, identifier: str) -> int:
+        """Get remaining requests for identifier without blocking"""
+        if not self.use_redis and identifier not in self._buckets:
+            return self.max_requests
         
-        return max(0, self.max_requests - len(recent_requests))
+        return max(0, int((await self._take_async(identifier, 0.0))[1]))
     
     def reset(self, identifier: str):
         """Reset rate limit for identifier"""
-        if identifier in self._requests:
-            del self._requests[identifier]
+        if identifier in self._buckets:
+            del self._buckets[identifier]
+        
+        if self.use_redis:
+            try:
+                if self._redis is None:
+                    self._redis = redis.from_url(settings.redis_url, socket_connect_timeout=1, socket_timeout=1)
+                self._redis.delete(self._redis_key(identifier))
+            except RedisError as e:
+                logger.warning(f"Failed to reset Redis rate limit for {identifier}: {e}")
+    
+    async def reset_async(self, identifier: str):
+        """Reset rate limit for identifier without blocking"""
+        if identifier in self._buckets:
+            del self._buckets[identifier]
+        
+        if self.use_redis:
+            try:
+                if self._async_redis is None:
+                    self._async_redis = redis_asyncio.from_url(settings.redis_url, socket_connect_timeout=1, socket_timeout=1)
+                await self._async_redis.delete(self._redis_key(identifier))
+            except RedisError as e:
+                logger.warning(f"Failed to reset Redis rate limit for {identifier}: {e}")
 
 
 class EncryptionService:
@@ -198,31 +395,77 @@ class EncryptionService:
 class TwoFactorAuth:
     """Two-factor authentication using TOTP"""
     
+    # Verification attempts allowed per user within the window
+    MAX_ATTEMPTS = 5
+    ATTEMPT_WINDOW_SECONDS = 300
+    
     def __init__(self):
-        self._secrets: Dict[str, str] = {}
+        self._totps: Dict[str, pyotp.TOTP] = {}
+        # Shared across workers when Redis is enabled, so a TOTP code can't
+        # be brute-forced by spreading guesses over processes
+        self._attempt_limiter = RateLimiter(
+            max_requests=self.MAX_ATTEMPTS,
+            window_seconds=self.ATTEMPT_WINDOW_SECONDS,
+            key_prefix="2fa_attempts"
+        )
     
     def generate_secret(self, user_id: str) -> str:
         """Generate TOTP secret for user"""
         secret = pyotp.random_base32()
-        self._secrets[user_id] = secret
+        self._totps[user_id] = pyotp.TOTP(secret)
         logger.info(f"Generated 2FA secret for user {user_id}")
         return secret
     
     def get_provisioning_uri(self, user_id: str, issuer: str = "Market Analyzer") -> str:
         """Get provisioning URI for QR code generation"""
-        if user_id not in self._secrets:
+        totp = self._totps.get(user_id)
+        if totp is None:
             self.generate_secret(user_id)
+            totp = self._totps[user_id]
         
-        totp = pyotp.TOTP(self._secrets[user_id])
         return totp.provisioning_uri(name=user_id, issuer_name=issuer)
     
     def verify_token(self, user_id: str, token: str) -> bool:
-        """Verify TOTP token"""
-        if user_id not in self._secrets:
+        """
+        Verify TOTP token
+        
+        The attempt limit may call Redis, so async code should use
+        averify_token() instead.
+        """
+        totp = self._totps.get(user_id)
+        if totp is None:
+            logger.warning(f"No 2FA secret found for user {user_id}")
+            return False
+        
+        if not self._attempt_limiter.is_allowed(user_id):
+            logger.warning(f"Too many 2FA attempts for user {user_id}")
+            return False
+        
+        is_valid = self._check_totp(user_id, totp, token)
+        if is_valid:
+            self._attempt_limiter.reset(user_id)
+        
+        return is_valid
+    
+    async def averify_token(self, user_id: str, token: str) -> bool:
+        """Verify TOTP token without blocking the event loop"""
+        totp = self._totps.get(user_id)
+        if totp is None:
             logger.warning(f"No 2FA secret found for user {user_id}")
             return False
         
-        totp = pyotp.TOTP(self._secrets[user_id])
+        if not await self._attempt_limiter.is_allowed_async(user_id):
+            logger.warning(f"Too many 2FA attempts for user {user_id}")
+            return False
+        
+        is_valid = self._check_totp(user_id, totp, token)
+        if is_valid:
+            await self._attempt_limiter.reset_async(user_id)
+        
+        return is_valid
+    
+    def _check_totp(self, user_id: str, totp: pyotp.TOTP, token: str) -> bool:
+        """Check a token against the user's TOTP and log the result"""
         is_valid = totp.verify(token, valid_window=1)
         
         if is_valid:
@@ -234,11 +477,18 @@ class TwoFactorAuth:
     
     def is_enabled(self, user_id: str) -> bool:
         """Check if 2FA is enabled for user"""
-        return user_id in self._secrets
+        return user_id in self._totps
 
 
 class AuditLogger:
-    """Audit logging for security-sensitive operations"""
+    """
+    Audit logging for security-sensitive operations
+    
+    Records are written as one JSON object per line: the message is the
+    event category (TRADE, AUTH, CONFIG, SECURITY) and the event fields
+    are top-level keys. Caller-supplied keyword arguments are nested
+    under "fields" so they can't clash with LogRecord attributes.
+    """
     
     def __init__(self):
         self.logger = logging.getLogger("audit")
@@ -247,50 +497,66 @@ class AuditLogger:
         import os
         os.makedirs("logs", exist_ok=True)
         
-        from logging.handlers import RotatingFileHandler
+        from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
         handler = RotatingFileHandler(
             "logs/audit.log",
             maxBytes=10485760,  # 10MB
             backupCount=10
         )
-        handler.setFormatter(logging.Formatter(
-            '%(asctime)s - %(levelname)s - %(message)s'
+        handler.setFormatter(jsonlogger.JsonFormatter(
+            '%(asctime)s %(levelname)s %(message)s'
         ))
-        self.logger.addHandler(handler)
+        
+        # File writes and rotation happen on the listener thread;
+        # callers only enqueue the record
+        log_queue = queue.Queue(-1)
+        self.listener = QueueListener(log_queue, handler)
+        self.listener.start()
+        atexit.register(self.listener.stop)  # Drain pending records on exit
+        
+        self.logger.addHandler(QueueHandler(log_queue))
         self.logger.setLevel(logging.INFO)
     
     def log_trade(self, user_id: str, action: str, symbol: str, 
                   quantity: int, price: float, **kwargs):
         """Log trading activity"""
-        self.logger.info(
-            f"TRADE | user={user_id} | action={action} | "
-            f"symbol={symbol} | quantity={quantity} | price={price} | "
-            f"extra={kwargs}"
-        )
+        self.logger.info("TRADE", extra={
+            "user_id": user_id,
+            "action": action,
+            "symbol": symbol,
+            "quantity": quantity,
+            "price": price,
+            "fields": kwargs
+        })
     
     def log_auth(self, user_id: str, action: str, success: bool, **kwargs):
         """Log authentication events"""
-        status = "SUCCESS" if success else "FAILED"
-        self.logger.info(
-            f"AUTH | user={user_id} | action={action} | "
-            f"status={status} | extra={kwargs}"
-        )
+        self.logger.info("AUTH", extra={
+            "user_id": user_id,
+            "action": action,
+            "status": "SUCCESS" if success else "FAILED",
+            "fields": kwargs
+        })
     
     def log_config_change(self, user_id: str, config_type: str, 
                          old_value: Any, new_value: Any):
         """Log configuration changes"""
-        self.logger.info(
-            f"CONFIG | user={user_id} | type={config_type} | "
-            f"old={old_value} | new={new_value}"
-        )
+        self.logger.info("CONFIG", extra={
+            "user_id": user_id,
+            "config_type": config_type,
+            "old_value": old_value,
+            "new_value": new_value
+        })
     
     def log_security_event(self, event_type: str, severity: str, 
                           details: str, **kwargs):
         """Log security events"""
-        self.logger.warning(
-            f"SECURITY | type={event_type} | severity={severity} | "
-            f"details={details} | extra={kwargs}"
-        )
+        self.logger.warning("SECURITY", extra={
+            "event_type": event_type,
+            "severity": severity,
+            "details": details,
+            "fields": kwargs
+        })
 
 
 # Global instances
@@ -0,0 +1,144 @@
+"""
+Semantic Sentiment Cache Module
+Reuses Stage 1 sentiment results for re-published news articles
+"""
+
+import hashlib
+import logging
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Optional
+
+try:
+    from services.prompts import validate_step1_response
+except ImportError:
+    from services.prompts import validate_step1_response
+
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticSentimentCache:
+    """
+    In-memory LRU cache of Stage 1 sentiment results keyed by article content
+
+    Wire reprints publish the same story many times. Articles are keyed by a
+    SHA-256 digest of their title and full content, normalized for case and
+    whitespace, so a reprint reuses the cached result and the LLM call is
+    skipped.
+
+    Only identical text is matched. Lexical similarity can't tell apart
+    templated stories with opposite meaning ("shares surge after earnings
+    beat" vs "shares plunge after earnings miss"), so near-duplicates are
+    always sent to the LLM.
+    """
+
+    def __init__(self, max_entries: int = 2048):
+        """
+        Initialize semantic cache
+
+        Args:
+            max_entries: Number of results kept (least recently used are evicted)
+        """
+        self.max_entries = max_entries
+
+        self._results: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _digest(title: str, content: Optional[str]) -> str:
+        """Digest of the normalized title and content"""
+        text = " ".join(f"{title}\n{content or ''}".split()).lower()
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def lookup(self, title: str, content: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        Find a cached result for this article
+
+        Args:
+            title: Article title
+            content: Article content
+
+        Returns:
+            Copy of the cached result, or None on a miss
+        """
+        digest = self._digest(title, content)
+
+        with self._lock:
+            result = self._results.get(digest)
+            if result is None:
+                self.misses += 1
+                return None
+
+            self._results.move_to_end(digest)
+            self.hits += 1
+            return dict(result)
+
+    def store(self, title: str, content: Optional[str], result: Dict[str, Any]) -> bool:
+        """
+        Cache a Stage 1 result
+
+        Only results that pass validate_step1_response are stored.
+
+        Args:
+            title: Article title
+            content: Article content
+            result: Stage 1 result with "sentiment" and "reasoning"
+
+        Returns:
+            True if the result was stored
+        """
+        if not validate_step1_response(result):
+            return False
+
+        digest = self._digest(title, content)
+        entry = {"sentiment": result["sentiment"], "reasoning": result["reasoning"]}
+
+        with self._lock:
+            self._results[digest] = entry
+            self._results.move_to_end(digest)
+            if len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+
+        return True
+
+    def clear(self):
+        """Remove all cached results"""
+        with self._lock:
+            self._results.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics
+
+        Returns:
+            Dictionary with size, hits, misses and hit rate
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._results),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total > 0 else 0.0
+            }
+
+
+# Global semantic cache instance
+_semantic_sentiment_cache: Optional[SemanticSentimentCache] = None
+
+
+def get_semantic_sentiment_cache() -> SemanticSentimentCache:
+    """
+    Get global semantic sentiment cache instance
+
+    Returns:
+        SemanticSentimentCache instance
+    """
+    global _semantic_sentiment_cache
+    if _semantic_sentiment_cache is None:
+        _semantic_sentiment_cache = SemanticSentimentCache()
+    return _semantic_sentiment_cache
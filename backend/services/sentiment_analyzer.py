@@ -12,6 +12,8 @@ import json
 
 import logging
 
+from concurrent.futures import ThreadPoolExecutor
+
 from datetime import datetime
 
 from typing import List, Optional, Dict, Any
@@ -22,6 +24,12 @@ from sqlalchemy.orm import Session
 
 from services.llm_client import LlamaCppClient, LlamaCppClientError
 
+from services.semantic_cache import get_semantic_sentiment_cache
+
+from services.prompts import truncate_content
+
+from config import settings
+
 from models import (
 
     NewsArticle,
@@ -187,7 +195,15 @@ class SentimentAnalyzer:
 
     
 
-    def __init__(self, llama_client: Optional[LlamaCppClient] = None):
+    def __init__(
+
+        self,
+
+        llama_client: Optional[LlamaCppClient] = None,
+
+        max_concurrency: Optional[int] = None
+
+    ):
 
         """
 
@@ -199,12 +215,20 @@ class SentimentAnalyzer:
 
             llama_client: LlamaCppClient instance (creates new one if not provided)
 
+            max_concurrency: Concurrent LLM requests in analyze_batch
+
+                (default: settings.llm_parallel_requests)
+
         """
 
         self.llama_client = llama_client or LlamaCppClient()
 
         self.quantifier = SentimentQuantifier()
 
+        self.semantic_cache = get_semantic_sentiment_cache()
+
+        self.max_concurrency = max_concurrency or settings.llm_parallel_requests
+
         
 
         logger.info("SentimentAnalyzer initialized")
@@ -263,35 +287,37 @@ class SentimentAnalyzer:
 
         # Build user prompt with article details
 
-        user_prompt = STEP1_USER_PROMPT_TEMPLATE.format(
+        user_prompt = self._build_user_prompt(article)
 
-            title=article.title,
+        
 
-            content=article.content[:2000],  # Limit content length to avoid token overflow
+        try:
 
-            source=article.source,
+            # Reuse the result of a re-published copy of this article when one is cached
 
-            published_date=article.published_date.strftime("%Y-%m-%d %H:%M")
+            response_json = self.semantic_cache.lookup(article.title, article.content)
 
-        )
+            from_cache = response_json is not None
 
-        
+            if from_cache:
 
-        try:
+                logger.debug(f"Article {article.id}: semantic cache hit")
 
-            # Call LLM with JSON output
+            else:
 
-            response_json = self.llama_client.generate_json(
+                # Call LLM with JSON output
 
-                prompt=user_prompt,
+                response_json = self.llama_client.generate_json(
 
-                system_prompt=STEP1_SYSTEM_PROMPT,
+                    prompt=user_prompt,
 
-                temperature=temperature,
+                    system_prompt=STEP1_SYSTEM_PROMPT,
 
-                max_tokens=max_tokens
+                    temperature=temperature,
 
-            )
+                    max_tokens=max_tokens
+
+                )
 
             
 
@@ -311,6 +337,20 @@ class SentimentAnalyzer:
 
             
 
+            if not from_cache:
+
+                self.semantic_cache.store(
+
+                    article.title,
+
+                    article.content,
+
+                    {"sentiment": sentiment_label, "reasoning": reasoning}
+
+                )
+
+                
+
             # Quantify sentiment score with conservative weighting
 
             score = self.quantifier.quantify(sentiment_label)
@@ -367,6 +407,34 @@ class SentimentAnalyzer:
 
     
 
+    def _build_user_prompt(self, article: NewsArticle) -> str:
+
+        """
+
+        Build the Step 1 user prompt for an article
+
+        
+
+        The only place article content is truncated for Stage 1: callers pass
+
+        the raw article and the content is cut to the head+tail budget here.
+
+        """
+
+        return STEP1_USER_PROMPT_TEMPLATE.format(
+
+            title=article.title,
+
+            content=truncate_content(article.content),
+
+            source=article.source,
+
+            published_date=article.published_date.strftime("%Y-%m-%d %H:%M")
+
+        )
+
+    
+
     def _validate_sentiment(self, sentiment: Any) -> SentimentType:
 
         """
@@ -441,7 +509,9 @@ class SentimentAnalyzer:
 
         
 
-        Processes articles sequentially and stores results in database.
+        Sends up to max_concurrency LLM requests at a time and stores
+
+        results in the database in input order.
 
         
 
@@ -475,61 +545,99 @@ class SentimentAnalyzer:
 
         
 
+        # Look up already-analyzed articles with one query instead of one per article
+
+        analyzed_ids = set()
+
+        if skip_existing and articles:
+
+            analyzed_ids = {
+
+                article_id for (article_id,) in db.query(SentimentAnalysis.article_id).filter(
+
+                    SentimentAnalysis.article_id.in_([article.id for article in articles])
+
+                )
+
+            }
+
+            
+
+        # Articles that still need analysis, in input order
+
+        pending = []
+
         for article in articles:
 
-            try:
+            if skip_existing and article.id in analyzed_ids:
 
-                # Check if article already has sentiment analysis
+                logger.debug(f"Skipping article {article.id}: already analyzed")
 
-                if skip_existing:
+                skipped_count += 1
 
-                    existing = db.query(SentimentAnalysis).filter(
+                continue
 
-                        SentimentAnalysis.article_id == article.id
+            
 
-                    ).first()
+            # Detached copy: worker threads must not lazy-load through the session,
 
-                    
+            # whose commits below expire the attached instances
 
-                    if existing:
+            pending.append(NewsArticle(
 
-                        logger.debug(f"Skipping article {article.id}: already analyzed")
+                id=article.id,
 
-                        skipped_count += 1
+                title=article.title,
 
-                        continue
+                content=article.content,
 
-                
+                source=article.source,
 
-                # Analyze article
+                published_date=article.published_date
 
-                result = self.analyze_article(article)
+            ))
 
-                results.append(result)
+            
 
-                
+        if pending:
 
-                # Store in database
+            # LLM calls run concurrently (llama.cpp serves them on parallel slots);
 
-                self._save_to_db(result, db)
+            # results are stored on this thread since the session is not thread-safe
 
-                analyzed_count += 1
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(pending))) as executor:
 
-                
+                futures = [executor.submit(self.analyze_article, article) for article in pending]
 
-            except Exception as e:
+                for article, future in zip(pending, futures):
 
-                logger.error(
+                    try:
 
-                    f"Failed to analyze article {article.id}: {e}",
+                        result = future.result()
 
-                    exc_info=True
+                        results.append(result)
 
-                )
+                        
 
-                error_count += 1
+                        # Store in database
 
-                continue
+                        self._save_to_db(result, db)
+
+                        analyzed_count += 1
+
+                        
+
+                    except Exception as e:
+
+                        logger.error(
+
+                            f"Failed to analyze article {article.id}: {e}",
+
+                            exc_info=True
+
+                        )
+
+                        error_count += 1
 
         
 
@@ -308,8 +308,8 @@ class SignalCalculator:
         # Calculate VIX weight (higher VIX = more weight on sentiment)
         vix_weight = 1.0 + vix_normalized
         
-        # Calculate weighted sum
-        weighted_sum = sum(score * vix_weight for score in daily_scores)
+        # Calculate weighted sum (the weight is shared, so factor it out of the sum)
+        weighted_sum = vix_weight * sum(daily_scores)
         
         logger.info(f"Weekly signal calculated: {weighted_sum:.2f} "
                    f"(VIX weight: {vix_weight:.2f}, days: {len(daily_scores)})")
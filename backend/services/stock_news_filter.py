@@ -930,6 +930,10 @@ class StockNewsFilter:
 
         text = f"{article.title} {article.content}".lower()
 
+        # Lowercased once and reused for every stock name below
+
+        title = article.title.lower()
+
         
 
         # Search for each stock name
@@ -952,7 +956,7 @@ class StockNewsFilter:
 
                 title_mentions = len(
 
-                    re.findall(r'\b' + re.escape(name) + r'\b', article.title.lower(), re.IGNORECASE)
+                    re.findall(r'\b' + re.escape(name) + r'\b', title, re.IGNORECASE)
 
                 )
 
@@ -0,0 +1,213 @@
+"""
+Trade Audit Buffer Module
+Batches trade audit log rows into periodic bulk inserts
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+try:
+    from app.database import SessionLocal
+    from config import settings
+    from models.security_models import TradeAuditLog
+    from services.security import audit_logger
+except ImportError:
+    from app.database import SessionLocal
+    from config import settings
+    from models.security_models import TradeAuditLog
+    from services.security import audit_logger
+
+
+logger = logging.getLogger(__name__)
+
+
+class TradeAuditBuffer:
+    """
+    Write-behind buffer for TradeAuditLog rows
+
+    Rows are queued in memory and written with one bulk insert and one
+    commit when max_size rows are pending or every flush_interval seconds,
+    instead of one transaction per trade. Remaining rows are flushed on stop().
+
+    Rows are never dropped: if the bulk insert fails each row is inserted on
+    its own, rows that still fail are queued again for the next flush, and
+    rows that can't be written when the buffer stops go to the audit log file.
+    """
+
+    # Final flush attempts in stop() before rows are written to the audit log file
+    STOP_FLUSH_ATTEMPTS = 3
+    STOP_RETRY_DELAY = 1.0  # seconds
+
+    def __init__(
+        self,
+        max_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        session_factory=SessionLocal
+    ):
+        """
+        Initialize trade audit buffer
+
+        Args:
+            max_size: Pending rows that trigger a flush (default from settings)
+            flush_interval: Seconds between periodic flushes (default from settings)
+            session_factory: Callable returning a database session
+        """
+        self.max_size = max_size or settings.audit_trail_buffer_max_size
+        self.flush_interval = flush_interval or settings.audit_trail_buffer_flush_interval
+        self.session_factory = session_factory
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._flush_requested: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the background flush task is running"""
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Start the background flush task on the running event loop"""
+        if self.is_running:
+            return
+
+        self._queue = asyncio.Queue()
+        self._flush_requested = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        logger.info(
+            f"Trade audit buffer started (max_size={self.max_size}, "
+            f"flush_interval={self.flush_interval}s)"
+        )
+
+    async def stop(self):
+        """Stop the background task and flush pending rows"""
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        for attempt in range(self.STOP_FLUSH_ATTEMPTS):
+            await self.flush()
+            if self._queue.empty():
+                break
+            if attempt + 1 < self.STOP_FLUSH_ATTEMPTS:
+                await asyncio.sleep(self.STOP_RETRY_DELAY)
+
+        if not self._queue.empty():
+            unwritten = []
+            while not self._queue.empty():
+                unwritten.append(self._queue.get_nowait())
+            logger.error(f"Writing {len(unwritten)} unsaved trade audit rows to the audit log file")
+            for entry in unwritten:
+                audit_logger.log_security_event(
+                    event_type="TRADE_AUDIT_UNSAVED",
+                    severity="ERROR",
+                    details="Trade audit row could not be stored in the database",
+                    row=entry
+                )
+
+        logger.info("Trade audit buffer stopped")
+
+    def add(self, entry: Dict[str, Any]):
+        """
+        Queue a TradeAuditLog row
+
+        Must be called from the event loop thread.
+
+        Args:
+            entry: Column values of the TradeAuditLog row
+        """
+        self._queue.put_nowait(entry)
+        if self._queue.qsize() >= self.max_size:
+            self._flush_requested.set()
+
+    async def flush(self) -> int:
+        """
+        Write all pending rows in one transaction
+
+        If the bulk insert fails the rows are inserted one by one, and rows
+        that still fail are queued again.
+
+        Returns:
+            Number of rows written
+        """
+        if self._queue is None or self._queue.empty():
+            return 0
+
+        batch = []
+        while not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+
+        try:
+            await asyncio.to_thread(self._write_batch, batch)
+            logger.debug(f"Flushed {len(batch)} trade audit rows")
+            return len(batch)
+        except Exception as e:
+            logger.error(f"Failed to bulk write {len(batch)} trade audit rows, writing rows one by one: {e}")
+
+        failed = await asyncio.to_thread(self._write_rows, batch)
+        for entry in failed:
+            self._queue.put_nowait(entry)
+        if failed:
+            logger.error(f"Failed to write {len(failed)} trade audit rows; queued for retry")
+        return len(batch) - len(failed)
+
+    def _write_batch(self, batch: List[Dict[str, Any]]):
+        """Bulk insert a batch of rows (runs in a worker thread)"""
+        db = self.session_factory()
+        try:
+            db.bulk_insert_mappings(TradeAuditLog, batch)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _write_rows(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Insert rows in separate transactions (runs in a worker thread)
+
+        Returns:
+            Rows that could not be written
+        """
+        failed = []
+        for entry in batch:
+            try:
+                self._write_batch([entry])
+            except Exception as e:
+                logger.debug(f"Trade audit row write failed: {e}")
+                failed.append(entry)
+        return failed
+
+    async def _run(self):
+        """Flush when the buffer fills up or the interval elapses"""
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_requested.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_requested.clear()
+            await self.flush()
+
+
+# Global trade audit buffer instance
+_trade_audit_buffer: Optional[TradeAuditBuffer] = None
+
+
+def get_trade_audit_buffer() -> TradeAuditBuffer:
+    """
+    Get global trade audit buffer instance
+
+    Returns:
+        TradeAuditBuffer instance
+    """
+    global _trade_audit_buffer
+    if _trade_audit_buffer is None:
+        _trade_audit_buffer = TradeAuditBuffer()
+    return _trade_audit_buffer
@@ -0,0 +1,108 @@
+"""
+Tests for the Stage 1 semantic sentiment cache
+"""
+
+import pytest
+
+from services.semantic_cache import SemanticSentimentCache
+
+
+POSITIVE_RESULT = {"sentiment": "Positive", "reasoning": "Earnings beat expectations."}
+
+# Shared wire-story body that follows the opening sentence
+MARKET_WRAP = (
+    " Trading volume on the Korea Exchange was in line with the 20-day average,"
+    " and analysts at several brokerages said they would review their forecasts"
+    " after the company's conference call later in the week. The benchmark KOSPI"
+    " index and the tech-heavy KOSDAQ both moved with the semiconductor sector,"
+    " which accounts for a large share of total market capitalization. Retail"
+    " investors were net sellers on the KOSDAQ, while pension funds added to"
+    " large-cap holdings ahead of the quarterly index rebalancing next month."
+)
+
+# (cached article, opposite-polarity article built from the same template);
+# the old hashed bag-of-words matcher scored these above its 0.92 threshold
+OPPOSITE_POLARITY_PAIRS = [
+    (
+        (
+            "Samsung shares surge 5% after earnings beat",
+            "Samsung Electronics shares surge 5% on quarterly earnings, "
+            "with foreign investors net buyers." + MARKET_WRAP
+        ),
+        (
+            "Samsung shares plunge 5% after earnings miss",
+            "Samsung Electronics shares plunge 5% on quarterly earnings, "
+            "with foreign investors net sellers." + MARKET_WRAP
+        ),
+    ),
+    (
+        (
+            "KOSPI closes higher as exports rise",
+            "The KOSPI closed higher as exports rise for a third month." + MARKET_WRAP
+        ),
+        (
+            "KOSPI closes lower as exports fall",
+            "The KOSPI closed lower as exports fall for a third month." + MARKET_WRAP
+        ),
+    ),
+    (
+        (
+            "SK Hynix upgraded to buy",
+            "SK Hynix was upgraded to buy by analysts." + MARKET_WRAP
+        ),
+        (
+            "SK Hynix downgraded to sell",
+            "SK Hynix was downgraded to sell by analysts." + MARKET_WRAP
+        ),
+    ),
+]
+
+
+@pytest.mark.unit
+class TestSemanticSentimentCache:
+    """Test SemanticSentimentCache matching"""
+
+    @pytest.mark.parametrize("cached, opposite", OPPOSITE_POLARITY_PAIRS)
+    def test_opposite_polarity_template_is_a_miss(self, cached, opposite):
+        """Templated stories with opposite meaning never share a result"""
+        cache = SemanticSentimentCache()
+        assert cache.store(*cached, POSITIVE_RESULT)
+
+        assert cache.lookup(*opposite) is None
+
+    def test_reprint_is_a_hit(self):
+        """Identical text differing only in case and whitespace is reused"""
+        cache = SemanticSentimentCache()
+        title, content = OPPOSITE_POLARITY_PAIRS[0][0]
+        cache.store(title, content, POSITIVE_RESULT)
+
+        reprint = cache.lookup(title.upper(), "  " + content.replace(" ", "\n  "))
+
+        assert reprint == POSITIVE_RESULT
+
+    def test_same_title_different_content_is_a_miss(self):
+        """Content beyond the opening is part of the key"""
+        cache = SemanticSentimentCache()
+        title, content = OPPOSITE_POLARITY_PAIRS[0][0]
+        cache.store(title, content, POSITIVE_RESULT)
+
+        assert cache.lookup(title, content + " Shares later reversed the gain.") is None
+
+    def test_invalid_result_is_not_stored(self):
+        """Results failing Stage 1 validation are rejected"""
+        cache = SemanticSentimentCache()
+
+        assert not cache.store("title", "content", {"sentiment": "Bullish", "reasoning": "x"})
+        assert cache.lookup("title", "content") is None
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """The cache keeps at most max_entries results"""
+        cache = SemanticSentimentCache(max_entries=2)
+        cache.store("a", "a", POSITIVE_RESULT)
+        cache.store("b", "b", POSITIVE_RESULT)
+        cache.lookup("a", "a")
+        cache.store("c", "c", POSITIVE_RESULT)
+
+        assert cache.lookup("b", "b") is None
+        assert cache.lookup("a", "a") == POSITIVE_RESULT
+        assert cache.get_stats()["size"] == 2